@@ -0,0 +1,207 @@
+"""
+Admission control for the expensive endpoints (scoring, PDF extraction).
+
+A few concurrent my_matches calls can keep every gunicorn worker busy
+parsing and scoring, and then cheap pages time out behind them. Requests
+to those endpoints must first take:
+
+- a per-user slot    (ADMISSION_PER_USER in flight per user)  -> else 429
+- a work slot        (ADMISSION_MAX_CONCURRENT on this host)  -> else they
+  wait in a bounded queue (ADMISSION_QUEUE_SIZE waiters, at most
+  ADMISSION_MAX_WAIT seconds)                                  -> else 503
+
+Both responses carry Retry-After. Slots are flock()ed files in
+ADMISSION_LOCK_DIR, so the limits hold across all gunicorn workers on
+the host, and a crashed worker's slots are released by the kernel.
+Where fcntl isn't available they fall back to per-process locks.
+
+Batch work (PRIORITY_BATCH) can't use the last ADMISSION_RESERVED_SLOTS
+work slots, so a big import never blocks interactive matching.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import exceptions
+
+from . import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+
+# how often a queued request re-checks the work slots (seconds)
+POLL_INTERVAL = 0.05
+
+
+class ServerBusy(exceptions.APIException):
+    status_code = 503
+    default_detail = "Server busy, please retry shortly."
+    default_code = "server_busy"
+
+    def __init__(self, wait, detail=None):
+        # DRF's exception handler turns .wait into Retry-After
+        self.wait = wait
+        super().__init__(detail)
+
+
+def _user_limited(wait):
+    return exceptions.Throttled(
+        wait=wait, detail="Too many matching requests in flight, please wait for them to finish."
+    )
+
+
+class _FileSlot:
+    def __init__(self, fd):
+        self.fd = fd
+
+    def release(self):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+    __del__ = release
+
+
+class _LocalSlot:
+    def __init__(self, lock):
+        self.lock = lock
+
+    def release(self):
+        if self.lock is not None:
+            self.lock.release()
+            self.lock = None
+
+
+_local_locks = {}
+_local_guard = threading.Lock()
+
+
+def _try_slot(name):
+    """Non-blocking: a held slot (call .release()) or None."""
+    if fcntl is None:
+        with _local_guard:
+            lock = _local_locks.setdefault(name, threading.Lock())
+        return _LocalSlot(lock) if lock.acquire(blocking=False) else None
+
+    lock_dir = settings.ADMISSION_LOCK_DIR
+    os.makedirs(lock_dir, mode=0o700, exist_ok=True)
+    fd = os.open(os.path.join(lock_dir, name), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return _FileSlot(fd)
+
+
+def _first_free(prefix, count):
+    for i in range(count):
+        slot = _try_slot(f"{prefix}{i}")
+        if slot is not None:
+            return slot
+    return None
+
+
+class Ticket:
+    """Admission granted; release() it (or use `with`) when the work is done."""
+
+    def __init__(self, slots):
+        self._slots = slots
+
+    def release(self):
+        while self._slots:
+            self._slots.pop().release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+    def hold(self, events):
+        """Keeps the ticket until a streamed response is sent or closed."""
+        return _HeldStream(self, events)
+
+
+class _HeldStream:
+    # an iterator with close() rather than a generator: Django closes the
+    # response even if the body was never iterated, and an unstarted
+    # generator's finally block would never run
+    def __init__(self, ticket, events):
+        self._ticket = ticket
+        self._events = iter(events)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._events)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        self._ticket.release()
+        close = getattr(self._events, "close", None)
+        if close is not None:
+            close()
+
+
+def enabled() -> bool:
+    return settings.ADMISSION_MAX_CONCURRENT > 0
+
+
+def admit(user, priority=PRIORITY_INTERACTIVE) -> Ticket:
+    """
+    Takes a per-user slot and a work slot for `user`, waiting in the
+    queue if needed. Raises Throttled (429) or ServerBusy (503).
+    user=None (background workers): only the work slot.
+    """
+    if not enabled():
+        return Ticket([])
+
+    retry_after = settings.ADMISSION_RETRY_AFTER
+    started = time.monotonic()
+
+    held = []
+    if user is not None:
+        user_slot = _first_free(f"user-{user.pk}-", max(1, settings.ADMISSION_PER_USER))
+        if user_slot is None:
+            raise _user_limited(retry_after)
+        held.append(user_slot)
+
+    slots = settings.ADMISSION_MAX_CONCURRENT
+    if priority == PRIORITY_BATCH:
+        slots = max(1, slots - settings.ADMISSION_RESERVED_SLOTS)
+
+    work = _first_free("work-", slots)
+    if work is None:
+        queued = _first_free("queue-", settings.ADMISSION_QUEUE_SIZE)
+        if queued is None:
+            Ticket(held).release()
+            raise ServerBusy(retry_after)
+
+        deadline = started + settings.ADMISSION_MAX_WAIT
+        try:
+            while work is None and time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                work = _first_free("work-", slots)
+        finally:
+            queued.release()
+
+        if work is None:
+            Ticket(held).release()
+            raise ServerBusy(retry_after)
+
+    metrics.STAGE_SECONDS.observe(time.monotonic() - started, "admission_wait")
+    return Ticket(held + [work])
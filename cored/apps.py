@@ -1,6 +1,6 @@
 from django.apps import AppConfig
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_delete, post_save, pre_delete, pre_save
 import os
 
 class CoredConfig(AppConfig):
@@ -10,6 +10,25 @@ class CoredConfig(AppConfig):
     def ready(self):
         post_migrate.connect(create_superuser, sender=self)
 
+        from .authentication import forget_api_token, forget_user_tokens
+        post_delete.connect(forget_api_token, sender="cored.ApiToken")
+        post_save.connect(forget_user_tokens, sender=get_user_model())
+
+        # keep the hashing vectorizer's document frequencies current; only
+        # in hashing mode, exact mode never reads them (hashing_index
+        # rebuild catches up after switching)
+        from .hashing import tracking_enabled
+        if tracking_enabled():
+            from .hashing import stash_job_text, count_saved_job, uncount_deleted_job
+            pre_save.connect(stash_job_text, sender="cored.Job")
+            post_save.connect(count_saved_job, sender="cored.Job")
+            post_delete.connect(uncount_deleted_job, sender="cored.Job")
+
+        # reports cascade away with their job / resume: uncount them first
+        from .skillgaps import uncount_job_reports, uncount_resume_reports
+        pre_delete.connect(uncount_job_reports, sender="cored.Job")
+        pre_delete.connect(uncount_resume_reports, sender="cored.Resume")
+
 
 def create_superuser(sender, **kwargs):
     User = get_user_model()
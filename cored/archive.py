@@ -0,0 +1,185 @@
+"""
+Job lifecycle and MatchReport archival.
+
+MatchReport grows as resumes x jobs, and most rows belong to jobs nobody
+looks at anymore. Those rows leave the hot table:
+
+- close_stale_jobs(): open jobs older than JOB_MAX_AGE_DAYS are closed
+  (recruiters close / reopen jobs through the API too)
+- archive_job(): a closed job's reports move into one MatchReportArchive
+  row (zlib-compressed JSON) and out of the skill-gap counters
+- archive_closed_jobs(): archive_job() for every job closed more than
+  ARCHIVE_AFTER_CLOSED_DAYS ago
+- restore_job(): on demand (reopening the job, `archive_reports
+  restore`), the rows go back
+
+Closed jobs are never rescored (Job.objects.open() in the scoring
+paths), so archived pairs don't silently come back.
+"""
+import json
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import hashing, skillgaps
+from .models import Job, MatchReport, MatchReportArchive, Resume
+
+# MatchReport columns kept in the archive (job_id is the archive row's)
+ARCHIVED_FIELDS = [
+    "resume_id",
+    "score",
+    "skills_score",
+    "title_score",
+    "desc_score",
+    "ats_score",
+    "missing_skills",
+    "ats_missing_skills",
+    "improvements",
+    "tailored_summary",
+    "cover_letter",
+    "interview_questions",
+    "report_version",
+    "created_at",
+]
+
+
+def _pack(rows) -> bytes:
+    # column names once, rows as lists: no repeated keys before compression
+    payload = {"fields": ARCHIVED_FIELDS, "rows": [[r[f] for f in ARCHIVED_FIELDS] for r in rows]}
+    # created_at: full isoformat (DjangoJSONEncoder drops the microseconds)
+    text = json.dumps(payload, default=lambda v: v.isoformat(), separators=(",", ":"))
+    return zlib.compress(text.encode(), 6)
+
+
+def _unpack(data) -> list:
+    payload = json.loads(zlib.decompress(bytes(data)))
+    rows = [dict(zip(payload["fields"], row)) for row in payload["rows"]]
+    # archived before a column was added: the column's default
+    added = [MatchReport._meta.get_field(f) for f in ARCHIVED_FIELDS if f not in payload["fields"]]
+    for row in rows:
+        for field in added:
+            row[field.name] = field.get_default()
+    return rows
+
+
+# ===================== LIFECYCLE =====================
+
+def close_job(job: Job) -> None:
+    job.status = Job.STATUS_CLOSED
+    job.closed_at = timezone.now()
+    job.save(update_fields=["status", "closed_at"])
+
+
+def reopen_job(job: Job) -> int:
+    """Reopens `job` and restores its archived reports. Returns rows restored."""
+    job.status = Job.STATUS_OPEN
+    job.closed_at = None
+    job.save(update_fields=["status", "closed_at"])
+    return restore_job(job)
+
+
+def close_stale_jobs(max_age_days: int = None) -> int:
+    """Closes open jobs created more than max_age_days ago (0 = never). Returns jobs closed."""
+    days = settings.JOB_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    if days <= 0:
+        return 0
+    now = timezone.now()
+    stale = Job.objects.open().filter(created_at__lt=now - timedelta(days=days))
+    if not hashing.tracking_enabled():
+        return stale.update(status=Job.STATUS_CLOSED, closed_at=now)
+
+    # update() sends no signals: take the texts out of the hashing
+    # document frequencies here, a chunk at a time
+    closed = 0
+    while True:
+        with transaction.atomic():
+            jobs = list(stale.order_by("id").select_for_update().values("id", *hashing.FIELDS)[:2000])
+            if not jobs:
+                return closed
+            closed += Job.objects.filter(id__in=[j["id"] for j in jobs]).update(
+                status=Job.STATUS_CLOSED, closed_at=now
+            )
+            hashing.record_jobs(jobs, sign=-1)
+
+
+# ===================== ARCHIVE / RESTORE =====================
+
+@transaction.atomic
+def archive_job(job: Job) -> int:
+    """Moves the job's MatchReports into its archive row. Returns rows moved."""
+    reports = MatchReport.objects.filter(job=job)
+    rows = list(reports.order_by("resume_id").values(*ARCHIVED_FIELDS))
+    if not rows:
+        return 0
+
+    archive = MatchReportArchive.objects.select_for_update().filter(job=job).first()
+    archived = []
+    if archive is not None:
+        # archived before, reopened and closed again: live rows are newer
+        live = {r["resume_id"] for r in rows}
+        archived = [r for r in _unpack(archive.data) if r["resume_id"] not in live]
+
+    skillgaps.delete_reports(reports)
+    MatchReportArchive.objects.update_or_create(
+        job=job,
+        defaults={"data": _pack(archived + rows), "report_count": len(archived) + len(rows)},
+    )
+    return len(rows)
+
+
+def archivable_jobs(closed_days: int = None):
+    """Jobs closed more than closed_days ago that still have live reports."""
+    days = settings.ARCHIVE_AFTER_CLOSED_DAYS if closed_days is None else closed_days
+    return (
+        Job.objects
+        .filter(status=Job.STATUS_CLOSED, closed_at__lte=timezone.now() - timedelta(days=days))
+        .filter(Exists(MatchReport.objects.filter(job=OuterRef("pk"))))
+        .order_by("closed_at", "id")
+    )
+
+
+def archive_closed_jobs(closed_days: int = None, limit: int = None) -> tuple:
+    """archive_job() for each archivable job, one transaction per job. Returns (jobs, rows)."""
+    jobs = archivable_jobs(closed_days)
+    if limit:
+        jobs = jobs[:limit]
+    archived_jobs = moved = 0
+    for job in jobs.iterator():
+        moved += archive_job(job)
+        archived_jobs += 1
+    return archived_jobs, moved
+
+
+@transaction.atomic
+def restore_job(job: Job) -> int:
+    """Moves the job's archived reports back into MatchReport. Returns rows restored."""
+    archive = MatchReportArchive.objects.select_for_update().filter(job=job).first()
+    if archive is None:
+        return 0
+
+    rows = _unpack(archive.data)
+    resume_ids = {r["resume_id"] for r in rows}
+    alive = set(Resume.objects.filter(id__in=resume_ids).values_list("id", flat=True))
+    # rescored since the job was reopened: keep the new row
+    live = {r for r, _, _ in skillgaps.stored_rows((r, job.id) for r in alive)}
+
+    reports = []
+    for row in rows:
+        if row["resume_id"] in alive and row["resume_id"] not in live:
+            reports.append(MatchReport(job=job, **{**row, "created_at": parse_datetime(row["created_at"])}))
+
+    created_at = [r.created_at for r in reports]
+    MatchReport.objects.bulk_create(reports, batch_size=1000)
+    # auto_now_add overwrote created_at on insert: put the original back
+    for report, value in zip(reports, created_at):
+        report.created_at = value
+    MatchReport.objects.bulk_update(reports, ["created_at"], batch_size=1000)
+
+    skillgaps.apply_changes([], [(r.resume_id, job.id, r.missing_skills) for r in reports])
+    archive.delete()
+    return len(reports)
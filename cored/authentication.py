@@ -0,0 +1,181 @@
+"""
+Cheap bearer-token authentication for API clients.
+
+BasicAuthentication runs Django's password hasher (PBKDF2, deliberately
+slow) on every request. API tokens are random 256-bit keys, so a single
+SHA-256 is enough to store them safely, and verified tokens are kept in
+a small in-process LRU together with their user's id, username and
+flags, so most requests run no query at all. Each request still gets
+its own User instance, built from the cached values (other fields load
+on first access), so none is shared between threads.
+
+Revoking a token or saving a user drops their entries in this process
+at once; changes made by other processes apply within
+API_TOKEN_CACHE_TTL.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .models import ApiToken
+
+
+TOKEN_PREFIX = "hs_"
+
+
+def hash_token(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def create_api_token(user, name: str = "", days=None):
+    """
+    Creates an ApiToken and returns (token, key). The key is not stored,
+    hand it to the client now. days=None uses settings.API_TOKEN_TTL_DAYS,
+    0 means no expiry.
+    """
+    if days is None:
+        days = settings.API_TOKEN_TTL_DAYS
+    key = TOKEN_PREFIX + secrets.token_urlsafe(32)
+    token = ApiToken.objects.create(
+        user=user,
+        name=name,
+        key_hash=hash_token(key),
+        expires_at=timezone.now() + timedelta(days=days) if days else None,
+    )
+    return token, key
+
+
+class _TokenCache:
+    """
+    Thread-safe LRU of key_hash -> (user_id, user values, expires_at,
+    cached_at), user values in cached_user_fields() order. Entries live at most `ttl`
+    seconds, so revocations / deactivations made by other processes are
+    picked up within that window.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key_hash):
+        with self._lock:
+            entry = self._data.get(key_hash)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[3] > self.ttl:
+                del self._data[key_hash]
+                return None
+            self._data.move_to_end(key_hash)
+            return entry
+
+    def put(self, key_hash, user_id, user_values, expires_at):
+        with self._lock:
+            self._data[key_hash] = (user_id, user_values, expires_at, time.monotonic())
+            self._data.move_to_end(key_hash)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key_hash):
+        with self._lock:
+            self._data.pop(key_hash, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            stale = [k for k, entry in self._data.items() if entry[0] == user_id]
+            for key_hash in stale:
+                del self._data[key_hash]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+token_cache = _TokenCache(settings.API_TOKEN_CACHE_SIZE, settings.API_TOKEN_CACHE_TTL)
+
+
+def cached_user_fields():
+    """
+    User fields kept with a cached token, what permission checks read.
+    In model field order, as Model.from_db() expects.
+    """
+    model = get_user_model()
+    wanted = {model._meta.pk.attname, model.USERNAME_FIELD, "is_active", "is_staff", "is_superuser", "is_recruiter"}
+    return tuple(f.attname for f in model._meta.concrete_fields if f.attname in wanted)
+
+
+def forget_api_token(sender, instance, **kwargs):
+    """post_delete receiver: revoked tokens stop working in this process immediately."""
+    token_cache.discard(instance.key_hash)
+
+
+def forget_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """User post_save receiver: deactivation / role changes apply in this process immediately."""
+    # logins save last_login only, nothing cached changed
+    if update_fields is not None and not set(update_fields) & set(cached_user_fields()):
+        return
+    token_cache.discard_user(instance.pk)
+
+
+class ApiTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authorization: Bearer <key>   (or "Token <key>")
+    """
+
+    # compared as bytes: a non-UTF-8 scheme is just not ours
+    keywords = (b"bearer", b"token")
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() not in self.keywords:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        key_hash = hash_token(key)
+        fields = cached_user_fields()
+        entry = token_cache.get(key_hash)
+
+        if entry is None:
+            # token and user in one query
+            token = (
+                ApiToken.objects
+                .filter(key_hash=key_hash)
+                .select_related("user")
+                .only("expires_at", *(f"user__{name}" for name in fields))
+                .first()
+            )
+            if token is None:
+                raise exceptions.AuthenticationFailed("Invalid token.")
+            values = tuple(getattr(token.user, name) for name in fields)
+            entry = (token.user_id, values, token.expires_at, None)
+            token_cache.put(key_hash, token.user_id, values, token.expires_at)
+
+        _, values, expires_at, _ = entry
+        if expires_at is not None and expires_at <= timezone.now():
+            token_cache.discard(key_hash)
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        # a fresh instance per request, the rest of its fields are deferred
+        user = get_user_model().from_db(DEFAULT_DB_ALIAS, list(fields), list(values))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+
+        return user, key_hash
+
+    def authenticate_header(self, request):
+        return "Bearer"
@@ -0,0 +1,38 @@
+"""
+Counter tables updated with atomic upsert increments.
+
+Read-modify-write of a count races between gunicorn workers and score
+processes; INSERT ... ON CONFLICT DO UPDATE SET n = n + excluded.n
+doesn't, and needs no prior SELECT.
+"""
+from django.db import connection
+
+
+def add_counts(model, key_fields, count_fields, rows) -> None:
+    """
+    rows: (*keys, *deltas) tuples. Adds each delta to its counter column,
+    inserting the row when the key is new. `model` needs a unique
+    constraint on key_fields.
+    """
+    if not rows:
+        return
+
+    qn = connection.ops.quote_name
+    opts = model._meta
+    table = qn(opts.db_table)
+    keys = [qn(opts.get_field(f).column) for f in key_fields]
+    counts = [qn(opts.get_field(f).column) for f in count_fields]
+    columns = ", ".join(keys + counts)
+    values = ", ".join(["%s"] * (len(keys) + len(counts)))
+
+    if connection.vendor == "mysql":
+        updates = ", ".join(f"{c} = {c} + VALUES({c})" for c in counts)
+        sql = f"INSERT INTO {table} ({columns}) VALUES ({values}) ON DUPLICATE KEY UPDATE {updates}"
+    else:
+        # Postgres, SQLite >= 3.24
+        updates = ", ".join(f"{c} = {table}.{c} + excluded.{c}" for c in counts)
+        sql = (f"INSERT INTO {table} ({columns}) VALUES ({values}) "
+               f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}")
+
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
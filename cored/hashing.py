@@ -0,0 +1,207 @@
+"""
+Feature-hashing TF-IDF for ranking jobs in constant memory.
+
+TfidfVectorizer needs every document in memory to build a vocabulary
+(and rank_jobs_for_resume() capped it at 5,000 terms). Here terms are
+hashed into settings.HASHING_N_FEATURES buckets by a stateless
+HashingVectorizer, so any chunk of jobs can be vectorized on its own,
+and idf comes from document frequencies over the whole job catalog,
+kept in TermDocFreq and updated incrementally as jobs are created,
+edited, closed / reopened or deleted. Adding jobs never requires a refit.
+
+Only open jobs are counted: closed ones are never ranked
+(rank_catalog_for_resume() streams Job.objects.open()), so idf describes
+the catalog a resume is actually scored against.
+
+In hashing mode my_matches uses rank_catalog_for_resume() to pick the
+HASHING_CANDIDATES jobs a resume is scored against, rather than every
+open job (services.iter_score_missing_pairs).
+
+The counts are only maintained while settings.MATCH_VECTORIZER is
+"hashing" (the Job signals are connected in apps.ready), so the default
+exact mode pays nothing on job writes. After switching to hashing, run
+`manage.py hashing_index rebuild` once to catch up.
+
+Scores are close to the exact per-call fit, not identical: idf is
+catalog-wide rather than per call, and distinct terms can share a bucket.
+"""
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+
+from .counters import add_counts
+from .models import Job, TermDocFreq
+
+
+FIELDS = ("title", "description", "skills")
+# TermDocFreq.bucket holding the number of jobs counted
+N_DOCS_BUCKET = -1
+
+
+@lru_cache(maxsize=1)
+def hashing_vectorizer():
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # same tokenization as the exact mode's TfidfVectorizer, raw counts
+    return HashingVectorizer(
+        n_features=settings.HASHING_N_FEATURES,
+        alternate_sign=False,
+        norm=None,
+        stop_words="english",
+    )
+
+
+def _text(job, field):
+    value = job.get(field) if isinstance(job, dict) else getattr(job, field, "")
+    return value or ""
+
+
+# ===================== DOCUMENT FREQUENCIES =====================
+
+def tracking_enabled() -> bool:
+    """Whether job writes keep TermDocFreq current (hashing mode)."""
+    return settings.MATCH_VECTORIZER == "hashing"
+
+
+def count_new_jobs(jobs) -> None:
+    """For bulk_create()d jobs, which send no post_save: counts the open ones."""
+    if tracking_enabled():
+        record_jobs([j for j in jobs if j.status == Job.STATUS_OPEN])
+
+
+def record_jobs(jobs, sign: int = 1) -> None:
+    """
+    Counts (sign=1) or uncounts (sign=-1) jobs (Job objects or dicts)
+    in the catalog document frequencies.
+    """
+    import numpy as np
+
+    jobs = list(jobs)
+    if not jobs:
+        return
+
+    rows = []
+    for field in FIELDS:
+        X = hashing_vectorizer().transform([_text(j, field) for j in jobs]).tocsc()
+        # documents per bucket = non-zeros per column
+        per_bucket = np.diff(X.indptr)
+        buckets = np.flatnonzero(per_bucket)
+        rows.extend((field, int(b), sign * int(per_bucket[b])) for b in buckets)
+        rows.append((field, N_DOCS_BUCKET, sign * len(jobs)))
+
+    add_counts(TermDocFreq, ("field", "bucket"), ("df",), rows)
+    doc_freqs.expire()
+
+
+def rebuild_doc_freqs(chunk_size: int = 2000) -> int:
+    """Recounts every open job from scratch, chunk_size jobs in memory at a time."""
+    TermDocFreq.objects.all().delete()
+    total = 0
+    chunk = []
+    for job in Job.objects.open().order_by("id").values(*FIELDS).iterator(chunk_size=chunk_size):
+        chunk.append(job)
+        if len(chunk) >= chunk_size:
+            record_jobs(chunk)
+            total += len(chunk)
+            chunk = []
+    record_jobs(chunk)
+    return total + len(chunk)
+
+
+class _DocFreqCache:
+    """Per-process idf vectors, reloaded after settings.HASHING_DF_CACHE_TTL."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idf = None
+        self._loaded_at = 0.0
+
+    def expire(self):
+        with self._lock:
+            self._idf = None
+
+    def idf(self):
+        with self._lock:
+            if self._idf is None or time.monotonic() - self._loaded_at > settings.HASHING_DF_CACHE_TTL:
+                self._idf = self._load()
+                self._loaded_at = time.monotonic()
+            return self._idf
+
+    def _load(self):
+        import numpy as np
+
+        idf = {}
+        for field in FIELDS:
+            df = np.zeros(settings.HASHING_N_FEATURES)
+            n_docs = 0
+            for bucket, count in TermDocFreq.objects.filter(field=field).values_list("bucket", "df").iterator():
+                if bucket == N_DOCS_BUCKET:
+                    n_docs = count
+                elif 0 <= bucket < len(df):
+                    df[bucket] = max(count, 0)
+            # sklearn's smooth idf; the resume counts as one more document
+            idf[field] = np.log((2.0 + n_docs) / (1.0 + df)) + 1.0
+        return idf
+
+
+doc_freqs = _DocFreqCache()
+
+
+# ===================== SCORING =====================
+
+def _tfidf_rows(texts, idf):
+    from sklearn.preprocessing import normalize
+
+    X = hashing_vectorizer().transform(texts)
+    return normalize(X.multiply(idf).tocsr())
+
+
+class HashedQuery:
+    """A resume vectorized once per field; sims() scores a chunk of job texts."""
+
+    def __init__(self, resume_text: str):
+        self.idf = doc_freqs.idf()
+        self.vectors = {
+            field: _tfidf_rows([resume_text or ""], self.idf[field]).T.tocsc()
+            for field in FIELDS
+        }
+
+    def sims(self, field: str, texts):
+        import numpy as np
+
+        if not texts:
+            return np.zeros(0)
+        return np.asarray((_tfidf_rows(texts, self.idf[field]) @ self.vectors[field]).todense()).ravel()
+
+
+# ===================== SIGNALS (apps.ready) =====================
+
+def stash_job_text(sender, instance, raw=False, **kwargs):
+    """pre_save: remember the stored text / status so post_save can recount a change."""
+    if raw or instance.pk is None:
+        return
+    instance._hashing_old = Job.objects.filter(pk=instance.pk).values(*FIELDS, "status").first()
+
+
+def count_saved_job(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, "_hashing_old", None)
+    instance._hashing_old = None
+    was_counted = not created and old is not None and old["status"] == Job.STATUS_OPEN
+    is_counted = instance.status == Job.STATUS_OPEN
+    changed = was_counted and any(old[f] != _text(instance, f) for f in FIELDS)
+
+    # closed, or edited: the old text leaves the counts
+    if was_counted and (changed or not is_counted):
+        record_jobs([old], sign=-1)
+    # new, reopened, or edited
+    if is_counted and (changed or not was_counted):
+        record_jobs([instance])
+
+
+def uncount_deleted_job(sender, instance, **kwargs):
+    if instance.status == Job.STATUS_OPEN:
+        record_jobs([instance], sign=-1)
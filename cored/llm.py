@@ -1,5 +1,8 @@
 import re
-import pdfplumber
+import threading
+from functools import lru_cache
+
+from .metrics import timed
 
 # --------------------------------------------------
 # SKILL NORMALIZATION
@@ -30,6 +33,49 @@ ROLE_SKILLS = {
     },
 }
 
+# bump when the report engine below changes, so stored
+# MatchReport ATS fields get regenerated
+REPORT_MODEL_VERSION = "ats-v2"
+
+INTERVIEW_BANK = {
+    "python": ("How do generators differ from lists in Python?",
+               "Generators produce values lazily with yield, so they use constant memory and can model infinite streams; lists hold every element in memory."),
+    "django": ("How does the Django ORM avoid N+1 queries?",
+               "Use select_related for foreign keys (SQL join) and prefetch_related for many-to-many / reverse relations (one extra query per relation)."),
+    "drf": ("What is the role of a serializer in Django REST Framework?",
+            "It validates incoming data and converts model instances to and from primitive types for JSON responses."),
+    "api": ("What makes a REST API endpoint idempotent?",
+            "Repeating the same request leaves the server in the same state; GET, PUT and DELETE should be idempotent, POST usually is not."),
+    "sql": ("When would you add a database index?",
+            "On columns used in WHERE, JOIN or ORDER BY of frequent queries, weighing faster reads against slower writes and extra storage."),
+    "postgresql": ("What is the difference between a transaction's isolation levels in PostgreSQL?",
+                   "Read committed sees only committed data per statement, repeatable read keeps one snapshot per transaction, serializable also prevents write skew."),
+    "mysql": ("InnoDB vs MyISAM?",
+              "InnoDB supports transactions, row-level locking and foreign keys; MyISAM only table locks and no transactions."),
+    "docker": ("What is the difference between a Docker image and a container?",
+               "An image is an immutable layered template; a container is a running instance of an image with its own writable layer."),
+    "redis": ("What are common uses of Redis in a web backend?",
+              "Caching, sessions, rate limiting, queues / pub-sub and counters, thanks to in-memory speed and atomic operations."),
+    "celery": ("Why would you use Celery in a Django project?",
+               "To run slow or scheduled work (emails, reports, scoring) in background workers instead of the request cycle."),
+    "aws": ("Which AWS services would you use to deploy a Django app?",
+            "For example EC2 or ECS for the app, RDS for PostgreSQL, S3 for media / static files and CloudFront as CDN."),
+    "javascript": ("Explain the JavaScript event loop.",
+                   "Synchronous code runs on the call stack; callbacks from the task and microtask queues run when the stack is empty, microtasks (promises) first."),
+    "react": ("What are React hooks?",
+              "Functions like useState and useEffect that let function components hold state and run side effects."),
+    "html": ("Why is semantic HTML important?",
+             "Elements like header, nav and article give meaning that helps accessibility, SEO and maintainability."),
+    "css": ("Flexbox vs CSS Grid?",
+            "Flexbox lays out items along one axis; Grid lays out rows and columns together in two dimensions."),
+    "redux": ("When is Redux useful?",
+              "When many components share complex state that benefits from a single store and predictable, traceable updates."),
+    "tailwind": ("What is utility-first CSS?",
+                 "Styling with small single-purpose classes in markup instead of writing custom CSS per component."),
+    "webpack": ("What does webpack do?",
+                "It bundles modules and assets into optimized files, with loaders for transforms and code splitting for lazy loading."),
+}
+
 STOPWORDS = {
     "and","or","the","a","an","to","in","of","for","with",
     "on","at","is","are","as","be","job","role","developer",
@@ -65,10 +111,65 @@ def infer_role(job_title: str) -> str:
     return "backend"
 
 # --------------------------------------------------
-# PDF TEXT EXTRACTION
+# PDF / DOCX TEXT EXTRACTION
 # --------------------------------------------------
 
-def extract_text_from_pdf(file_path: str) -> str:
+# fast pass is good enough when it yields at least this much text per page
+MIN_CHARS_PER_PAGE = 80
+# ... and at most this share of unreadable characters ((cid:..), U+FFFD, controls)
+MAX_GARBLED_RATIO = 0.05
+
+_GARBLED_RE = re.compile(r"\(cid:\d+\)|[\ufffd\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# pdfium is not thread safe
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _looks_usable(text: str, pages: int) -> bool:
+    stripped = text.strip()
+    if len(stripped) < MIN_CHARS_PER_PAGE * max(1, pages):
+        return False
+    garbled = sum(len(m) for m in _GARBLED_RE.findall(stripped))
+    return garbled / len(stripped) <= MAX_GARBLED_RATIO
+
+
+@timed("pdf_extract_fast")
+def _pdf_text_fast(file_path: str):
+    """
+    Raw text layer via pdfium (C, no layout analysis).
+    Returns (text, page_count), or (None, 0) if pdfium can't read the file.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None, 0
+
+    parts = []
+    with _PDFIUM_LOCK:
+        try:
+            pdf = pdfium.PdfDocument(file_path)
+        except Exception:
+            return None, 0
+        try:
+            for i in range(len(pdf)):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            pages = len(pdf)
+        except Exception:
+            return None, 0
+        finally:
+            pdf.close()
+
+    return "\n".join(parts).replace("\r\n", "\n").replace("\r", "\n"), pages
+
+
+@timed("pdf_extract_layout")
+def _pdf_text_layout(file_path: str) -> str:
+    import pdfplumber  # heavy, only load when a PDF is actually parsed
+
     text = ""
     try:
         with pdfplumber.open(file_path) as pdf:
@@ -76,7 +177,60 @@ def extract_text_from_pdf(file_path: str) -> str:
                 text += page.extract_text() or ""
     except Exception:
         pass
-    return text.lower()
+    return text
+
+
+@timed("pdf_extract")
+def extract_text_from_pdf(file_path: str) -> str:
+    """
+    Tiered: pdfium's raw text layer first, pdfplumber's character-level
+    layout analysis only when that gives too little or garbled text.
+    """
+    text, pages = _pdf_text_fast(file_path)
+    if text is None or not _looks_usable(text, pages):
+        layout_text = _pdf_text_layout(file_path)
+        if len(layout_text.strip()) > len((text or "").strip()):
+            text = layout_text
+    return (text or "").lower()
+
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+@timed("docx_extract")
+def extract_text_from_docx(file_path: str) -> str:
+    """Paragraph text of word/document.xml (tables included), no extra dependency."""
+    import zipfile
+    from xml.etree import ElementTree
+
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            root = ElementTree.fromstring(zf.read("word/document.xml"))
+    except Exception:
+        return ""
+
+    lines = []
+    for para in root.iter(f"{_W_NS}p"):
+        chunks = []
+        for node in para.iter():
+            if node.tag == f"{_W_NS}t":
+                chunks.append(node.text or "")
+            elif node.tag == f"{_W_NS}tab":
+                chunks.append(" ")
+            elif node.tag in (f"{_W_NS}br", f"{_W_NS}cr"):
+                chunks.append("\n")
+        lines.append("".join(chunks))
+    return "\n".join(lines).lower()
+
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+
+
+def extract_resume_text(file_path: str) -> str:
+    """Lowercased text of a resume file, picked by extension (PDF / DOCX)."""
+    if str(file_path).lower().endswith(".docx"):
+        return extract_text_from_docx(file_path)
+    return extract_text_from_pdf(file_path)
 
 # --------------------------------------------------
 # MAIN ATS ENGINE
@@ -84,8 +238,18 @@ def extract_text_from_pdf(file_path: str) -> str:
 
 def generate_ai_report(resume_file_path, job_title, job_desc, job_skills):
 
-    resume_text = extract_text_from_pdf(resume_file_path)
-    resume_skills = extract_skills(resume_text)
+    resume_text = extract_resume_text(resume_file_path)
+    return generate_ai_report_from_skills(
+        extract_skills(resume_text), job_title, job_desc, job_skills
+    )
+
+
+@timed("ats_report")
+def generate_ai_report_from_skills(resume_skills, job_title, job_desc, job_skills):
+    """
+    Same as generate_ai_report(), but takes the already extracted resume
+    skills so one parsed PDF can be scored against many jobs.
+    """
 
     job_text = f"{job_title} {job_desc} {job_skills}".lower()
     job_words = extract_skills(job_text)
@@ -115,11 +279,65 @@ def generate_ai_report(resume_file_path, job_title, job_desc, job_skills):
     # MISSING SKILLS
     # ---------------------------
 
-    missing_skills = list((role_core | role_plus) - resume_skills)[:8]
+    # core gaps first, they weigh twice as much in the score
+    missing_skills = (sorted(role_core - resume_skills) + sorted(role_plus - resume_skills))[:8]
+    matched_skills = sorted((role_core | role_plus) & resume_skills)
 
     return {
         "ats_score": ats_score,
         "missing_skills": missing_skills,
         "resume_skills_found": sorted(list(resume_skills)),
         "role_detected": role,
+        **build_report_content(role, tuple(matched_skills), tuple(missing_skills)),
+    }
+
+# --------------------------------------------------
+# REPORT CONTENT
+# --------------------------------------------------
+
+@lru_cache(maxsize=4096)
+def build_report_content(role: str, matched: tuple, missing: tuple) -> dict:
+    """
+    Improvements, summary, cover letter and interview questions for one
+    skill-gap signature (role, matched role skills, missing role skills).
+    Many (resume, job) pairs share a signature, so this is cached.
+    Callers must not mutate the returned lists.
+    """
+    core = ROLE_SKILLS[role]["core"]
+    title = f"{role.capitalize()} developer"
+
+    improvements = [
+        f"Add hands-on {skill} experience (project, internship or certification) - "
+        f"it is a {'core' if skill in core else 'bonus'} skill for {role} roles."
+        for skill in missing
+    ]
+    if not matched:
+        improvements.append(f"List your {role} skills explicitly in a dedicated Skills section.")
+
+    strengths = ", ".join(matched[:6]) if matched else "modern development tools"
+    summary = f"{title} skilled in {strengths}."
+    if missing:
+        summary += f" Currently growing experience in {', '.join(missing[:3])}."
+
+    cover_letter = (
+        f"Dear Hiring Manager,\n\n"
+        f"I am excited to apply for this {role} position. "
+        f"My experience with {strengths} has prepared me to contribute from day one"
+        + (f", and I am actively strengthening my {', '.join(missing[:3])} skills." if missing else ".")
+        + "\n\nThank you for your consideration.\n"
+    )
+
+    interview_questions = []
+    for skill in list(matched[:3]) + list(missing[:2]):
+        q, ideal = INTERVIEW_BANK.get(skill, (
+            f"Describe a project where you used {skill}.",
+            f"Explain the problem, why {skill} fit, what you built and the measurable result.",
+        ))
+        interview_questions.append({"skill": skill, "q": q, "ideal_answer": ideal})
+
+    return {
+        "improvements": improvements,
+        "tailored_summary": summary,
+        "cover_letter": cover_letter,
+        "interview_questions": interview_questions,
     }
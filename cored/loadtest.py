@@ -0,0 +1,400 @@
+"""
+Record / replay load testing.
+
+Traffic files are JSONL, one request per line:
+
+    {"ts": 1700000000.12, "method": "GET", "route": "jobs-matches",
+     "path": "/api/jobs/12/matches/", "query": {"limit": "10"},
+     "user": "3f9a0c1d2e", "status": 200, "ms": 84.1, "body_bytes": 0}
+
+They are written by TrafficRecorderMiddleware (TRAFFIC_RECORD_PATH) or
+by synthesize_traffic(), and replayed by `manage.py loadtest replay`
+against a server seeded with synthetic users, resumes and jobs.
+Request bodies are never recorded; replay generates synthetic ones.
+"""
+import hashlib
+import http.client
+import json
+import math
+import random
+import re
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+
+
+WORDS = (
+    "python django drf api sql postgresql mysql docker redis celery aws "
+    "javascript react html css backend frontend developed built designed "
+    "deployed optimized team project internship university experience "
+    "rest services database queries performance testing git linux"
+).split()
+
+SEED_PREFIX = "loadtest_"
+SEED_PASSWORD = "loadtest-pass"
+
+# safe to resend after a dropped keep-alive connection
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+# ===================== SYNTHETIC DOCUMENTS =====================
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_pdf(pages=2, lines_per_page=45, rng=random):
+    """Minimal valid PDF (Helvetica text, one content stream per page)."""
+    objects = []
+    page_ids = [4 + 2 * i for i in range(pages)]
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for i in range(pages):
+        lines = [" ".join(rng.choices(WORDS, k=12)).capitalize() for _ in range(lines_per_page)]
+        body = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in lines
+        ) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_ids[i] + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def synthetic_docx(path, paragraphs=60, rng=random):
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    paras = "".join(
+        f"<w:p><w:r><w:t>{' '.join(rng.choices(WORDS, k=12))}</w:t></w:r></w:p>"
+        for _ in range(paragraphs)
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>",
+        )
+        zf.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>',
+        )
+        zf.writestr(
+            "word/document.xml",
+            f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{ns}"><w:body>{paras}</w:body></w:document>',
+        )
+
+
+def synthetic_job(rng=random):
+    return {
+        "title": " ".join(rng.choices(WORDS, k=3)).title() + " Developer",
+        "description": " ".join(rng.choices(WORDS, k=80)),
+        "skills": ", ".join(sorted(set(rng.choices(WORDS, k=8)))),
+    }
+
+
+# ===================== RECORDING =====================
+
+def user_tag(user) -> str:
+    """Stable pseudonym for a user in traffic files (no ids / names)."""
+    if user is None or not user.is_authenticated:
+        return ""
+    return hashlib.sha256(f"{settings.SECRET_KEY}:{user.pk}".encode()).hexdigest()[:10]
+
+
+def traffic_record(request, response, route, ms) -> dict:
+    uploads = {name: f.size for name, f in request.FILES.items()}
+    record = {
+        "ts": round(time.time(), 3),
+        "method": request.method,
+        "route": route,
+        "path": request.path,
+        "query": {k: v for k, v in request.GET.items() if k != "profile"},
+        "user": user_tag(getattr(request, "user", None)),
+        "status": response.status_code,
+        "ms": round(ms, 2),
+        "body_bytes": int(request.META.get("CONTENT_LENGTH") or 0),
+    }
+    if uploads:
+        record["uploads"] = uploads
+    return record
+
+
+class TrafficWriter:
+    """Appends records to a JSONL file, one write() per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def load_traffic(path):
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records.sort(key=lambda r: r.get("ts", 0))
+    return records
+
+
+# ===================== SYNTHETIC DASHBOARD WORKFLOW =====================
+
+def synthesize_traffic(sessions=50, jobs=100, arrival_rate=2.0, think=1.0, upload_ratio=0.1, seed=0):
+    """
+    Records of `sessions` users going through the dashboard workflow:
+    log in (API token), dashboard stats, my_matches, job list, a job's
+    matches with random filters, sometimes a resume upload. Sessions
+    arrive at `arrival_rate` per second, steps are `think` seconds apart
+    on average.
+    """
+    rng = random.Random(seed)
+    records = []
+    start = 0.0
+
+    for s in range(sessions):
+        start += rng.expovariate(arrival_rate)
+        t = start
+        user = f"s{s:05d}"
+
+        def add(method, route, path, query=None, body_bytes=0, uploads=None):
+            nonlocal t
+            rec = {
+                "ts": round(t, 3), "method": method, "route": route, "path": path,
+                "query": query or {}, "user": user, "body_bytes": body_bytes,
+            }
+            if uploads:
+                rec["uploads"] = uploads
+            records.append(rec)
+            t += rng.expovariate(1.0 / think) if think > 0 else 0
+
+        add("POST", "auth_token", "/api/auth-token/", body_bytes=60)
+        add("GET", "dashboard_stats", "/api/dashboard-stats/")
+        add("GET", "resumes-my-matches", "/api/resumes/my_matches/", {"stream": "1"})
+        add("GET", "jobs-list", "/api/jobs/", {"page": "1", "ordering": "-created_at"})
+
+        query = {"stream": "1", "limit": str(rng.choice([5, 10, 20]))}
+        if rng.random() < 0.5:
+            query["min_score"] = str(rng.choice([10, 20, 30]))
+        if rng.random() < 0.3:
+            query["must_have"] = ", ".join(rng.sample(WORDS[:12], 2))
+        add("GET", "jobs-matches", f"/api/jobs/{rng.randrange(1, jobs + 1)}/matches/", query)
+
+        if rng.random() < upload_ratio:
+            add("POST", "resumes-list", "/api/resumes/", body_bytes=12000, uploads={"file": 12000})
+
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+# ===================== REPLAY =====================
+
+_JOB_PATH = re.compile(r"^/api/jobs/(\d+)/")
+_RESUME_PATH = re.compile(r"^/api/resumes/(\d+)/")
+
+
+class VirtualUser:
+    def __init__(self, username, token, resume_ids):
+        self.username = username
+        self.token = token
+        self.resume_ids = resume_ids
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100.0
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Replayer:
+    """
+    Replays traffic records against base_url with `concurrency` client
+    threads (keep-alive connection each). Recorded users are mapped
+    round-robin onto `users`, recorded job / resume ids onto the seeded
+    ones. speed=1 keeps the recorded pacing, 2 twice as fast, 0 sends
+    every request as soon as a thread is free.
+    """
+
+    def __init__(self, base_url, users, job_ids, concurrency=8, speed=1.0, timeout=60, seed=0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.users = users
+        self.job_ids = job_ids
+        self.concurrency = max(1, concurrency)
+        self.speed = speed
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self._local = threading.local()
+        self._user_map = {}
+        self._map_lock = threading.Lock()
+
+    # ---------- mapping ----------
+    def _user_for(self, tag):
+        with self._map_lock:
+            user = self._user_map.get(tag)
+            if user is None:
+                user = self._user_map[tag] = self.users[len(self._user_map) % len(self.users)]
+            return user
+
+    def _map_path(self, path, user):
+        m = _JOB_PATH.match(path)
+        if m and self.job_ids:
+            job_id = self.job_ids[int(m.group(1)) % len(self.job_ids)]
+            return f"/api/jobs/{job_id}/" + path[m.end():]
+        m = _RESUME_PATH.match(path)
+        if m and user.resume_ids:
+            resume_id = user.resume_ids[int(m.group(1)) % len(user.resume_ids)]
+            return f"/api/resumes/{resume_id}/" + path[m.end():]
+        return path
+
+    def _body(self, record, user):
+        """(body, content_type) synthesized for a recorded write request."""
+        route, method = record.get("route"), record["method"]
+        if method in ("GET", "HEAD", "DELETE"):
+            return None, None
+        if route == "auth_token":
+            body = {"username": user.username, "password": SEED_PASSWORD, "name": "loadtest"}
+            return json.dumps(body).encode(), "application/json"
+        if record.get("uploads"):
+            boundary = "----hiredsense-loadtest"
+            pages = max(1, record["uploads"].get("file", 0) // 6000)
+            pdf = synthetic_pdf(pages=pages, rng=self.rng)
+            parts = [
+                f'--{boundary}\r\nContent-Disposition: form-data; name="title"\r\n\r\nLoad test resume\r\n'.encode(),
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="resume.pdf"\r\n'
+                f"Content-Type: application/pdf\r\n\r\n".encode() + pdf + b"\r\n",
+                f"--{boundary}--\r\n".encode(),
+            ]
+            return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+        if route == "jobs-bulk":
+            count = max(1, record.get("body_bytes", 0) // 400)
+            return json.dumps([synthetic_job(self.rng) for _ in range(count)]).encode(), "application/json"
+        if route == "jobs-list":
+            return json.dumps(synthetic_job(self.rng)).encode(), "application/json"
+        return b"{}", "application/json"
+
+    # ---------- HTTP ----------
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def _send(self, record):
+        user = self._user_for(record.get("user", ""))
+        path = self._map_path(record["path"], user)
+        if record.get("query"):
+            path += "?" + urlencode(record["query"])
+        body, content_type = self._body(record, user)
+
+        headers = {"Host": self.host, "Accept": "application/json"}
+        if record.get("route") != "auth_token":
+            headers["Authorization"] = f"Bearer {user.token}"
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        # a failed POST may still have reached the server: only methods that
+        # are safe to send twice get the reconnect-and-retry
+        attempts = 2 if record["method"].upper() in IDEMPOTENT_METHODS else 1
+
+        started = time.perf_counter()
+        for attempt in range(1, attempts + 1):
+            conn = self._connection()
+            try:
+                conn.request(record["method"], path, body=body, headers=headers)
+                resp = conn.getresponse()
+                size = len(resp.read())
+                status = resp.status
+                if resp.getheader("Connection", "").lower() == "close":
+                    conn.close()
+                    self._local.conn = None
+                break
+            except (http.client.HTTPException, OSError):
+                # server closed the keep-alive connection: reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt == attempts:
+                    status, size = 0, 0
+        return record.get("route") or record["path"], status, (time.perf_counter() - started) * 1000, size
+
+    def run(self, records, progress=None):
+        """Returns (results, wall_seconds); results are (route, status, ms, bytes)."""
+        if not records:
+            return [], 0.0
+        t0 = records[0].get("ts", 0)
+        started = time.monotonic()
+        results = []
+
+        def task(record):
+            if self.speed > 0:
+                delay = (record.get("ts", t0) - t0) / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            return self._send(record)
+
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            # submit in order so early requests start first
+            for i, result in enumerate(pool.map(task, records), 1):
+                results.append(result)
+                if progress and i % 100 == 0:
+                    progress(i, len(records))
+        return results, time.monotonic() - started
+
+
+def summarize(results, wall_seconds):
+    """Per-route and overall throughput / latency percentiles."""
+    by_route = defaultdict(list)
+    for route, status, ms, size in results:
+        by_route[route].append((status, ms))
+    by_route["ALL"] = [(status, ms) for _, status, ms, _ in results]
+
+    summary = {}
+    for route, rows in by_route.items():
+        latencies = sorted(ms for _, ms in rows)
+        summary[route] = {
+            "requests": len(rows),
+            "ok": sum(1 for s, _ in rows if 200 <= s < 400),
+            "shed": sum(1 for s, _ in rows if s in (429, 503)),
+            "errors": sum(1 for s, _ in rows if s == 0 or (s >= 400 and s not in (429, 503))),
+            "rps": len(rows) / wall_seconds if wall_seconds else 0.0,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "max_ms": latencies[-1] if latencies else None,
+        }
+    return summary
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from cored.archive import archivable_jobs, archive_closed_jobs, close_stale_jobs, restore_job
+from cored.models import Job, MatchReport, MatchReportArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "MatchReport archival: `run` closes jobs older than JOB_MAX_AGE_DAYS and "
+        "moves the reports of jobs closed ARCHIVE_AFTER_CLOSED_DAYS ago into "
+        "compressed archive rows (cron it), `restore` brings a job's reports "
+        "back, `status` shows hot vs archived counts."
+    )
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        run = sub.add_parser("run", help="close stale jobs, archive closed jobs' reports")
+        run.add_argument("--max-age-days", type=int, help="default settings.JOB_MAX_AGE_DAYS (0 = never close)")
+        run.add_argument("--closed-days", type=int, help="default settings.ARCHIVE_AFTER_CLOSED_DAYS")
+        run.add_argument("--limit", type=int, default=0, help="archive at most N jobs this run")
+        run.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+
+        restore = sub.add_parser("restore", help="move a job's archived reports back (the job stays closed)")
+        restore.add_argument("job_id", type=int)
+
+        sub.add_parser("status", help="hot vs archived report counts")
+
+    def handle(self, *args, **opts):
+        getattr(self, "_" + opts["action"])(opts)
+
+    def _run(self, opts):
+        if opts["dry_run"]:
+            jobs = archivable_jobs(opts["closed_days"])
+            rows = MatchReport.objects.filter(job__in=jobs).count()
+            self.stdout.write(f"Would archive {rows} reports of {jobs.count()} closed jobs")
+            return
+
+        started = time.monotonic()
+        closed = close_stale_jobs(opts["max_age_days"])
+        jobs, rows = archive_closed_jobs(opts["closed_days"], limit=opts["limit"] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Closed {closed} stale jobs; archived {rows} reports of {jobs} jobs "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
+
+    def _restore(self, opts):
+        job = Job.objects.filter(id=opts["job_id"]).first()
+        if job is None:
+            raise CommandError(f"No job #{opts['job_id']}")
+        restored = restore_job(job)
+        self.stdout.write(self.style.SUCCESS(f"Restored {restored} reports of job #{job.id} ({job.status})"))
+
+    def _status(self, opts):
+        archives = MatchReportArchive.objects.aggregate(n=Sum("report_count"))["n"] or 0
+        self.stdout.write(
+            f"jobs: {Job.objects.open().count()} open, "
+            f"{Job.objects.filter(status=Job.STATUS_CLOSED).count()} closed\n"
+            f"reports: {MatchReport.objects.count()} hot, {archives} archived "
+            f"in {MatchReportArchive.objects.count()} job archives"
+        )
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from cored.authentication import create_api_token
+
+
+class Command(BaseCommand):
+    help = "Create an API bearer token for a user (e.g. an ATS sync integration)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--name", default="", help="label shown in the admin / logs")
+        parser.add_argument("--days", type=int, help="lifetime in days (0 = never expires)")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=opts["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {opts['username']!r}")
+
+        token, key = create_api_token(user, name=opts["name"], days=opts["days"])
+        expires = token.expires_at.isoformat() if token.expires_at else "never"
+        self.stdout.write(f"Token (shown once): {key}")
+        self.stdout.write(f"Expires: {expires}")
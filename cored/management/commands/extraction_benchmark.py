@@ -0,0 +1,76 @@
+import glob
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cored.llm import (
+    _pdf_text_fast,
+    _pdf_text_layout,
+    extract_text_from_pdf,
+    extract_text_from_docx,
+)
+from cored.loadtest import synthetic_pdf, synthetic_docx
+
+
+class Command(BaseCommand):
+    help = "Per-document text extraction time: fast (pdfium) vs layout (pdfplumber) vs tiered, plus DOCX."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=str(settings.BASE_DIR / "resumes"),
+                            help="directory with sample PDFs (default: resumes/)")
+        parser.add_argument("--synthetic", type=int, default=50, help="synthetic PDFs / DOCX to generate")
+        parser.add_argument("--pages", type=int, default=2, help="pages per synthetic PDF")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+        samples = sorted(glob.glob(os.path.join(opts["path"], "*.pdf")))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            synthetic = []
+            docx = []
+            for i in range(opts["synthetic"]):
+                pdf_path = os.path.join(tmp, f"synthetic_{i}.pdf")
+                with open(pdf_path, "wb") as f:
+                    f.write(synthetic_pdf(pages=opts["pages"], rng=rng))
+                synthetic.append(pdf_path)
+
+                docx_path = os.path.join(tmp, f"synthetic_{i}.docx")
+                synthetic_docx(docx_path, rng=rng)
+                docx.append(docx_path)
+
+            extractors = [
+                ("fast (pdfium)", lambda p: _pdf_text_fast(p)[0] or ""),
+                ("layout (pdfplumber)", _pdf_text_layout),
+                ("tiered", extract_text_from_pdf),
+            ]
+
+            self.stdout.write(f"{'corpus':22}{'extractor':22}{'docs':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'chars':>8}")
+            for corpus, paths in (("resumes/ samples", samples), ("synthetic pdf", synthetic)):
+                for label, fn in extractors:
+                    self._report(corpus, label, fn, paths)
+            self._report("synthetic docx", "docx (zip+xml)", extract_text_from_docx, docx)
+
+    def _report(self, corpus, label, fn, paths):
+        if not paths:
+            self.stdout.write(f"{corpus:22}{label:22}{0:>6}{'-':>10}{'-':>10}{'-':>10}{'-':>8}")
+            return
+
+        timings, chars = [], []
+        for path in paths:
+            started = time.perf_counter()
+            text = fn(path)
+            timings.append((time.perf_counter() - started) * 1000)
+            chars.append(len(text))
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+        self.stdout.write(
+            f"{corpus:22}{label:22}{len(paths):>6}{statistics.mean(timings):>10.1f}"
+            f"{statistics.median(timings):>10.1f}{p95:>10.1f}{int(statistics.mean(chars)):>8}"
+        )
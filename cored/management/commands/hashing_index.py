@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cored.hashing import rebuild_doc_freqs
+from cored.models import Resume, TermDocFreq
+from cored.services import rank_catalog_for_resume
+
+
+class Command(BaseCommand):
+    help = (
+        "Hashing vectorizer: `rebuild` recounts the open jobs' document frequencies "
+        "from scratch (kept current by Job signals while MATCH_VECTORIZER=hashing; "
+        "run it after switching), `rank` "
+        "streams the whole catalog against one resume and prints its top jobs."
+    )
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        rebuild = sub.add_parser("rebuild", help="recount document frequencies over all open jobs")
+        rebuild.add_argument("--chunk-size", type=int, default=2000)
+
+        rank = sub.add_parser("rank", help="top jobs of the catalog for a resume")
+        rank.add_argument("resume_id", type=int)
+        rank.add_argument("--top-k", type=int, default=20)
+
+    def handle(self, *args, **opts):
+        getattr(self, "_" + opts["action"])(opts)
+
+    def _rebuild(self, opts):
+        if opts["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be >= 1")
+        started = time.monotonic()
+        jobs = rebuild_doc_freqs(chunk_size=opts["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Counted {jobs} jobs into {TermDocFreq.objects.count()} buckets "
+            f"in {time.monotonic() - started:.1f}s"
+        ))
+
+    def _rank(self, opts):
+        resume = Resume.objects.filter(id=opts["resume_id"]).first()
+        if resume is None:
+            raise CommandError(f"No resume #{opts['resume_id']}")
+
+        started = time.monotonic()
+        ranked = rank_catalog_for_resume(resume.content or "", top_k=max(1, opts["top_k"]))
+        elapsed = time.monotonic() - started
+
+        for n, entry in enumerate(ranked, 1):
+            self.stdout.write(f"{n:>3}. {entry['score']:6.2f}  #{entry['id']} {entry['title']}")
+        self.stdout.write(f"ranked the catalog in {elapsed:.2f}s")
@@ -0,0 +1,43 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cored.services import iter_job_rows, guess_import_format, bulk_import_jobs
+
+
+class Command(BaseCommand):
+    help = "Bulk import jobs from a CSV or JSONL file and score them against all resumes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (title,description,skills header) or JSONL file")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from file extension")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--no-score", action="store_true", help="insert only, skip MatchReport scoring")
+
+    def handle(self, *args, **opts):
+        path = opts["path"]
+
+        try:
+            fmt = opts["format"] or guess_import_format(path)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.monotonic()
+        try:
+            with open(path, encoding="utf-8", newline="") as f:
+                result = bulk_import_jobs(
+                    iter_job_rows(f, fmt),
+                    batch_size=opts["batch_size"],
+                    score=not opts["no_score"],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for err in result["errors"]:
+            self.stderr.write(f"row {err['row']}: {json.dumps(err['errors'])}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} jobs, wrote {result['scored']} match reports, "
+            f"{result['error_count']} invalid rows in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,187 @@
+import json
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+
+from cored.authentication import create_api_token
+from cored.hashing import count_new_jobs
+from cored.loadtest import (
+    SEED_PASSWORD,
+    SEED_PREFIX,
+    Replayer,
+    VirtualUser,
+    load_traffic,
+    summarize,
+    synthesize_traffic,
+    synthetic_job,
+    synthetic_pdf,
+)
+from cored.models import ApiToken, Job, Resume, User
+from cored.services import ensure_resume_content
+
+
+class Command(BaseCommand):
+    help = (
+        "Load testing: `seed` synthetic users / resumes / jobs, `synthesize` a "
+        "dashboard-workflow traffic file, `replay` a recorded or synthetic "
+        "traffic file against a running server and report latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        seed = sub.add_parser("seed", help="create loadtest_* users with resumes, plus jobs")
+        seed.add_argument("--users", type=int, default=20)
+        seed.add_argument("--resumes-per-user", type=int, default=1)
+        seed.add_argument("--jobs", type=int, default=100)
+        seed.add_argument("--pages", type=int, default=2, help="pages per synthetic resume PDF")
+        seed.add_argument("--reset", action="store_true", help="delete existing loadtest_* users first")
+        seed.add_argument("--seed", type=int, default=0)
+
+        synth = sub.add_parser("synthesize", help="write a synthetic dashboard-workflow traffic file")
+        synth.add_argument("out")
+        synth.add_argument("--sessions", type=int, default=50)
+        synth.add_argument("--rate", type=float, default=2.0, help="new sessions per second")
+        synth.add_argument("--think", type=float, default=1.0, help="mean seconds between a session's requests")
+        synth.add_argument("--upload-ratio", type=float, default=0.1)
+        synth.add_argument("--seed", type=int, default=0)
+
+        replay = sub.add_parser("replay", help="replay a traffic file against --base-url")
+        replay.add_argument("traffic")
+        replay.add_argument("--base-url", default="http://127.0.0.1:8000")
+        replay.add_argument("--concurrency", type=int, default=8)
+        replay.add_argument("--speed", type=float, default=1.0,
+                            help="1 = recorded pacing, 2 = twice as fast, 0 = as fast as possible")
+        replay.add_argument("--limit", type=int, default=0, help="replay only the first N requests")
+        replay.add_argument("--timeout", type=float, default=60)
+        replay.add_argument("--json", action="store_true", help="print the summary as JSON")
+        replay.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **opts):
+        getattr(self, "_" + opts["action"])(opts)
+
+    # ---------- seed ----------
+    def _seed(self, opts):
+        rng = random.Random(opts["seed"])
+
+        if opts["reset"]:
+            deleted, _ = User.objects.filter(username__startswith=SEED_PREFIX).delete()
+            self.stdout.write(f"Deleted {deleted} rows of previous loadtest data")
+
+        # one hash for every seeded user (same password)
+        password = make_password(SEED_PASSWORD)
+        existing = User.objects.filter(username__startswith=SEED_PREFIX).count()
+        users = User.objects.bulk_create([
+            User(
+                username=f"{SEED_PREFIX}{i:04d}",
+                password=password,
+                is_recruiter=(i % 4 == 0),
+            )
+            for i in range(existing, existing + opts["users"])
+        ])
+
+        resumes = 0
+        for user in User.objects.filter(username__in=[u.username for u in users]):
+            for n in range(opts["resumes_per_user"]):
+                resume = Resume(user=user, title=f"Load test resume {n + 1}")
+                resume.file.save(
+                    f"loadtest_{user.id}_{n}.pdf",
+                    ContentFile(synthetic_pdf(pages=opts["pages"], rng=rng)),
+                    save=True,
+                )
+                # uploads extract at create time, so seeded resumes do too
+                ensure_resume_content(resume)
+                resumes += 1
+
+        jobs = Job.objects.bulk_create([Job(**synthetic_job(rng)) for _ in range(opts["jobs"])])
+        count_new_jobs(jobs)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(users)} users (password {SEED_PASSWORD!r}), "
+            f"{resumes} resumes, {opts['jobs']} jobs"
+        ))
+
+    # ---------- synthesize ----------
+    def _synthesize(self, opts):
+        records = synthesize_traffic(
+            sessions=opts["sessions"],
+            jobs=max(1, Job.objects.count()),
+            arrival_rate=opts["rate"],
+            think=opts["think"],
+            upload_ratio=opts["upload_ratio"],
+            seed=opts["seed"],
+        )
+        with open(opts["out"], "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        span = records[-1]["ts"] - records[0]["ts"] if records else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(records)} requests ({opts['sessions']} sessions over {span:.0f}s) to {opts['out']}"
+        ))
+
+    # ---------- replay ----------
+    def _replay(self, opts):
+        try:
+            records = load_traffic(opts["traffic"])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {opts['traffic']}: {e}")
+        if opts["limit"]:
+            records = records[:opts["limit"]]
+
+        seeded = list(User.objects.filter(username__startswith=SEED_PREFIX).order_by("id"))
+        if not seeded:
+            raise CommandError("No loadtest users; run `manage.py loadtest seed` first.")
+
+        tokens = []
+        users = []
+        for user in seeded:
+            token, key = create_api_token(user, name="loadtest", days=1)
+            tokens.append(token.id)
+            users.append(VirtualUser(
+                user.username,
+                key,
+                list(Resume.objects.filter(user=user).values_list("id", flat=True)),
+            ))
+        job_ids = list(Job.objects.order_by("id").values_list("id", flat=True))
+
+        replayer = Replayer(
+            opts["base_url"],
+            users,
+            job_ids,
+            concurrency=opts["concurrency"],
+            speed=opts["speed"],
+            timeout=opts["timeout"],
+            seed=opts["seed"],
+        )
+        self.stderr.write(
+            f"Replaying {len(records)} requests from {len(users)} users against "
+            f"{opts['base_url']} (concurrency {opts['concurrency']}, speed {opts['speed']})"
+        )
+        try:
+            results, wall = replayer.run(
+                records, progress=lambda i, n: self.stderr.write(f"  {i}/{n}")
+            )
+        finally:
+            for token in ApiToken.objects.filter(id__in=tokens):
+                token.delete()
+
+        summary = summarize(results, wall)
+        if opts["json"]:
+            self.stdout.write(json.dumps({"wall_seconds": wall, "routes": summary}, indent=2))
+            return
+
+        fmt = lambda v: "-" if v is None else f"{v:.1f}"
+        self.stdout.write(
+            f"{'route':28}{'reqs':>7}{'ok':>7}{'shed':>6}{'err':>6}{'rps':>8}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        )
+        for route in sorted(summary, key=lambda r: (r == "ALL", r)):
+            s = summary[route]
+            self.stdout.write(
+                f"{route[:27]:28}{s['requests']:>7}{s['ok']:>7}{s['shed']:>6}{s['errors']:>6}"
+                f"{s['rps']:>8.2f}{fmt(s['p50_ms']):>9}{fmt(s['p95_ms']):>9}"
+                f"{fmt(s['p99_ms']):>9}{fmt(s['max_ms']):>9}"
+            )
+        self.stdout.write(f"wall time {wall:.1f}s; shed = 429/503 from admission control")
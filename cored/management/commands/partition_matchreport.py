@@ -0,0 +1,123 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+TABLE = "cored_matchreport"
+
+
+def _is_partitioned(cursor):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [TABLE])
+    return cursor.fetchone()[0] == "p"
+
+
+def _partition_count(cursor):
+    cursor.execute("SELECT COUNT(*) FROM pg_inherits WHERE inhparent = %s::regclass", [TABLE])
+    return cursor.fetchone()[0]
+
+
+def _copy_table(cursor, partitions):
+    """Rebuilds the table, hash-partitioned by job_id into `partitions` (0 = plain). Returns rows copied."""
+    old = f"{TABLE}_old"
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {old}")
+    # columns and NOT NULLs only: the indexes / constraints keep their
+    # names on the old table until it is dropped, and id's default is
+    # tied to the old table's sequence
+    suffix = " PARTITION BY HASH (job_id)" if partitions else ""
+    cursor.execute(f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING CONSTRAINTS){suffix}")
+    for i in range(partitions):
+        cursor.execute(
+            f"CREATE TABLE {TABLE}_p{i} PARTITION OF {TABLE} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+        )
+    cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {old}")
+    copied = cursor.rowcount
+    cursor.execute(f"SELECT COUNT(*) FROM {old}")
+    if cursor.fetchone()[0] != copied:
+        raise CommandError("Row count changed while copying, nothing was changed")
+    cursor.execute(f"DROP TABLE {old}")
+
+    cursor.execute(f"CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+    cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')")
+    cursor.execute(f"SELECT setval('{TABLE}_id_seq', COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)")
+
+    # Postgres wants the partition key in every unique constraint; ids
+    # still come from one sequence and stay unique
+    pkey = "id, job_id" if partitions else "id"
+    cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({pkey})")
+    cursor.execute(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_resume_id_job_id_uniq UNIQUE (resume_id, job_id)"
+    )
+    cursor.execute(f"CREATE INDEX {TABLE}_job_id_idx ON {TABLE} (job_id)")
+    cursor.execute(f"CREATE INDEX {TABLE}_resume_id_idx ON {TABLE} (resume_id)")
+    for column, target in (("job_id", "cored_job"), ("resume_id", "cored_resume")):
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_{column}_fk FOREIGN KEY ({column}) "
+            f"REFERENCES {target} (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+    return copied
+
+
+def _check_sequence(cursor):
+    """The next id must come after every copied one, or new reports collide."""
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {TABLE}")
+    max_id = cursor.fetchone()[0]
+    cursor.execute(f"SELECT last_value, is_called FROM {TABLE}_id_seq")
+    last_value, is_called = cursor.fetchone()
+    next_id = last_value + 1 if is_called else last_value
+    if next_id <= max_id:
+        raise CommandError(f"Sequence would restart at {next_id} <= max id {max_id}, nothing was changed")
+    return next_id
+
+
+class Command(BaseCommand):
+    help = (
+        "Postgres only, opt-in: `apply` rebuilds cored_matchreport hash-partitioned "
+        "by job_id, so a job's reports (scoring, listing, archival) sit in one "
+        "partition with smaller indexes; `revert` turns it back into a plain table; "
+        "`status` shows which one it is. Rewrites the whole table in one "
+        "transaction (writes to MatchReport block meanwhile): try it on a copy "
+        "of production first, and take a backup."
+    )
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        apply = sub.add_parser("apply", help="partition the table (no-op if it already is)")
+        apply.add_argument("--partitions", type=int, default=16)
+
+        sub.add_parser("revert", help="back to a plain table (no-op if it is one)")
+        sub.add_parser("status", help="plain or partitioned, and row count")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning needs PostgreSQL")
+        getattr(self, "_" + opts["action"])(opts)
+
+    def _apply(self, opts):
+        if opts["partitions"] < 2:
+            raise CommandError("--partitions must be >= 2")
+        self._rebuild(opts["partitions"])
+
+    def _revert(self, opts):
+        self._rebuild(0)
+
+    def _rebuild(self, partitions):
+        with transaction.atomic(), connection.cursor() as cursor:
+            if _is_partitioned(cursor) == bool(partitions):
+                self.stdout.write("Nothing to do: " + self._describe(cursor))
+                return
+            copied = _copy_table(cursor, partitions)
+            next_id = _check_sequence(cursor)
+            self.stdout.write(self.style.SUCCESS(
+                f"Copied {copied} reports; {self._describe(cursor)}; next id {next_id}"
+            ))
+
+    def _status(self, opts):
+        with connection.cursor() as cursor:
+            self.stdout.write(self._describe(cursor))
+
+    def _describe(self, cursor):
+        cursor.execute(f"SELECT COUNT(*) FROM {TABLE}")
+        rows = cursor.fetchone()[0]
+        if _is_partitioned(cursor):
+            return f"{TABLE} is hash-partitioned by job_id into {_partition_count(cursor)} partitions, {rows} rows"
+        return f"{TABLE} is a plain table, {rows} rows"
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from cored.models import Job
+from cored.services import (
+    ScoreCorpus,
+    extract_missing_resume_content,
+    rebuild_block_size,
+    save_top_k_reports,
+    scorable_resumes,
+)
+
+
+# set in the parent before forking, shared copy-on-write by the workers
+_CORPUS = None
+
+
+def _score_job_block(args):
+    j_lo, j_hi, top_k, block = args
+    return j_lo, _CORPUS.top_k_for_jobs(j_lo, j_hi, top_k, block)
+
+
+class Command(BaseCommand):
+    help = (
+        "Score every resume against every job in blocked sparse matrix products "
+        "and store the top-K resumes per job in MatchReport. Resumable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=50, help="resumes kept per job")
+        parser.add_argument("--memory-mb", type=int, default=512, help="memory budget for score tiles")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--job-ids", help="comma separated job ids (default: all jobs)")
+        parser.add_argument("--prune", action="store_true", help="delete reports outside the top-K of each job")
+        parser.add_argument("--checkpoint", default="rebuild_matches.checkpoint.json")
+        parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+
+    def handle(self, *args, **opts):
+        global _CORPUS
+
+        top_k = opts["top_k"]
+        workers = max(1, opts["workers"])
+        if top_k < 1:
+            raise CommandError("--top-k must be >= 1")
+
+        checkpoint = opts["checkpoint"]
+        done = set()
+        if os.path.exists(checkpoint) and not opts["fresh"]:
+            with open(checkpoint) as f:
+                state = json.load(f)
+            if state.get("top_k") != top_k:
+                raise CommandError(
+                    f"Checkpoint was written with --top-k {state.get('top_k')}; "
+                    "use the same value or --fresh"
+                )
+            done = set(state.get("done_job_ids", []))
+            self.stdout.write(f"Resuming: {len(done)} jobs already done")
+
+        # closed jobs are not scored (cored.archive)
+        jobs = Job.objects.open().order_by("id")
+        if opts["job_ids"]:
+            jobs = jobs.filter(id__in=[int(x) for x in opts["job_ids"].split(",") if x.strip()])
+        jobs = [
+            j for j in jobs.only("id", "title", "description", "skills", "w_skills", "w_title", "w_desc")
+            if j.id not in done
+        ]
+        # an unextracted resume would score 0.0 against every job
+        extracted = extract_missing_resume_content()
+        if extracted:
+            self.stdout.write(f"Extracted text of {extracted} resumes")
+        resumes = list(scorable_resumes())
+
+        if not jobs or not resumes:
+            self.stdout.write("Nothing to score.")
+            self._finish(checkpoint)
+            return
+
+        started = time.monotonic()
+        block = rebuild_block_size(opts["memory_mb"], workers)
+        _CORPUS = ScoreCorpus(resumes, jobs)
+        del resumes
+
+        tasks = [
+            (lo, min(lo + block, len(jobs)), top_k, block)
+            for lo in range(0, len(jobs), block)
+        ]
+        self.stdout.write(
+            f"{len(_CORPUS.resume_ids)} resumes x {len(jobs)} jobs, "
+            f"{len(tasks)} job blocks of {block}, {workers} workers"
+        )
+
+        def save(j_lo, result):
+            done.update(save_top_k_reports(_CORPUS, j_lo, result, prune=opts["prune"]))
+            self._write_checkpoint(checkpoint, top_k, done)
+
+        scored = 0
+        if workers == 1 or len(tasks) == 1:
+            for task in tasks:
+                j_lo, result = _score_job_block(task)
+                save(j_lo, result)
+                scored += 1
+                self.stdout.write(f"  block {scored}/{len(tasks)}")
+        else:
+            # workers never touch the database; don't hand them our socket
+            connection.close()
+            with get_context("fork").Pool(workers) as pool:
+                for j_lo, result in pool.imap_unordered(_score_job_block, tasks):
+                    save(j_lo, result)
+                    scored += 1
+                    self.stdout.write(f"  block {scored}/{len(tasks)}")
+
+        _CORPUS = None
+        self._finish(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt top-{top_k} matches for {len(jobs)} jobs in {time.monotonic() - started:.1f}s"
+        ))
+
+    def _write_checkpoint(self, path, top_k, done):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"top_k": top_k, "done_job_ids": sorted(done)}, f)
+        os.replace(tmp, path)
+
+    def _finish(self, path):
+        if os.path.exists(path):
+            os.remove(path)
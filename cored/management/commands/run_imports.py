@@ -0,0 +1,131 @@
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from rest_framework.exceptions import APIException
+
+from cored.admission import admit, PRIORITY_BATCH
+from cored.models import JobImport, ResumeImport
+from cored.services import (
+    ImportLeaseLost,
+    claim_import,
+    finish_import,
+    heartbeat_import,
+    run_job_import,
+    run_resume_import,
+)
+
+# (model, runner) pairs, checked in this order
+IMPORTERS = [
+    (JobImport, run_job_import),
+    (ResumeImport, run_resume_import),
+]
+
+
+class _Heartbeat(threading.Thread):
+    """Renews an import's lease every lease/3 seconds while it runs."""
+
+    def __init__(self, imp, lease):
+        super().__init__(daemon=True)
+        self.imp = imp
+        self.lease = lease
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.wait(self.lease / 3):
+                if not heartbeat_import(self.imp):
+                    return
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = (
+        "Background worker for bulk uploads (job CSV / JSONL files, resume "
+        "archives): `work` claims pending imports and runs them, picking up "
+        "imports whose worker died where they stopped; `status` shows import "
+        "counts."
+    )
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        work = sub.add_parser("work", help="run pending imports")
+        work.add_argument("--loop", action="store_true", help="keep polling for new imports (the Procfile worker)")
+        work.add_argument("--poll", type=float, help="seconds between polls, default settings.IMPORT_POLL_SECONDS")
+        work.add_argument("--lease", type=int, help="lease length in seconds, default settings.IMPORT_LEASE_SECONDS")
+        work.add_argument("--max-attempts", type=int, default=3)
+
+        sub.add_parser("status", help="imports per status")
+
+    def handle(self, *args, **opts):
+        getattr(self, "_" + opts["action"])(opts)
+
+    def _work(self, opts):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        poll = opts["poll"] or settings.IMPORT_POLL_SECONDS
+
+        while True:
+            ran = self._run_pending(worker, opts)
+            if not opts["loop"]:
+                break
+            if not ran:
+                # don't hold a connection between polls
+                connection.close()
+                time.sleep(poll)
+
+    def _run_pending(self, worker, opts) -> int:
+        lease = opts["lease"] or settings.IMPORT_LEASE_SECONDS
+        ran = 0
+
+        for model, run in IMPORTERS:
+            while True:
+                # imports score / extract like the web's batch requests do:
+                # same host-wide work slots, never the reserved ones
+                try:
+                    ticket = admit(None, PRIORITY_BATCH)
+                except APIException:
+                    self.stdout.write(f"[{worker}] no free work slot, retrying later")
+                    return ran
+
+                with ticket:
+                    imp = claim_import(model, worker, lease, opts["max_attempts"])
+                    if imp is None:
+                        break
+                    self._run_one(worker, imp, run, lease)
+                    ran += 1
+
+        return ran
+
+    def _run_one(self, worker, imp, run, lease):
+        started = time.monotonic()
+        heartbeat = _Heartbeat(imp, lease)
+        heartbeat.start()
+        try:
+            run(imp)
+        except ImportLeaseLost:
+            self.stdout.write(f"[{worker}] {imp} lease lost, left to its new owner")
+            return
+        except Exception as e:
+            finish_import(imp, f"{type(e).__name__}: {e}")
+        finally:
+            heartbeat.stop()
+
+        imp.refresh_from_db()
+        self.stdout.write(f"[{worker}] {imp} in {time.monotonic() - started:.1f}s")
+
+    def _status(self, opts):
+        for model, _ in IMPORTERS:
+            counts = dict(model.objects.values_list("status").annotate(n=Count("id")))
+            summary = ", ".join(f"{counts.get(s, 0)} {s}" for s, _ in model.STATUS_CHOICES)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {summary}")
@@ -0,0 +1,218 @@
+import os
+import socket
+import threading
+import time
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from cored.models import Job, ScoreRun, ScoreWorkUnit
+from cored.services import (
+    ScoreCorpus,
+    claim_work_unit,
+    extract_missing_resume_content,
+    fail_work_unit,
+    finish_work_unit,
+    heartbeat_work_unit,
+    plan_score_run,
+    rebuild_block_size,
+    score_work_unit,
+    scorable_resumes,
+)
+
+
+# built once per node before forking, shared copy-on-write by the workers
+_CORPUS = None
+
+
+class _Heartbeat(threading.Thread):
+    """Extends a unit's lease every lease/3 seconds while it is scored."""
+
+    def __init__(self, unit, lease):
+        super().__init__(daemon=True)
+        self.unit = unit
+        self.lease = lease
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.wait(self.lease / 3):
+                if not heartbeat_work_unit(self.unit, self.lease):
+                    self.lost = True
+                    return
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _work_loop(run_id, opts, block, log):
+    run = ScoreRun.objects.get(id=run_id)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    done = 0
+
+    while True:
+        unit = claim_work_unit(run, worker, opts["lease"], opts["max_attempts"])
+        if unit is None:
+            busy = run.units.filter(status=ScoreWorkUnit.STATUS_LEASED).exists()
+            if not busy or not opts["wait"]:
+                break
+            # units leased elsewhere may still expire and come back
+            time.sleep(opts["poll"])
+            continue
+
+        heartbeat = _Heartbeat(unit, opts["lease"])
+        heartbeat.start()
+        try:
+            written = score_work_unit(_CORPUS, unit, block)
+        except Exception as e:
+            heartbeat.stop()
+            fail_work_unit(unit, f"{type(e).__name__}: {e}", opts["max_attempts"])
+            log(f"[{worker}] unit {unit.id} failed (attempt {unit.attempts}): {e}")
+            continue
+        heartbeat.stop()
+
+        if heartbeat.lost or not finish_work_unit(unit, written):
+            # lease expired and another worker took the unit; our writes
+            # were idempotent upserts, theirs will land too
+            log(f"[{worker}] unit {unit.id} lease lost, left to its new owner")
+        else:
+            done += 1
+            log(f"[{worker}] unit {unit.id} jobs {unit.job_lo}-{unit.job_hi}: {written} reports")
+
+    connection.close()
+    return done
+
+
+def _child(run_id, opts, block):
+    _work_loop(run_id, opts, block, log=print)
+
+
+class Command(BaseCommand):
+    help = (
+        "Distributed match rebuild: `plan` splits the jobs into work units in the "
+        "database, `work` (on any number of nodes) leases units and scores them "
+        "against every resume, `status` shows progress."
+    )
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        plan = sub.add_parser("plan", help="create a run and its work units")
+        plan.add_argument("run")
+        plan.add_argument("--top-k", type=int, default=50, help="resumes kept per job")
+        plan.add_argument("--jobs-per-unit", type=int, default=500)
+        plan.add_argument("--prune", action="store_true", help="delete reports outside the top-K of each job")
+
+        work = sub.add_parser("work", help="lease and score units until none are left")
+        work.add_argument("run")
+        work.add_argument("--processes", type=int, default=1, help="worker processes on this node")
+        work.add_argument("--memory-mb", type=int, default=512, help="memory budget for score tiles")
+        work.add_argument("--lease", type=int, default=300, help="lease length in seconds")
+        work.add_argument("--max-attempts", type=int, default=3)
+        work.add_argument("--no-wait", dest="wait", action="store_false",
+                          help="exit when nothing is claimable, even if other nodes hold leases")
+        work.add_argument("--poll", type=float, default=10, help="seconds between claims while waiting")
+
+        status = sub.add_parser("status", help="show unit counts of a run")
+        status.add_argument("run")
+
+        retry = sub.add_parser("retry", help="put failed units of a run back to pending")
+        retry.add_argument("run")
+
+    def handle(self, *args, **opts):
+        getattr(self, "_" + opts["action"])(opts)
+
+    def _get_run(self, name):
+        try:
+            return ScoreRun.objects.get(name=name)
+        except ScoreRun.DoesNotExist:
+            raise CommandError(f"No run named {name!r}; create it with `score_units plan {name}`")
+
+    def _plan(self, opts):
+        if opts["top_k"] < 1 or opts["jobs_per_unit"] < 1:
+            raise CommandError("--top-k and --jobs-per-unit must be >= 1")
+        if ScoreRun.objects.filter(name=opts["run"]).exists():
+            raise CommandError(f"Run {opts['run']!r} already exists")
+        # once here rather than on every node: an unextracted resume would
+        # score 0.0 against every job, so workers skip them
+        extracted = extract_missing_resume_content()
+        if extracted:
+            self.stdout.write(f"Extracted text of {extracted} resumes")
+        run = plan_score_run(opts["run"], opts["top_k"], opts["jobs_per_unit"], opts["prune"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Run {run.name!r}: {run.units.count()} units of up to {opts['jobs_per_unit']} jobs, top-{run.top_k}"
+        ))
+
+    def _work(self, opts):
+        global _CORPUS
+
+        run = self._get_run(opts["run"])
+        processes = max(1, opts["processes"])
+        units = run.units.exclude(status__in=[ScoreWorkUnit.STATUS_DONE, ScoreWorkUnit.STATUS_FAILED])
+        bounds = units.aggregate(lo=Min("job_lo"), hi=Max("job_hi"))
+        if bounds["lo"] is None:
+            self.stdout.write("Nothing left to score.")
+            return
+
+        started = time.monotonic()
+        jobs = list(
+            Job.objects.open()
+            .filter(id__gte=bounds["lo"], id__lte=bounds["hi"])
+            .order_by("id")
+            .only("id", "title", "description", "skills", "w_skills", "w_title", "w_desc")
+        )
+        resumes = list(scorable_resumes())
+        _CORPUS = ScoreCorpus(resumes, jobs)
+        del jobs, resumes
+        block = rebuild_block_size(opts["memory_mb"], processes)
+        self.stdout.write(
+            f"{len(_CORPUS.resume_ids)} resumes x {len(_CORPUS.job_ids)} jobs loaded "
+            f"in {time.monotonic() - started:.1f}s; {processes} worker process(es)"
+        )
+
+        if processes == 1:
+            _work_loop(run.id, opts, block, log=self.stdout.write)
+        else:
+            # children open their own connections
+            connection.close()
+            ctx = get_context("fork")
+            children = [ctx.Process(target=_child, args=(run.id, opts, block)) for _ in range(processes)]
+            for child in children:
+                child.start()
+            for child in children:
+                child.join()
+
+        _CORPUS = None
+        self._status(opts)
+
+    def _status(self, opts):
+        run = self._get_run(opts["run"])
+        counts = dict(run.units.values_list("status").annotate(n=Count("id")))
+        written = run.units.aggregate(n=Sum("reports_written"))["n"] or 0
+        total = sum(counts.values())
+        self.stdout.write(
+            f"Run {run.name!r} (top-{run.top_k}): {total} units, "
+            + ", ".join(f"{counts.get(s, 0)} {s}" for s, _ in ScoreWorkUnit.STATUS_CHOICES)
+            + f"; {written} reports written"
+        )
+
+        now = timezone.now()
+        for unit in run.units.filter(status=ScoreWorkUnit.STATUS_LEASED).order_by("id")[:10]:
+            state = "expired" if unit.lease_expires_at and unit.lease_expires_at < now else "active"
+            self.stdout.write(f"  leased  #{unit.id} by {unit.worker} ({state}, attempt {unit.attempts})")
+        for unit in run.units.filter(status=ScoreWorkUnit.STATUS_FAILED).order_by("id")[:10]:
+            self.stdout.write(f"  failed  #{unit.id} jobs {unit.job_lo}-{unit.job_hi}: {unit.error}")
+
+    def _retry(self, opts):
+        run = self._get_run(opts["run"])
+        n = (run.units
+             .filter(status=ScoreWorkUnit.STATUS_FAILED)
+             .update(status=ScoreWorkUnit.STATUS_PENDING, attempts=0, error="", finished_at=None))
+        self.stdout.write(f"{n} failed units back to pending")
@@ -0,0 +1,137 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter. Prints one JSON line:
+#   app_s / app_rss_mb    django.setup() + WSGI app + URLconf (views) imported
+#   heavy_s / heavy_rss_mb  + first scoring / PDF path (heavy modules)
+#   worker_uss_mb         private memory of a forked worker after it scored
+#                         one pair (Linux only), i.e. what each extra
+#                         gunicorn worker really costs
+CHILD = r'''
+import gc, json, os, sys, time
+
+def rss_mb(pid="self"):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return 0.0
+
+def uss_mb(pid):
+    try:
+        total = 0
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                    total += int(line.split()[1])
+        return total / 1024
+    except OSError:
+        return None
+
+preload = sys.argv[1] == "preload"
+out = {}
+
+t = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hiredsense.settings")
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+out["app_s"] = time.perf_counter() - t
+out["app_rss_mb"] = rss_mb()
+
+def score_once():
+    from cored.services import pairwise_tfidf_sims
+    pairwise_tfidf_sims(["python django developer"], ["django rest api"])
+
+if preload:
+    t = time.perf_counter()
+    from cored.startup import preload_heavy_modules, freeze_for_fork
+    preload_heavy_modules()
+    score_once()
+    out["heavy_s"] = time.perf_counter() - t
+    out["heavy_rss_mb"] = rss_mb()
+    freeze_for_fork()
+
+r, w = os.pipe() if hasattr(os, "fork") else (None, None)
+if r is None:
+    out["worker_uss_mb"] = None
+else:
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        t = time.perf_counter()
+        score_once()
+        os.write(w, json.dumps({"first_score_s": time.perf_counter() - t}).encode())
+        os.close(w)
+        time.sleep(0.5)  # parent reads our smaps meanwhile
+        os._exit(0)
+    os.close(w)
+    child = json.loads(os.read(r, 4096).decode())
+    out["worker_first_score_s"] = child["first_score_s"]
+    out["worker_uss_mb"] = uss_mb(pid)
+    os.waitpid(pid, 0)
+
+print(json.dumps(out))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold-start benchmark: import time and memory of a fresh worker, "
+        "with heavy modules loaded lazily vs preloaded in a forking master."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3, help="runs per mode (median reported)")
+        parser.add_argument("--json", action="store_true", help="print raw JSON results")
+
+    def handle(self, *args, **opts):
+        results = {}
+        for mode in ("lazy", "preload"):
+            runs = [self._run(mode) for _ in range(max(1, opts["repeat"]))]
+            results[mode] = {
+                key: statistics.median(r[key] for r in runs)
+                if all(r.get(key) is not None for r in runs) else None
+                for key in runs[0]
+            }
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        lazy, pre = results["lazy"], results["preload"]
+        rows = [
+            ("App import (s)", lazy["app_s"], pre["app_s"]),
+            ("App RSS (MB)", lazy["app_rss_mb"], pre["app_rss_mb"]),
+            ("Heavy preload in master (s)", None, pre.get("heavy_s")),
+            ("Master RSS after preload (MB)", None, pre.get("heavy_rss_mb")),
+            ("Worker first scoring call (s)", lazy.get("worker_first_score_s"), pre.get("worker_first_score_s")),
+            ("Worker private memory (MB)", lazy.get("worker_uss_mb"), pre.get("worker_uss_mb")),
+        ]
+
+        fmt = lambda v: "-" if v is None else f"{v:.3f}" if v < 10 else f"{v:.1f}"
+        self.stdout.write(f"{'':32}{'lazy':>10}{'preload':>10}")
+        for label, a, b in rows:
+            self.stdout.write(f"{label:32}{fmt(a):>10}{fmt(b):>10}")
+
+    def _run(self, mode):
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, mode],
+            cwd=str(settings.BASE_DIR),
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(proc.stderr.strip() or f"{mode} run failed")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
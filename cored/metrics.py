@@ -0,0 +1,142 @@
+"""
+In-process performance metrics, exported in Prometheus text format
+at /api/metrics/.
+
+- timed("stage") : decorator / context manager for hot-path stages
+- add_pairs(n)   : (resume, job) pairs scored by the current request
+- Histogram      : cumulative-bucket histogram, thread safe
+
+Metrics live in the worker process that recorded them (each gunicorn
+worker exports its own numbers).
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+
+
+# seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# queries / pairs per request
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000, 100000)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label="view"):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label = label
+        self._lock = threading.Lock()
+        # label value -> [bucket counts..., +Inf count], sum
+        self._counts = {}
+        self._sums = {}
+
+    def observe(self, value, label_value=""):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_value)
+            if counts is None:
+                counts = self._counts[label_value] = [0] * (len(self.buckets) + 1)
+                self._sums[label_value] = 0.0
+            counts[i] += 1
+            self._sums[label_value] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = [(k, list(v), self._sums[k]) for k, v in sorted(self._counts.items())]
+
+        for label_value, counts, total in items:
+            lv = label_value.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{self.label}="{lv}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{self.label}="{lv}"}} {total}')
+            lines.append(f'{self.name}_count{{{self.label}="{lv}"}} {cumulative}')
+        return "\n".join(lines)
+
+
+REQUEST_SECONDS = Histogram(
+    "hiredsense_request_duration_seconds", "Request latency per view.", LATENCY_BUCKETS)
+DB_QUERIES = Histogram(
+    "hiredsense_db_queries", "Database queries per request.", COUNT_BUCKETS)
+DB_SECONDS = Histogram(
+    "hiredsense_db_query_duration_seconds", "Database time per request.", LATENCY_BUCKETS)
+PAIRS_SCORED = Histogram(
+    "hiredsense_pairs_scored", "(resume, job) pairs scored per request.", COUNT_BUCKETS)
+STAGE_SECONDS = Histogram(
+    "hiredsense_stage_duration_seconds", "Latency of instrumented hot-path stages.",
+    LATENCY_BUCKETS, label="stage")
+
+REGISTRY = [REQUEST_SECONDS, DB_QUERIES, DB_SECONDS, PAIRS_SCORED, STAGE_SECONDS]
+
+
+# per-request counters, set by MetricsMiddleware
+_request_stats = ContextVar("hiredsense_request_stats", default=None)
+
+
+def start_request():
+    stats = {"queries": 0, "db_seconds": 0.0, "pairs": 0}
+    return stats, _request_stats.set(stats)
+
+
+def resume_request(stats):
+    """Counts into `stats` again, e.g. while a streamed body is sent."""
+    return _request_stats.set(stats)
+
+
+def end_request(token):
+    _request_stats.reset(token)
+
+
+def current_request_stats():
+    return _request_stats.get()
+
+
+def add_pairs(n: int) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats["pairs"] += n
+
+
+class timed:
+    """
+    Records the duration of a stage into STAGE_SECONDS.
+
+        @timed("pdf_extract")
+        def extract_text_from_pdf(...): ...
+
+        with timed("report_upsert"):
+            ...
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(time.perf_counter() - self._started, self.stage)
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, self.stage)
+        return wrapper
+
+
+def render_prometheus() -> str:
+    return "\n".join(h.render() for h in REGISTRY) + "\n"
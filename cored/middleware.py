@@ -0,0 +1,202 @@
+import cProfile
+import io
+import pstats
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+
+from . import metrics
+from .loadtest import TrafficWriter, traffic_record
+from .routers import pin_to_primary, replica_configured, track_writes
+
+
+class MetricsMiddleware:
+    """
+    Records per-request latency, DB query count / time and scored pairs
+    into cored.metrics, labelled by URL route.
+
+    Staff users can add ?profile=1 to any URL to get a cProfile summary
+    of the request instead of its response.
+    """
+
+    PROFILE_LINES = 40
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats, token = metrics.start_request()
+
+        def count_queries(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats["queries"] += 1
+                stats["db_seconds"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            with _wrap_all_connections(count_queries):
+                if request.GET.get("profile") == "1" and _is_staff(request):
+                    response = self._profile(request)
+                else:
+                    response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+
+        def record():
+            view = _route_label(request)
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, view)
+            metrics.DB_QUERIES.observe(stats["queries"], view)
+            metrics.DB_SECONDS.observe(stats["db_seconds"], view)
+            metrics.PAIRS_SCORED.observe(stats["pairs"], view)
+
+        # streamed bodies (NDJSON matches) query and score while being
+        # sent, after this returns: keep counting until the response is
+        # closed. Files are left alone, wrapping them would lose sendfile
+        if response.streaming and getattr(response, "file_to_stream", None) is None:
+            response.streaming_content = _MeteredStream(
+                response.streaming_content, stats, count_queries, record
+            )
+        else:
+            record()
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF / template responses are rendered after this hook
+        started = time.perf_counter()
+        response.add_post_render_callback(
+            lambda r: metrics.STAGE_SECONDS.observe(time.perf_counter() - started, "render")
+        )
+        return response
+
+    def _profile(self, request):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+            if response.streaming:
+                # streamed bodies do their work while being consumed
+                for _ in response.streaming_content:
+                    pass
+        finally:
+            profiler.disable()
+
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(self.PROFILE_LINES)
+        return HttpResponse(out.getvalue(), content_type="text/plain; charset=utf-8")
+
+
+class TrafficRecorderMiddleware:
+    """
+    Appends every /api/ request (method, route, path, query, pseudonymous
+    user, status, time) to settings.TRAFFIC_RECORD_PATH as JSONL, for
+    `manage.py loadtest replay`. Bodies are not recorded. Off unless the
+    setting is set.
+    """
+
+    SKIP_ROUTES = {"metrics"}
+
+    def __init__(self, get_response):
+        if not settings.TRAFFIC_RECORD_PATH:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.writer = TrafficWriter(settings.TRAFFIC_RECORD_PATH)
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        # streamed bodies: time to first byte only (replay measures the rest)
+        ms = (time.perf_counter() - started) * 1000
+
+        route = _route_label(request)
+        if request.path.startswith("/api/") and route not in self.SKIP_ROUTES:
+            self.writer.write(traffic_record(request, response, route, ms))
+        return response
+
+
+class ReplicaPinMiddleware:
+    """
+    Read-your-writes for cored.routers: after a request that wrote (an
+    unsafe method, or any query routed for writing), the user's reads
+    stay on the primary for REPLICA_STICKY_SECONDS. Off without a replica.
+    """
+
+    UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_writes() as writes:
+            response = self.get_response(request)
+
+        # streamed bodies (scoring) write while being sent, after this returns
+        if writes["wrote"] or response.streaming or request.method in self.UNSAFE_METHODS:
+            # DRF copies the authenticated user (session or token) back here
+            pin_to_primary(getattr(request, "user", None))
+        return response
+
+
+class _MeteredStream:
+    # an iterator with close() rather than a generator, like
+    # admission._HeldStream: Django closes the response even if the body
+    # was never iterated, and that must still record the request
+    def __init__(self, content, stats, count_queries, record):
+        self._content = iter(content)
+        self._stats = stats
+        self._count_queries = count_queries
+        self._record = record
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = metrics.resume_request(self._stats)
+        try:
+            with _wrap_all_connections(self._count_queries):
+                return next(self._content)
+        finally:
+            metrics.end_request(token)
+
+    def close(self):
+        if self._record is not None:
+            record, self._record = self._record, None
+            record()
+
+
+class _wrap_all_connections:
+    def __init__(self, wrapper):
+        self.wrapper = wrapper
+        self._stack = []
+
+    def __enter__(self):
+        for conn in connections.all():
+            cm = conn.execute_wrapper(self.wrapper)
+            cm.__enter__()
+            self._stack.append(cm)
+        return self
+
+    def __exit__(self, *exc):
+        while self._stack:
+            self._stack.pop().__exit__(*exc)
+        return False
+
+
+def _is_staff(request):
+    user = getattr(request, "user", None)
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+def _route_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route or "unknown"
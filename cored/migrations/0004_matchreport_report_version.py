@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0003_resumeimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchreport',
+            name='report_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0005_apitoken'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resume',
+            name='file',
+            field=models.FileField(db_index=True, upload_to='resumes/'),
+        ),
+    ]
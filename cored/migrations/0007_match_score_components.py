@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0006_resume_file_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='w_desc',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='w_skills',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='w_title',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='matchreport',
+            name='desc_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='matchreport',
+            name='skills_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='matchreport',
+            name='title_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0008_score_work_units'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermDocFreq',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=20)),
+                ('bucket', models.IntegerField()),
+                ('df', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('field', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0009_term_doc_freq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSkillGap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('missing', models.IntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_gaps', to='cored.job')),
+            ],
+            options={
+                'unique_together': {('job', 'skill')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumeSkillGap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('jobs_missing', models.IntegerField(default=0)),
+                ('jobs_unlocked', models.IntegerField(default=0)),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_gaps', to='cored.resume')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resume', '-jobs_unlocked', '-jobs_missing'], name='resume_skill_opportunity_idx')],
+                'unique_together': {('resume', 'skill')},
+            },
+        ),
+    ]
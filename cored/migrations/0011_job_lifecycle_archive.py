@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0010_skill_gaps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('closed', 'Closed')], db_index=True, default='open', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='MatchReportArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+                ('report_count', models.IntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='report_archive', to='cored.job')),
+            ],
+        ),
+    ]
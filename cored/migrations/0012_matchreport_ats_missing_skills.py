@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0011_job_lifecycle_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchreport',
+            name='ats_missing_skills',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
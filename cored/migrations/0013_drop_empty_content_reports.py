@@ -0,0 +1,68 @@
+"""
+Drops MatchReports that were scored on an empty resume text (API uploads
+were never extracted, so bulk scorers stored 0.0 rows listing every job
+skill as missing). my_matches / the rebuild commands score those pairs
+again from the extracted text.
+
+Rows of unrelated pairs that legitimately scored 0 on every component
+go too; rescoring them gives the same row back.
+"""
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.db.models import Q
+
+SKILL_MAX_LENGTH = 100
+
+
+def drop_empty_content_reports(apps, schema_editor):
+    MatchReport = apps.get_model("cored", "MatchReport")
+    JobSkillGap = apps.get_model("cored", "JobSkillGap")
+    ResumeSkillGap = apps.get_model("cored", "ResumeSkillGap")
+
+    stale = MatchReport.objects.filter(
+        Q(resume__content="")
+        | Q(skills_score=0, title_score=0, desc_score=0)
+        | Q(skills_score__isnull=True, score=0)
+    )
+    if not stale.exists():
+        return
+    stale.delete()
+
+    # recount the skill gaps like cored.skillgaps.rebuild(), on the
+    # historical models
+    job_counts = Counter()
+    resume_counts = defaultdict(lambda: [0, 0])
+    reports = MatchReport.objects.values_list("resume_id", "job_id", "missing_skills")
+    for resume_id, job_id, missing in reports.iterator(chunk_size=5000):
+        skills = {s[:SKILL_MAX_LENGTH] for s in missing or [] if s}
+        for skill in skills:
+            job_counts[(job_id, skill)] += 1
+            resume_counts[(resume_id, skill)][0] += 1
+        if len(skills) == 1:
+            resume_counts[(resume_id, next(iter(skills)))][1] += 1
+
+    JobSkillGap.objects.all().delete()
+    ResumeSkillGap.objects.all().delete()
+    JobSkillGap.objects.bulk_create(
+        [JobSkillGap(job_id=j, skill=s, missing=n) for (j, s), n in job_counts.items()],
+        batch_size=5000,
+    )
+    ResumeSkillGap.objects.bulk_create(
+        [
+            ResumeSkillGap(resume_id=r, skill=s, jobs_missing=m, jobs_unlocked=u)
+            for (r, s), (m, u) in resume_counts.items()
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0012_matchreport_ats_missing_skills'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_empty_content_reports, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cored', '0014_jobimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeimport',
+            name='attempts',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='resumeimport',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeimport',
+            name='worker',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
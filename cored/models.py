@@ -13,7 +13,7 @@ class Resume(models.Model):
     title = models.CharField(max_length=100)
 
     # 🔥 ACTUAL FILE
-    file = models.FileField(upload_to="resumes/")
+    file = models.FileField(upload_to="resumes/", db_index=True)
 
     # 🔥 extracted text (optional for now)
     content = models.TextField(blank=True, default="")
@@ -25,25 +25,64 @@ class Resume(models.Model):
 
 
 
+class JobQuerySet(models.QuerySet):
+    def open(self):
+        return self.filter(status=Job.STATUS_OPEN)
+
+
 class Job(models.Model):
+    # lifecycle: only open jobs are scored and listed in matches; closed
+    # jobs' reports are moved to MatchReportArchive (cored.archive)
+    STATUS_OPEN = "open"
+    STATUS_CLOSED = "closed"
+    STATUS_CHOICES = [
+        (STATUS_OPEN, "Open"),
+        (STATUS_CLOSED, "Closed"),
+    ]
+
     title = models.CharField(max_length=150)
     description = models.TextField()
     skills = models.TextField(help_text="Comma separated skills")
+    # ranking weights for this job's matches (None = settings.MATCH_WEIGHTS)
+    w_skills = models.FloatField(null=True, blank=True)
+    w_title = models.FloatField(null=True, blank=True)
+    w_desc = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_OPEN, db_index=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = JobQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    @property
+    def is_open(self):
+        return self.status == self.STATUS_OPEN
+
 class MatchReport(models.Model):
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE)
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     score = models.FloatField(default=0)
+    # TF-IDF similarities (0-100) behind `score`; rankings weight them in
+    # SQL, so new weights don't need a rescore (NULL = scored before these
+    # columns existed, `score` is used as is)
+    skills_score = models.FloatField(null=True, blank=True)
+    title_score = models.FloatField(null=True, blank=True)
+    desc_score = models.FloatField(null=True, blank=True)
     ats_score = models.IntegerField(default=0)
+    # job skills the resume lacks (TF-IDF stage, skill-gap counters)
     missing_skills = models.JSONField(default=list, blank=True)
+    # role skills the ATS report found missing: what improvements /
+    # interview_questions below are written about
+    ats_missing_skills = models.JSONField(default=list, blank=True)
     improvements = models.JSONField(default=list, blank=True)
     tailored_summary = models.TextField(blank=True, default="")
     cover_letter = models.TextField(blank=True, default="")
     interview_questions = models.JSONField(default=list, blank=True)
+    # llm.REPORT_MODEL_VERSION the ATS fields above were generated with
+    # ("" = not generated yet / inputs changed)
+    report_version = models.CharField(max_length=32, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -53,3 +92,220 @@ class MatchReport(models.Model):
         return f"{self.resume_id} -> {self.job_id}"
 
 
+
+
+class ResumeImport(models.Model):
+    """
+    Bulk resume upload (zip / tar archive of PDF / DOCX files), processed
+    by the `run_imports` worker. `processed` archive members are committed
+    with their Resume rows, so a restarted worker continues after them.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    archive = models.FileField(upload_to="imports/", blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    # worker lease, as on JobImport
+    worker = models.CharField(max_length=100, blank=True, default="")
+    attempts = models.IntegerField(default=0)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"import #{self.id} ({self.status})"
+
+
+class JobImport(models.Model):
+    """
+    Bulk job upload (CSV / JSONL), imported and scored by the `run_imports`
+    worker. Progress is committed with each batch, so a restarted worker
+    picks the import up again at `rows_done`.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    file = models.FileField(upload_to="imports/", blank=True)
+    format = models.CharField(max_length=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    rows_done = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    scored = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    # first MAX_IMPORT_ERRORS invalid rows: {"row": n, "errors": ...}
+    errors = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default="")
+    # worker lease: a running import whose heartbeat stops is claimed again
+    worker = models.CharField(max_length=100, blank=True, default="")
+    attempts = models.IntegerField(default=0)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"job import #{self.id} ({self.status})"
+
+
+class ApiToken(models.Model):
+    """
+    Bearer token for scripted API clients. Only the SHA-256 of the key
+    is stored; the key itself is shown once when the token is created.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="api_tokens")
+    name = models.CharField(max_length=100, blank=True, default="")
+    key_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user} / {self.name or self.id}"
+
+
+class ScoreRun(models.Model):
+    """
+    A distributed match rebuild (manage.py score_units): the job id space
+    split into ScoreWorkUnits that workers on any node lease and score.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    top_k = models.IntegerField(default=50)
+    # delete reports outside each job's top-K
+    prune = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class ScoreWorkUnit(models.Model):
+    """Jobs with job_lo <= id <= job_hi, scored against every resume."""
+
+    STATUS_PENDING = "pending"
+    STATUS_LEASED = "leased"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_LEASED, "Leased"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    run = models.ForeignKey(ScoreRun, on_delete=models.CASCADE, related_name="units")
+    job_lo = models.BigIntegerField()
+    job_hi = models.BigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    # "<host>:<pid>" of the worker holding the lease
+    worker = models.CharField(max_length=200, blank=True, default="")
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    reports_written = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["run", "status"])]
+
+    def __str__(self):
+        return f"{self.run_id}:{self.job_lo}-{self.job_hi} ({self.status})"
+
+
+class TermDocFreq(models.Model):
+    """
+    Document frequencies of hashed terms over the job catalog, one row
+    per (job field, hash bucket), kept up to date as jobs change (see
+    cored.hashing). bucket -1 holds the number of jobs.
+    """
+
+    field = models.CharField(max_length=20)
+    bucket = models.IntegerField()
+    df = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("field", "bucket")
+
+    def __str__(self):
+        return f"{self.field}[{self.bucket}] = {self.df}"
+
+
+class JobSkillGap(models.Model):
+    """
+    Number of resumes scored against `job` whose MatchReport lists
+    `skill` as missing. Maintained by cored.skillgaps as reports are
+    written and deleted.
+    """
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="skill_gaps")
+    skill = models.CharField(max_length=100)
+    missing = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("job", "skill")
+
+    def __str__(self):
+        return f"{self.job_id}: {self.skill} x{self.missing}"
+
+
+class ResumeSkillGap(models.Model):
+    """
+    Per resume and skill: jobs whose MatchReport lists the skill as
+    missing, and jobs where it is the only missing skill (learning it
+    "unlocks" them). Maintained by cored.skillgaps.
+    """
+
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name="skill_gaps")
+    skill = models.CharField(max_length=100)
+    jobs_missing = models.IntegerField(default=0)
+    jobs_unlocked = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("resume", "skill")
+        indexes = [
+            models.Index(fields=["resume", "-jobs_unlocked", "-jobs_missing"], name="resume_skill_opportunity_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.resume_id}: {self.skill} ({self.jobs_unlocked}/{self.jobs_missing})"
+
+
+class MatchReportArchive(models.Model):
+    """
+    Cold storage for the MatchReports of a closed job: one row per job,
+    the reports as zlib-compressed JSON rows (cored.archive). Restoring
+    moves them back into MatchReport.
+    """
+
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name="report_archive")
+    data = models.BinaryField()
+    report_count = models.IntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.job_id}: {self.report_count} reports"
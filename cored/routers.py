@@ -0,0 +1,105 @@
+"""
+Read-replica routing for heavy read-only endpoints.
+
+Match listings, job list / search and dashboard stats can read from
+settings.READ_REPLICA_ALIAS instead of competing with bulk match writes
+on the primary. Reads only go to the replica where code opts in:
+
+    with replica_reads(request.user):      # every read in the block
+        ...
+    qs.using(read_db(request.user))        # one queryset, evaluated later
+
+Everything else, and every write, uses the primary.
+
+Read-your-writes: cored.middleware.ReplicaPinMiddleware pins a user to
+the primary for REPLICA_STICKY_SECONDS after any request of theirs that
+wrote (an unsafe method, or any query routed for writing), so their next
+page shows what they just changed despite replica lag. Pins live in the
+default cache, so they hold across all workers sharing it.
+
+Without a replica in DATABASES all of this is a no-op.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# inside replica_reads()
+_replica_reads = ContextVar("replica_reads", default=False)
+# per-request {"wrote": bool}, see track_writes()
+_request_writes = ContextVar("request_writes", default=None)
+
+
+def replica_configured() -> bool:
+    return settings.READ_REPLICA_ALIAS in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def pin_to_primary(user) -> None:
+    if user is not None and user.is_authenticated and replica_configured():
+        cache.set(_pin_key(user.pk), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user) -> bool:
+    return user is not None and user.is_authenticated and bool(cache.get(_pin_key(user.pk)))
+
+
+def read_db(user=None) -> str:
+    """Alias a read-only query for `user` should use."""
+    if not replica_configured() or is_pinned(user):
+        return DEFAULT_DB_ALIAS
+    # reads inside a transaction must see its own writes
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return settings.READ_REPLICA_ALIAS
+
+
+@contextmanager
+def track_writes():
+    """Yields a dict whose "wrote" turns True if the block routes a write."""
+    writes = {"wrote": False}
+    token = _request_writes.set(writes)
+    try:
+        yield writes
+    finally:
+        _request_writes.reset(token)
+
+
+@contextmanager
+def replica_reads(user=None):
+    """Routes the block's reads to the replica (unless `user` is pinned)."""
+    token = _replica_reads.set(read_db(user) != DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return settings.READ_REPLICA_ALIAS
+        # explicit, or related lookups on replica-loaded objects would
+        # follow them to the replica
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        writes = _request_writes.get()
+        if writes is not None:
+            writes["wrote"] = True
+        # never the replica, even for objects read from it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its schema through replication
+        return db != settings.READ_REPLICA_ALIAS
+
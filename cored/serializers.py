@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Resume, Job, MatchReport
+from .models import Resume, Job, MatchReport, ResumeImport, JobImport
 
 class ResumeSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
@@ -26,9 +26,18 @@ class JobSerializer(serializers.ModelSerializer):
 class JobSerializer(serializers.ModelSerializer):
     class Meta:
         model = Job
-        fields = ["id", "title", "description", "skills", "created_at"]
-        read_only_fields = ["id", "created_at"]
-        
+        fields = [
+            "id", "title", "description", "skills", "w_skills", "w_title", "w_desc",
+            "status", "closed_at", "created_at",
+        ]
+        read_only_fields = ["id", "closed_at", "created_at"]
+        extra_kwargs = {
+            "w_skills": {"min_value": 0},
+            "w_title": {"min_value": 0},
+            "w_desc": {"min_value": 0},
+        }
+
+
 class MatchReportMiniSerializer(serializers.ModelSerializer):
     resume_title = serializers.CharField(source="resume.title", read_only=True)
     username = serializers.CharField(source="resume.user.username", read_only=True)
@@ -43,4 +52,40 @@ class MatchReportMiniSerializer(serializers.ModelSerializer):
             "score",
             "ats_score",
             "missing_skills",
-        ]
\ No newline at end of file
+        ]
+
+
+class ResumeImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumeImport
+        fields = [
+            "id",
+            "status",
+            "total",
+            "processed",
+            "created",
+            "failed",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class JobImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobImport
+        fields = [
+            "id",
+            "status",
+            "format",
+            "rows_done",
+            "created",
+            "scored",
+            "error_count",
+            "errors",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -1,15 +1,118 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, TYPE_CHECKING
+import csv
+import json
+import math
+import os
 import re
-from .models import Job, Resume, MatchReport
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from django.db import transaction
+import tarfile
+import zipfile
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from .models import Job, JobImport, Resume, MatchReport, ResumeImport, ScoreRun, ScoreWorkUnit
+from .metrics import timed, add_pairs
+from .hashing import count_new_jobs
+from . import skillgaps
+from .routers import read_db
+from .llm import (
+    extract_resume_text,
+    RESUME_EXTENSIONS,
+    extract_skills,
+    generate_ai_report_from_skills,
+    REPORT_MODEL_VERSION,
+)
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction, connection
+from django.db.models import F, Q, Case, When, Value, FloatField, ExpressionWrapper
+from django.db.models.functions import Least
+from django.utils import timezone
 
-from django.db.models import Q
+# numpy / scipy / scikit-learn are imported inside the scoring functions:
+# they cost ~1s and tens of MB, and most requests never score anything
+# (see cored.startup for preloading them in the gunicorn master)
+if TYPE_CHECKING:
+    import numpy as np
 
 
 STOP = {"and","or","the","a","an","to","in","of","for","with","on","at","is","are","as","be"}
 
+WEIGHT_KEYS = ("skills", "title", "desc")
+
+
+def match_weights(job=None, overrides=None) -> Dict[str, float]:
+    """
+    Effective ranking weights: settings.MATCH_WEIGHTS, then the job's
+    own w_* fields, then per-request overrides ({"skills": 0.7, ...}).
+    None values fall through to the previous level.
+    Settings are read per call (override_settings, reloaded config).
+    """
+    weights = {key: float(settings.MATCH_WEIGHTS[key]) for key in WEIGHT_KEYS}
+    if job is not None:
+        for key in WEIGHT_KEYS:
+            value = getattr(job, f"w_{key}", None)
+            if value is not None:
+                weights[key] = float(value)
+    for key, value in (overrides or {}).items():
+        if key in weights and value is not None:
+            weights[key] = float(value)
+    return weights
+
+
+def parse_weight_overrides(params) -> Dict[str, float]:
+    """?w_skills=&w_title=&w_desc= -> overrides for match_weights(); bad values are ignored."""
+    overrides = {}
+    for key in WEIGHT_KEYS:
+        raw = params.get(f"w_{key}")
+        if raw in (None, ""):
+            continue
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            continue
+        if value >= 0 and math.isfinite(value):
+            overrides[key] = value
+    return overrides
+
+
+def weighted_score_expression(weights: Dict[str, float]):
+    """
+    MatchReport score under `weights`, computed by the database from the
+    stored component columns (rows scored before they existed keep their
+    stored score). Capped at 100 like the stored score, since weights
+    may sum to more than 1. Not rounded: Postgres has no
+    ROUND(double, int), and ordering doesn't need it.
+    """
+    blended = Least(
+        ExpressionWrapper(
+            Value(weights["skills"]) * F("skills_score")
+            + Value(weights["title"]) * F("title_score")
+            + Value(weights["desc"]) * F("desc_score"),
+            output_field=FloatField(),
+        ),
+        Value(100.0),
+        output_field=FloatField(),
+    )
+    return Case(
+        When(skills_score__isnull=True, then=F("score")),
+        default=blended,
+        output_field=FloatField(),
+    )
+
+
+def blend_components(report: MatchReport, weights: Dict[str, float]) -> float:
+    """weighted_score_expression() for an in-memory MatchReport."""
+    if report.skills_score is None:
+        return report.score
+    blended = (
+        weights["skills"] * report.skills_score
+        + weights["title"] * report.title_score
+        + weights["desc"] * report.desc_score
+    )
+    return round(min(100.0, blended), 2)
+
+
 def _tokens(text: str) -> List[str]:
     words = re.findall(r"[a-zA-Z\+\#\.]{2,}", (text or "").lower())
     return [w for w in words if w not in STOP]
@@ -21,14 +124,112 @@ def _join(*parts: str) -> str:
     return " ".join([p for p in parts if p])
 
 
-def rank_jobs_for_resume(resume_text: str, jobs: List[Dict]) -> List[Dict]:
+# one row per ranked job: index into the caller's job list, the rounded
+# score and the raw component similarities (all 0-100)
+RANKED_DTYPE = [
+    ("index", "i4"),
+    ("job_id", "i8"),
+    ("score", "f4"),
+    ("skills_score", "f8"),
+    ("title_score", "f8"),
+    ("desc_score", "f8"),
+]
+
+# cap for response size
+MAX_SKILLS_LISTED = 25
+
+
+class RankedJobs:
+    """
+    Result of rank_jobs_for_resume(): a numpy structured array of
+    (index, job_id, score, skills_score, title_score, desc_score),
+    best first, 40 bytes per job.
+
+    Indexing / iterating gives the old dict shape ({**job, score,
+    matched_skills, missing_skills, breakdown}), built only for the rows
+    actually read, so ranked[:10] never touches the other 99,990 jobs.
     """
-    Returns jobs with:
+
+    __slots__ = ("rows", "_jobs", "_resume_skills")
+
+    def __init__(self, rows, jobs, resume_skills):
+        self.rows = rows
+        self._jobs = jobs
+        self._resume_skills = resume_skills
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return len(self.rows) > 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._entry(row) for row in self.rows[i]]
+        return self._entry(self.rows[i])
+
+    def __iter__(self):
+        for row in self.rows:
+            yield self._entry(row)
+
+    def skills(self, i):
+        """(matched, missing) skill lists of the i-th ranked job."""
+        job = self._jobs[int(self.rows[i]["index"])]
+        return self._skill_lists(job)
+
+    def _skill_lists(self, job):
+        job_skills = _skill_set(job.get("skills", "") or "")
+        matched = sorted(self._resume_skills.intersection(job_skills))
+        missing = sorted(job_skills.difference(self._resume_skills))
+        return matched[:MAX_SKILLS_LISTED], missing[:MAX_SKILLS_LISTED]
+
+    def _entry(self, row):
+        job = self._jobs[int(row["index"])]
+        matched, missing = self._skill_lists(job)
+        return {
+            **job,
+            "score": round(float(row["score"]), 2),
+            "matched_skills": matched,
+            "missing_skills": missing,
+            "breakdown": {
+                "skills_score": round(float(row["skills_score"]), 2),
+                "title_score":  round(float(row["title_score"]), 2),
+                "desc_score":   round(float(row["desc_score"]), 2),
+            }
+        }
+
+
+@timed("rank_jobs")
+def rank_jobs_for_resume(
+    resume_text: str,
+    jobs: Iterable[Dict],
+    vectorizer: str = None,
+    top_k: int = None,
+) -> RankedJobs:
+    """
+    Ranks jobs for one resume. Returns a RankedJobs (best first) whose
+    entries have:
     - score (0-100)
     - matched_skills, missing_skills
     - breakdown: skills_score, title_score, desc_score
+
+    vectorizer (default settings.MATCH_VECTORIZER):
+    - "exact":   TF-IDF fitted on the resume + these jobs
+    - "hashing": feature hashing with catalog-wide document frequencies
+                 (cored.hashing); `jobs` can be any iterable (e.g. a
+                 .values().iterator() over the whole catalog) and is
+                 scored in chunks, keeping only the top_k job dicts
     """
+    vectorizer = vectorizer or settings.MATCH_VECTORIZER
+    if vectorizer == "hashing":
+        return _rank_jobs_hashed(resume_text, jobs, top_k)
+    if vectorizer != "exact":
+        raise ValueError(f"Unknown vectorizer {vectorizer!r}, use 'exact' or 'hashing'")
+
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
+    jobs = list(jobs)
     resume_text = resume_text or ""
     resume_skills = _skill_set(resume_text)
 
@@ -37,59 +238,112 @@ def rank_jobs_for_resume(resume_text: str, jobs: List[Dict]) -> List[Dict]:
     descs  = [j.get("description", "") for j in jobs]
     skills = [j.get("skills", "") for j in jobs]
 
-    def tfidf_sim(query: str, docs: List[str]) -> List[float]:
+    @timed("tfidf_fit")
+    def tfidf_sim(query: str, docs: List[str]) -> "np.ndarray":
         corpus = [query] + docs
         vec = TfidfVectorizer(stop_words="english", max_features=5000)
         X = vec.fit_transform(corpus)
-        sims = cosine_similarity(X[0:1], X[1:]).flatten()
-        return [float(s) for s in sims]
+        # rows are l2-normalised, so cosine similarity is a dot product
+        return np.asarray((X[1:] @ X[0].T).todense()).ravel()
 
-    title_sims = tfidf_sim(resume_text, titles)
-    desc_sims  = tfidf_sim(resume_text, descs)
-    skill_sims = tfidf_sim(resume_text, skills)
+    skills_score = tfidf_sim(resume_text, skills)
+    title_score  = tfidf_sim(resume_text, titles)
+    desc_score   = tfidf_sim(resume_text, descs)
+    add_pairs(len(jobs))
 
-    # weights (tuneable)
-    W_SKILLS = 0.55
-    W_TITLE  = 0.25
-    W_DESC   = 0.20
+    rows = _ranked_rows(jobs, 0, skills_score, title_score, desc_score)
 
-    ranked = []
-    for i, j in enumerate(jobs):
-        job_skill_text = j.get("skills", "") or ""
-        job_blob = _join(j.get("title",""), j.get("description",""), job_skill_text)
+    # stable, so ties keep catalog order like the old list.sort()
+    order = np.argsort(-rows["score"], kind="stable")
+    if top_k:
+        order = order[:top_k]
+    return RankedJobs(rows[order], jobs, resume_skills)
 
-        job_skills = _skill_set(job_skill_text)
 
+def _ranked_rows(jobs, start, skills_score, title_score, desc_score):
+    import numpy as np
+
+    weights = match_weights()
+    final = (
+        weights["skills"] * skills_score +
+        weights["title"]  * title_score  +
+        weights["desc"]   * desc_score
+    )
 
-        matched = sorted(list(resume_skills.intersection(job_skills)))
-        missing = sorted(list(job_skills.difference(resume_skills)))
+    # the score is rounded to 2 decimals in float64 first, so the float32
+    # column holds it exactly enough to round-trip; components stay raw
+    # (they are stored on MatchReport and re-weighted later)
+    rows = np.empty(len(jobs), dtype=RANKED_DTYPE)
+    rows["index"] = np.arange(start, start + len(jobs))
+    rows["job_id"] = [j.get("id") or 0 for j in jobs]
+    rows["score"] = np.round(np.minimum(final * 100.0, 100.0), 2)
+    rows["skills_score"] = skills_score * 100
+    rows["title_score"] = title_score * 100
+    rows["desc_score"] = desc_score * 100
+    return rows
 
-        skills_score = skill_sims[i]
-        title_score  = title_sims[i]
-        desc_score   = desc_sims[i]
 
-        final = (
-            W_SKILLS * skills_score +
-            W_TITLE  * title_score  +
-            W_DESC   * desc_score
+# jobs vectorized at a time in hashing mode
+HASHING_CHUNK_SIZE = 2000
+
+
+@timed("tfidf_hashed")
+def _rank_jobs_hashed(resume_text, jobs, top_k, chunk_size=HASHING_CHUNK_SIZE) -> RankedJobs:
+    import numpy as np
+    from .hashing import HashedQuery
+
+    resume_text = resume_text or ""
+    query = HashedQuery(resume_text)
+
+    kept_rows = np.empty(0, dtype=RANKED_DTYPE)
+    kept_jobs = []
+
+    def score_chunk(chunk):
+        nonlocal kept_rows, kept_jobs
+        rows = _ranked_rows(
+            chunk,
+            len(kept_jobs),
+            query.sims("skills", [j.get("skills", "") or "" for j in chunk]),
+            query.sims("title", [j.get("title", "") or "" for j in chunk]),
+            query.sims("description", [j.get("description", "") or "" for j in chunk]),
         )
+        add_pairs(len(chunk))
+        kept_rows = np.concatenate([kept_rows, rows])
+        kept_jobs.extend(chunk)
 
-        score_100 = round(final * 100.0, 2)
+        # prune when the pool doubles: at most 2 * max(top_k, chunk) jobs held
+        if top_k and len(kept_jobs) >= 2 * max(top_k, chunk_size):
+            # best score first, earlier job first on ties
+            best = np.lexsort((kept_rows["index"], -kept_rows["score"]))[:top_k]
+            best.sort()
+            kept_jobs = [kept_jobs[i] for i in best]
+            kept_rows = kept_rows[best]
+            kept_rows["index"] = np.arange(len(best))
 
-        ranked.append({
-            **j,
-            "score": score_100,
-            "matched_skills": matched[:25],     # cap for response size
-            "missing_skills": missing[:25],
-            "breakdown": {
-                "skills_score": round(skills_score * 100, 2),
-                "title_score":  round(title_score * 100, 2),
-                "desc_score":   round(desc_score * 100, 2),
-            }
-        })
+    chunk = []
+    for job in jobs:
+        chunk.append(job)
+        if len(chunk) >= chunk_size:
+            score_chunk(chunk)
+            chunk = []
+    if chunk:
+        score_chunk(chunk)
+
+    order = np.argsort(-kept_rows["score"], kind="stable")
+    if top_k:
+        order = order[:top_k]
+    return RankedJobs(kept_rows[order], kept_jobs, _skill_set(resume_text))
 
-    ranked.sort(key=lambda x: x["score"], reverse=True)
-    return ranked
+
+def rank_catalog_for_resume(resume_text: str, top_k: int = 50) -> RankedJobs:
+    """Top-k of the whole job catalog, streamed from the database (hashing mode)."""
+    jobs = (
+        Job.objects.open()
+        .order_by("id")
+        .values("id", "title", "description", "skills")
+        .iterator(chunk_size=HASHING_CHUNK_SIZE)
+    )
+    return rank_jobs_for_resume(resume_text, jobs, vectorizer="hashing", top_k=top_k)
 
 # -------------------------------
 # Day 3: Job -> Resume Matching (MatchReport)
@@ -115,56 +369,83 @@ def _job_dict(job: Job) -> dict:
 
 
 
-@transaction.atomic
-def build_match_reports_for_job(job_id: int, user=None) -> dict:
+SCORE_FIELDS = ["score", "skills_score", "title_score", "desc_score", "missing_skills"]
+
+
+def _report_fields(components, missing_skills, weights) -> dict:
     """
-    Score ALL resumes against ONE job using existing rank_jobs_for_resume(),
-    then upsert MatchReport.
-    Returns counts.
+    MatchReport score fields from the (skills, title, desc) similarities
+    (0-100) of one pair: the components themselves plus `score`, their
+    blend under `weights`. The ATS fields are filled separately by
+    generate_pending_reports().
     """
-    created = 0
-    updated = 0
+    # ✅ clamp to 0-100
+    skills_score, title_score, desc_score = (
+        max(0.0, min(100.0, float(c or 0))) for c in components
+    )
 
+    score = (
+        weights["skills"] * skills_score +
+        weights["title"]  * title_score  +
+        weights["desc"]   * desc_score
+    )
+
+    return {
+        "score": round(max(0.0, min(100.0, score)), 2),
+        "skills_score": skills_score,
+        "title_score": title_score,
+        "desc_score": desc_score,
+        "missing_skills": list(missing_skills or []),
+    }
+
+
+def iter_match_reports_for_job(job_id: int, user=None):
+    """
+    Generator version of build_match_reports_for_job():
+    scores resumes one by one and yields (MatchReport, was_created)
+    as soon as each row is upserted, so callers can stream results.
+    """
     job = Job.objects.get(id=job_id)
     payload = _job_dict(job)
+    weights = match_weights(job)
 
     resumes = Resume.objects.select_related("user").all()
     if user is not None:
         resumes = resumes.filter(user=user)
 
     for res in resumes:
-        ranked = rank_jobs_for_resume(res.content or "", [payload])
-        r0 = ranked[0] if ranked else {}
-
-        # ✅ Normalize score to 0-100
-        raw_score = float(r0.get("score", 0) or 0)
-
-        # normalize to 0-100 robustly
-        if raw_score <= 1.0:
-            score = raw_score * 100.0
-        else:
-            score = raw_score
-
-        # clamp + round
-        score = round(max(0.0, min(100.0, score)), 2)
+        # never-extracted resumes would store a 0.0 row missing every skill
+        text = ensure_resume_content(res)
+        if not text.strip():
+            continue
+        # exact fit, like the bulk scoring paths writing the same rows
+        ranked = rank_jobs_for_resume(text, [payload], vectorizer="exact")
+        row = ranked.rows[0]
+        components = (row["skills_score"], row["title_score"], row["desc_score"])
 
+        with timed("report_upsert"), transaction.atomic():
+            old = skillgaps.stored_rows([(res.id, job.id)])
+            obj, was_created = MatchReport.objects.update_or_create(
+                resume=res,
+                job=job,
+                defaults=_report_fields(components, ranked.skills(0)[1], weights),
+            )
+            skillgaps.apply_changes(old, [(res.id, job.id, obj.missing_skills)])
 
-        missing_skills = r0.get("missing_skills", []) or []
-        breakdown = r0.get("breakdown", {}) or {}
+        yield obj, was_created
 
-        # ATS = skills_score% (already 0-100)
-        ats_score = int(round(float(breakdown.get("skills_score", 0) or 0), 0))
 
-        obj, was_created = MatchReport.objects.update_or_create(
-            resume=res,
-            job=job,
-            defaults={
-                "score": score,
-                "ats_score": ats_score,
-                "missing_skills": missing_skills,
-            },
-        )
+@transaction.atomic
+def build_match_reports_for_job(job_id: int, user=None) -> dict:
+    """
+    Score ALL resumes against ONE job using existing rank_jobs_for_resume(),
+    then upsert MatchReport.
+    Returns counts.
+    """
+    created = 0
+    updated = 0
 
+    for _, was_created in iter_match_reports_for_job(job_id, user=user):
         if was_created:
             created += 1
         else:
@@ -174,39 +455,60 @@ def build_match_reports_for_job(job_id: int, user=None) -> dict:
 
 
 
-def top_matches_for_job(job_id: int, user=None, min_score=None, must_have=None, limit=None):
+def normalize_must_have(must_have) -> List[str]:
+    """
+    Accepts None, "python, django" / newline separated text, or a list,
+    and returns a clean list of keywords.
     """
-    Returns MatchReport queryset (with resume + user preloaded) for ONE job.
+    if must_have is None:
+        return []
+    if isinstance(must_have, str):
+        # allow "python, django" or "python django"
+        return [x.strip() for x in must_have.replace("\n", ",").split(",") if x.strip()]
+    return [(x or "").strip() for x in must_have if (x or "").strip()]
+
+
+def top_matches_for_job(job_id: int, user=None, min_score=None, must_have=None, limit=None, build=True,
+                        weights=None, generate=True):
+    """
+    Returns MatchReport queryset (with resume + user preloaded) for ONE job,
+    annotated with `weighted_score` and ordered by it.
     - user: required (only that user's resumes)
-    - min_score: optional (float)
+    - min_score: optional (float, compared to weighted_score)
     - must_have: list[str] optional (resume.content contains all keywords)
     - limit: optional (int)
+    - build: rescore the user's resumes first (skip if already done)
+    - generate: fill missing ATS fields first (skip to serve stored rows only)
+    - weights: optional overrides for match_weights() ({"skills": 0.7, ...});
+      the blend is computed in SQL, so any weights are just a re-sort
     """
     if user is None:
         raise ValueError("user is required")
 
-    # normalize must_have safely
-    if must_have is None:
-        must_have = []
-    if isinstance(must_have, str):
-        # allow "python, django" or "python django"
-        must_have = [x.strip() for x in must_have.replace("\n", ",").split(",") if x.strip()]
-    else:
-        must_have = [(x or "").strip() for x in must_have if (x or "").strip()]
+    must_have = normalize_must_have(must_have)
 
     # Ensure reports exist (safe call)
-    build_match_reports_for_job(job_id, user=user)
+    if build:
+        build_match_reports_for_job(job_id, user=user)
 
+    # ATS fields are generated once per (resume, job, report version)
+    if generate:
+        generate_pending_reports(
+            MatchReport.objects.filter(job_id=job_id, resume__user=user)
+        )
+
+    job = Job.objects.get(id=job_id)
     qs = (
         MatchReport.objects
         .select_related("resume", "resume__user", "job")
         .filter(job_id=job_id, resume__user=user)
+        .annotate(weighted_score=weighted_score_expression(match_weights(job, weights)))
     )
 
     # min_score filter
     if min_score not in (None, ""):
         try:
-            qs = qs.filter(score__gte=float(min_score))
+            qs = qs.filter(weighted_score__gte=float(min_score))
         except (TypeError, ValueError):
             pass
 
@@ -215,7 +517,11 @@ def top_matches_for_job(job_id: int, user=None, min_score=None, must_have=None,
         qs = qs.filter(resume__content__icontains=kw)
 
     # Highest score first
-    qs = qs.order_by("-score", "-id")
+    qs = qs.order_by("-weighted_score", "-id")
+
+    # nothing written above: a pure read, fine for the replica
+    if not build and not generate:
+        qs = qs.using(read_db(user))
 
     # limit
     if limit not in (None, ""):
@@ -225,3 +531,955 @@ def top_matches_for_job(job_id: int, user=None, min_score=None, must_have=None,
             pass
 
     return qs
+
+
+# ==========================
+# Bulk scoring: many resumes x many jobs in one vectorized pass
+# ==========================
+
+# smoothed idf of a term that appears in only one of the two documents
+# of a (resume, field) TF-IDF fit: ln((1 + 2) / (1 + 1)) + 1
+_IDF_ONE_SIDED = math.log(1.5) + 1.0
+
+# rows of each side multiplied together in one sparse block
+SCORE_BLOCK_SIZE = 500
+
+
+def _binary(X):
+    B = X.copy()
+    B.data[:] = 1.0
+    return B
+
+
+def _pairwise_sims_from_counts(Qc, Dc) -> "np.ndarray":
+    """
+    pairwise_tfidf_sims() for count matrices (rows = documents) that
+    share one vocabulary.
+    """
+    import numpy as np
+
+    Qc = Qc.astype(np.float64).tocsr()
+    Dc = Dc.astype(np.float64).tocsr()
+    Q2, D2 = Qc.multiply(Qc).tocsr(), Dc.multiply(Dc).tocsr()
+
+    c2 = _IDF_ONE_SIDED ** 2
+    dot = (Qc @ Dc.T).toarray()
+    q_norm2 = c2 * np.asarray(Q2.sum(axis=1)) - (c2 - 1.0) * (Q2 @ _binary(Dc).T).toarray()
+    d_norm2 = c2 * np.asarray(D2.sum(axis=1)).T - (c2 - 1.0) * (_binary(Qc) @ D2.T).toarray()
+
+    denom = np.sqrt(np.clip(q_norm2, 0, None) * np.clip(d_norm2, 0, None))
+    return np.divide(dot, denom, out=np.zeros_like(dot), where=denom > 0)
+
+
+@timed("pairwise_tfidf")
+def pairwise_tfidf_sims(queries: List[str], docs: List[str]) -> "np.ndarray":
+    """
+    len(queries) x len(docs) matrix of the similarity that tfidf_sim()
+    in rank_jobs_for_resume() gives for a single (query, doc) pair.
+
+    Each pair is its own two-document TF-IDF fit, so a term's idf is 1
+    when both documents contain it and _IDF_ONE_SIDED otherwise. That
+    lets the cosine be written with sparse count-matrix products
+    instead of one vectorizer fit per pair.
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    if not queries or not docs:
+        return np.zeros((len(queries), len(docs)))
+
+    try:
+        X = CountVectorizer(stop_words="english").fit_transform(list(queries) + list(docs))
+    except ValueError:
+        # empty vocabulary (all texts empty / stop words)
+        return np.zeros((len(queries), len(docs)))
+
+    X = X.tocsr()
+    return _pairwise_sims_from_counts(X[:len(queries)], X[len(queries):])
+
+
+def score_resumes_against_jobs(resumes, jobs) -> Iterable[MatchReport]:
+    """
+    Yields unsaved MatchReport objects for every (resume, job) pair,
+    with the same score fields that build_match_reports_for_job()
+    would store.
+    Resumes without extracted text are skipped: scoring "" would store a
+    0.0 row listing every job skill as missing.
+    """
+    resumes = [r for r in resumes if (r.content or "").strip()]
+    jobs = list(jobs)
+
+    for r0 in range(0, len(resumes), SCORE_BLOCK_SIZE):
+        r_block = resumes[r0:r0 + SCORE_BLOCK_SIZE]
+        texts = [r.content or "" for r in r_block]
+        resume_skills = [_skill_set(t) for t in texts]
+
+        for j0 in range(0, len(jobs), SCORE_BLOCK_SIZE):
+            j_block = jobs[j0:j0 + SCORE_BLOCK_SIZE]
+
+            title_sims = pairwise_tfidf_sims(texts, [j.title or "" for j in j_block]) * 100
+            desc_sims = pairwise_tfidf_sims(texts, [j.description or "" for j in j_block]) * 100
+            skill_sims = pairwise_tfidf_sims(texts, [j.skills or "" for j in j_block]) * 100
+            add_pairs(skill_sims.size)
+
+            job_skills = [_skill_set(j.skills or "") for j in j_block]
+            weights = [match_weights(j) for j in j_block]
+
+            for ri, res in enumerate(r_block):
+                for ji, job in enumerate(j_block):
+                    fields = _report_fields(
+                        (skill_sims[ri, ji], title_sims[ri, ji], desc_sims[ri, ji]),
+                        sorted(job_skills[ji] - resume_skills[ri])[:MAX_SKILLS_LISTED],
+                        weights[ji],
+                    )
+                    yield MatchReport(resume=res, job=job, **fields)
+
+
+def bulk_upsert_match_reports(reports: Iterable[MatchReport], batch_size: int = 1000) -> int:
+    """
+    Writes MatchReport rows with bulk_create(), updating the score fields
+    of (resume, job) pairs that already exist. Returns rows written.
+    """
+    written = 0
+    batch = []
+
+    @timed("report_bulk_write")
+    def flush():
+        with transaction.atomic():
+            # missing_skills being replaced, for the skill-gap counters
+            old = skillgaps.stored_rows((r.resume_id, r.job_id) for r in batch)
+            MatchReport.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=["resume", "job"],
+                update_fields=SCORE_FIELDS,
+            )
+            skillgaps.apply_changes(old, [(r.resume_id, r.job_id, r.missing_skills) for r in batch])
+
+    for report in reports:
+        batch.append(report)
+        if len(batch) >= batch_size:
+            flush()
+            written += len(batch)
+            batch = []
+
+    if batch:
+        flush()
+        written += len(batch)
+
+    return written
+
+
+# ==========================
+# Bulk job import (CSV / JSONL)
+# ==========================
+
+JOB_IMPORT_FIELDS = ("title", "description", "skills")
+
+# keep the response small when a file is mostly garbage
+MAX_IMPORT_ERRORS = 100
+
+
+def iter_job_rows(lines: Iterable[str], fmt: str):
+    """
+    Parses text lines lazily into job dicts.
+    fmt: "csv" (header row required) or "jsonl" (one object per line).
+    Lines that cannot be parsed are yielded as ValueError instances so the
+    caller can report them with their row number.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(lines):
+            yield {k: row.get(k) or "" for k in JOB_IMPORT_FIELDS}
+        return
+
+    if fmt != "jsonl":
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield ValueError("Expected a JSON object")
+            continue
+        yield row
+
+
+def guess_import_format(filename: str) -> str:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError("Cannot detect format, use .csv or .jsonl")
+
+
+def bulk_import_jobs(rows: Iterable, batch_size: int = 1000, score: bool = True,
+                     skip: int = 0, on_batch=None) -> dict:
+    """
+    Validates job rows one at a time (JobSerializer), inserts them with
+    bulk_create() in batches, and scores each inserted batch against all
+    resumes in one vectorized pass (score_resumes_against_jobs()).
+    Returns counts + the first MAX_IMPORT_ERRORS row errors.
+
+    skip: rows already imported by an earlier run (read, not imported).
+    on_batch(progress): called inside each batch's transaction with the
+    rows read so far and the counts / errors since the previous batch, so
+    a caller can commit its progress together with the batch.
+    """
+    from .serializers import JobSerializer
+
+    totals = {"created": 0, "scored": 0, "error_count": 0, "errors": []}
+    batch = []
+    batch_errors = []
+    batch_error_count = 0
+    # unextracted resumes are scored on their first my_matches instead
+    resumes = list(Resume.objects.exclude(content="").only("id", "content")) if score else []
+
+    def flush(row_no):
+        with transaction.atomic():
+            jobs = Job.objects.bulk_create(batch)
+            # bulk_create() sends no post_save
+            count_new_jobs(jobs)
+            reports = bulk_upsert_match_reports(score_resumes_against_jobs(resumes, jobs)) if jobs else 0
+            if on_batch is not None:
+                on_batch({
+                    "rows": row_no,
+                    "created": len(jobs),
+                    "scored": reports,
+                    "error_count": batch_error_count,
+                    "errors": batch_errors,
+                })
+        totals["created"] += len(jobs)
+        totals["scored"] += reports
+        totals["error_count"] += batch_error_count
+
+    row_no = skip
+    for row_no, row in enumerate(rows, 1):
+        if row_no <= skip:
+            continue
+        if isinstance(row, Exception):
+            problem = str(row)
+        else:
+            serializer = JobSerializer(data=row)
+            if serializer.is_valid():
+                batch.append(Job(**serializer.validated_data))
+                problem = None
+            else:
+                problem = serializer.errors
+
+        if problem is not None:
+            batch_error_count += 1
+            if len(totals["errors"]) + len(batch_errors) < MAX_IMPORT_ERRORS:
+                batch_errors.append({"row": row_no, "errors": problem})
+
+        if len(batch) >= batch_size:
+            flush(row_no)
+            totals["errors"] += batch_errors
+            batch, batch_errors, batch_error_count = [], [], 0
+
+    # trailing invalid rows move the caller's progress on too
+    if batch or batch_error_count or on_batch is not None:
+        flush(row_no)
+        totals["errors"] += batch_errors
+
+    return totals
+
+
+# ==========================
+# Bulk resume import (zip / tar of PDF / DOCX resumes)
+# ==========================
+
+# Resume rows inserted (and progress saved) per bulk_create
+RESUME_IMPORT_BATCH = 50
+
+
+def _is_resume_member(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.lower().endswith(RESUME_EXTENSIONS) and not name.startswith(".")
+
+
+def _iter_archive_resumes(path: str):
+    """
+    Yields (filename, file object) for every PDF / DOCX member of a zip or tar
+    archive, reading members one at a time straight from disk.
+    """
+    max_size = settings.RESUME_IMPORT_MAX_FILE_SIZE
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not _is_resume_member(name):
+                    continue
+                if info.file_size > max_size:
+                    yield name, None
+                    continue
+                with zf.open(info) as fh:
+                    yield name, fh
+        return
+
+    if tarfile.is_tarfile(path):
+        with tarfile.open(path, mode="r:*") as tf:
+            for member in tf:
+                name = os.path.basename(member.name)
+                if not member.isfile() or not _is_resume_member(name):
+                    continue
+                if member.size > max_size:
+                    yield name, None
+                    continue
+                fh = tf.extractfile(member)
+                if fh is None:
+                    yield name, None
+                    continue
+                with fh:
+                    yield name, fh
+        return
+
+    raise ValueError("Unsupported archive, upload a .zip or .tar(.gz) file")
+
+
+def count_archive_resumes(path: str) -> int:
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            return sum(1 for i in zf.infolist() if not i.is_dir() and _is_resume_member(i.filename))
+    if tarfile.is_tarfile(path):
+        with tarfile.open(path, mode="r:*") as tf:
+            return sum(1 for m in tf if m.isfile() and _is_resume_member(m.name))
+    raise ValueError("Unsupported archive, upload a .zip or .tar(.gz) file")
+
+
+def _import_file_name(imp: ResumeImport, index: int, name: str) -> str:
+    """
+    Storage name of an archive member: the same on every attempt, so a
+    restarted import overwrites the files a dead worker left behind
+    instead of piling up copies.
+    """
+    return f"import{imp.id}_{index}_{name}"
+
+
+def run_resume_import(imp: ResumeImport) -> None:
+    """
+    Runs a claimed ResumeImport (claim_import()): copies each PDF / DOCX of
+    the archive into resume storage, extracts its text in a process pool
+    (extract_resume_text) and bulk-inserts Resume rows as each batch of
+    extractions finishes. A batch's rows and the import's counters are
+    committed together, so a restarted worker skips the `processed`
+    members. Members that are too big or yield no text are counted as
+    failed and get no Resume. On failure, copied files that never got
+    their Resume row are deleted again.
+    Raises ImportLeaseLost if another worker took the import over.
+    """
+    # (archive member index, unsaved Resume or None, extraction future)
+    pending = []
+
+    def write_batch():
+        batch = pending[:RESUME_IMPORT_BATCH]
+        ok = []
+        for _, res, future in batch:
+            text = ""
+            if future is not None:
+                try:
+                    text = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception:
+                    # unreadable file: counted as failed like an empty one
+                    pass
+            if text.strip():
+                res.content = text
+                ok.append(res)
+            elif res is not None:
+                res.file.delete(save=False)
+        with transaction.atomic():
+            Resume.objects.bulk_create(ok)
+            saved = heartbeat_import(
+                imp,
+                processed=batch[-1][0] + 1,
+                created=F("created") + len(ok),
+                failed=F("failed") + len(batch) - len(ok),
+            )
+            if not saved:
+                raise ImportLeaseLost(f"resume import {imp.id} was taken over")
+        del pending[:len(batch)]
+
+    try:
+        path = imp.archive.path
+        heartbeat_import(imp, total=count_archive_resumes(path))
+
+        # "spawn": workers only import cored.llm, and forking a process
+        # with open connections / threads is not safe
+        with ProcessPoolExecutor(
+            max_workers=settings.RESUME_IMPORT_WORKERS,
+            mp_context=get_context("spawn"),
+        ) as pool:
+            for index, (name, fh) in enumerate(_iter_archive_resumes(path)):
+                if index < imp.processed:
+                    continue
+                if fh is None:
+                    pending.append((index, None, None))
+                else:
+                    res = Resume(user=imp.user, title=os.path.splitext(name)[0][:100])
+                    stored = _import_file_name(imp, index, name)
+                    target = res.file.field.generate_filename(res, stored)
+                    if res.file.storage.exists(target):
+                        res.file.storage.delete(target)
+                    res.file.save(stored, File(fh, name=name), save=False)
+                    pending.append((index, res, pool.submit(extract_resume_text, res.file.path)))
+
+                # two batches in flight: the pool extracts the next one
+                # while this one is written
+                if len(pending) >= 2 * RESUME_IMPORT_BATCH:
+                    write_batch()
+
+            while pending:
+                write_batch()
+    except Exception as e:
+        # copied files without a Resume row would never be cleaned up
+        for _, res, _ in pending:
+            if res is not None:
+                res.file.delete(save=False)
+        if isinstance(e, ImportLeaseLost):
+            raise
+        finished = finish_import(imp, str(e))
+    else:
+        finished = finish_import(imp)
+
+    # the archive is no longer needed once its resumes are stored
+    if finished:
+        imp.archive.delete(save=False)
+
+
+# ==========================
+# Background imports, run by the `run_imports` worker command
+# ==========================
+
+class ImportLeaseLost(Exception):
+    """Another worker has taken the import over (this one stopped heartbeating)."""
+
+
+def _claimable_imports(model, now, lease_seconds: int):
+    # no heartbeat at all: left running by the old in-process thread
+    stale = Q(heartbeat_at__lt=now - timedelta(seconds=lease_seconds)) | Q(heartbeat_at__isnull=True)
+    return model.objects.filter(Q(status=model.STATUS_PENDING) | Q(stale, status=model.STATUS_RUNNING))
+
+
+def claim_import(model, worker: str, lease_seconds: int = None, max_attempts: int = 3):
+    """
+    Leases the oldest pending import of `model` (JobImport / ResumeImport)
+    to `worker`,
+    or a running one whose worker stopped heartbeating; None when there
+    is nothing to do. Compare-and-swap UPDATE on (id, attempts), so two
+    workers never run the same import.
+    """
+    lease_seconds = lease_seconds or settings.IMPORT_LEASE_SECONDS
+    now = timezone.now()
+
+    # imports whose workers died max_attempts times (OOM, killed): give up
+    (model.objects
+     .filter(status=model.STATUS_RUNNING, attempts__gte=max_attempts,
+             heartbeat_at__lt=now - timedelta(seconds=lease_seconds))
+     .update(status=model.STATUS_FAILED, error="worker stopped responding", finished_at=now))
+
+    while True:
+        imp = _claimable_imports(model, now, lease_seconds).order_by("id").first()
+        if imp is None:
+            return None
+        won = (
+            _claimable_imports(model, now, lease_seconds)
+            .filter(id=imp.id, attempts=imp.attempts)
+            .update(status=model.STATUS_RUNNING, worker=worker, heartbeat_at=now,
+                    attempts=F("attempts") + 1)
+        )
+        if won:
+            imp.refresh_from_db()
+            return imp
+
+
+def heartbeat_import(imp, **fields) -> bool:
+    """
+    Renews the lease, saving `fields` along with it. False if another
+    worker has taken the import over.
+    """
+    return bool(
+        type(imp).objects
+        .filter(id=imp.id, worker=imp.worker, attempts=imp.attempts, status=imp.STATUS_RUNNING)
+        .update(heartbeat_at=timezone.now(), **fields)
+    )
+
+
+def finish_import(imp, error: str = "") -> bool:
+    """done, or failed with `error`; False if the import was taken over."""
+    return heartbeat_import(
+        imp,
+        status=imp.STATUS_FAILED if error else imp.STATUS_DONE,
+        error=error[:1000],
+        finished_at=timezone.now(),
+    )
+
+
+def run_job_import(imp: JobImport) -> None:
+    """
+    Imports a claimed JobImport (bulk_import_jobs()), skipping the rows a
+    previous attempt already imported. Each batch commits its jobs, their
+    reports and the import's counters in one transaction, so a worker
+    killed midway neither loses nor repeats rows. A file that can't be
+    read (bad format, invalid UTF-8) fails the import, keeping the
+    batches imported before it.
+    Raises ImportLeaseLost if another worker took the import over.
+    """
+    errors = list(imp.errors)
+
+    def save_progress(progress):
+        errors.extend(progress["errors"][:MAX_IMPORT_ERRORS - len(errors)])
+        saved = heartbeat_import(
+            imp,
+            rows_done=progress["rows"],
+            created=F("created") + progress["created"],
+            scored=F("scored") + progress["scored"],
+            error_count=F("error_count") + progress["error_count"],
+            errors=errors,
+        )
+        if not saved:
+            # rolls this batch back, the new owner imports it
+            raise ImportLeaseLost(f"job import {imp.id} was taken over")
+
+    try:
+        with open(imp.file.path, encoding="utf-8", newline="") as f:
+            bulk_import_jobs(iter_job_rows(f, imp.format), skip=imp.rows_done, on_batch=save_progress)
+    except ImportLeaseLost:
+        raise
+    except (OSError, ValueError) as e:
+        # UnicodeDecodeError is a ValueError too
+        finished = finish_import(imp, str(e))
+    else:
+        finished = finish_import(imp)
+
+    if finished:
+        imp.file.delete(save=False)
+
+
+# ==========================
+# Recruiter-scale rebuild: top-K resumes for every job
+# ==========================
+
+class ScoreCorpus:
+    """
+    Count matrices of all resumes and of each job field over one shared
+    vocabulary, so every document is tokenized once and any
+    (resume block, job block) can be scored with sparse products.
+    """
+
+    def __init__(self, resumes, jobs):
+        import numpy as np
+        from scipy.sparse import csr_matrix
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        resumes = list(resumes)
+        jobs = list(jobs)
+
+        self.resume_ids = np.array([r.id for r in resumes], dtype=np.int64)
+        self.job_ids = np.array([j.id for j in jobs], dtype=np.int64)
+        self.resume_skills = [_skill_set(r.content or "") for r in resumes]
+        self.job_skills = [_skill_set(j.skills or "") for j in jobs]
+        # (jobs, 3) skills / title / desc weights, each job's own if set
+        self.weights = np.array(
+            [[w[k] for k in WEIGHT_KEYS] for w in map(match_weights, jobs)], dtype=np.float64
+        ).reshape(len(jobs), 3)
+
+        fields = [
+            [r.content or "" for r in resumes],
+            [j.title or "" for j in jobs],
+            [j.description or "" for j in jobs],
+            [j.skills or "" for j in jobs],
+        ]
+
+        vec = CountVectorizer(stop_words="english")
+        try:
+            vec.fit(t for texts in fields for t in texts)
+            self.resumes, self.titles, self.descs, self.skills = (
+                vec.transform(texts).astype(np.float64).tocsr() for texts in fields
+            )
+        except ValueError:
+            # empty vocabulary: every similarity is 0
+            self.resumes, self.titles, self.descs, self.skills = (
+                csr_matrix((len(texts), 1)) for texts in fields
+            )
+
+    @timed("top_k_block")
+    def top_k_for_jobs(self, j_lo: int, j_hi: int, top_k: int, block: int):
+        """
+        Best top_k resumes for jobs[j_lo:j_hi] under each job's weights,
+        scanning resumes in blocks of `block` rows so at most
+        block x (j_hi - j_lo) scores are dense at a time. Returns
+        (resume_idx, final, components) arrays of shapes (jobs, k) and
+        (jobs, k, 3), best first.
+        """
+        import numpy as np
+
+        n_jobs = j_hi - j_lo
+        best_idx = np.zeros((n_jobs, 0), dtype=np.int64)
+        best_final = np.zeros((n_jobs, 0))
+        best_comp = np.zeros((n_jobs, 0, 3))
+
+        titles = self.titles[j_lo:j_hi]
+        descs = self.descs[j_lo:j_hi]
+        skills = self.skills[j_lo:j_hi]
+        weights = self.weights[j_lo:j_hi]
+
+        for r0 in range(0, self.resumes.shape[0], block):
+            R = self.resumes[r0:r0 + block]
+            comp = np.stack([
+                _pairwise_sims_from_counts(R, skills).T,
+                _pairwise_sims_from_counts(R, titles).T,
+                _pairwise_sims_from_counts(R, descs).T,
+            ], axis=2)
+            final = np.einsum("jrc,jc->jr", comp, weights)
+            idx = np.broadcast_to(np.arange(r0, r0 + R.shape[0]), final.shape)
+
+            best_idx = np.hstack([best_idx, idx])
+            best_final = np.hstack([best_final, final])
+            best_comp = np.concatenate([best_comp, comp], axis=1)
+
+            if best_final.shape[1] > top_k:
+                keep = np.argpartition(-best_final, top_k - 1, axis=1)[:, :top_k]
+                best_idx = np.take_along_axis(best_idx, keep, axis=1)
+                best_final = np.take_along_axis(best_final, keep, axis=1)
+                best_comp = np.take_along_axis(best_comp, keep[:, :, None], axis=1)
+
+        order = np.argsort(-best_final, axis=1, kind="stable")
+        return (
+            np.take_along_axis(best_idx, order, axis=1),
+            np.take_along_axis(best_final, order, axis=1),
+            np.take_along_axis(best_comp, order[:, :, None], axis=1),
+        )
+
+    def match_reports(self, j_lo: int, result) -> List[MatchReport]:
+        """Unsaved MatchReport rows for a top_k_for_jobs() result."""
+        best_idx, _, best_comp = result
+        reports = []
+        for jj in range(best_idx.shape[0]):
+            job_id = int(self.job_ids[j_lo + jj])
+            job_skills = self.job_skills[j_lo + jj]
+            weights = dict(zip(WEIGHT_KEYS, self.weights[j_lo + jj]))
+            for ri, comp in zip(best_idx[jj], best_comp[jj]):
+                fields = _report_fields(
+                    comp * 100,
+                    sorted(job_skills - self.resume_skills[ri])[:MAX_SKILLS_LISTED],
+                    weights,
+                )
+                reports.append(MatchReport(
+                    resume_id=int(self.resume_ids[ri]), job_id=job_id, **fields
+                ))
+        return reports
+
+
+def rebuild_block_size(memory_mb: int, workers: int) -> int:
+    """
+    Side of the (resume block x job block) score tile so that all
+    workers together stay within memory_mb. Scoring one tile keeps about
+    twelve dense float64 matrices of that shape alive (the three
+    component scores are kept next to the blended one).
+    """
+    budget = memory_mb * 1024 * 1024 / max(1, workers)
+    side = int(math.sqrt(budget / (12 * 8)))
+    return max(16, min(side, 4096))
+
+
+def save_top_k_reports(corpus: ScoreCorpus, j_lo: int, result, prune: bool = False) -> List[int]:
+    """
+    Upserts the MatchReports of a ScoreCorpus.top_k_for_jobs() result
+    (and with prune, deletes each job's reports outside its top-K) in one
+    transaction. Returns the job ids written.
+    """
+    reports = corpus.match_reports(j_lo, result)
+    job_ids = [int(x) for x in corpus.job_ids[j_lo:j_lo + result[0].shape[0]]]
+    with transaction.atomic():
+        bulk_upsert_match_reports(reports)
+        if prune:
+            keep = {}
+            for r in reports:
+                keep.setdefault(r.job_id, []).append(r.resume_id)
+            for job_id in job_ids:
+                skillgaps.delete_reports(
+                    MatchReport.objects
+                    .filter(job_id=job_id)
+                    .exclude(resume_id__in=keep.get(job_id, []))
+                )
+    return job_ids
+
+
+# ==========================
+# Distributed rebuild: job ranges leased from the database
+# ==========================
+
+def plan_score_run(name: str, top_k: int = 50, jobs_per_unit: int = 500, prune: bool = False) -> ScoreRun:
+    """
+    Creates a ScoreRun whose work units cover every open job, jobs_per_unit
+    jobs each (as id ranges, so units stay valid if jobs are deleted).
+    """
+    ids = list(Job.objects.open().order_by("id").values_list("id", flat=True))
+    with transaction.atomic():
+        run = ScoreRun.objects.create(name=name, top_k=top_k, prune=prune)
+        ScoreWorkUnit.objects.bulk_create([
+            ScoreWorkUnit(run=run, job_lo=chunk[0], job_hi=chunk[-1])
+            for chunk in (ids[i:i + jobs_per_unit] for i in range(0, len(ids), jobs_per_unit))
+        ])
+    return run
+
+
+def _claimable(run: ScoreRun, now, max_attempts: int):
+    expired = Q(status=ScoreWorkUnit.STATUS_LEASED, lease_expires_at__lt=now)
+    return (
+        ScoreWorkUnit.objects
+        .filter(run=run, attempts__lt=max_attempts)
+        .filter(Q(status=ScoreWorkUnit.STATUS_PENDING) | expired)
+    )
+
+
+def claim_work_unit(run: ScoreRun, worker: str, lease_seconds: int = 300, max_attempts: int = 3):
+    """
+    Leases the next pending (or expired) unit of `run` to `worker`, or
+    returns None when nothing is left to claim.
+
+    Postgres / MySQL 8 / Oracle: SELECT ... FOR UPDATE SKIP LOCKED, so
+    concurrent workers never wait on each other. Elsewhere (SQLite):
+    compare-and-swap UPDATE on (status, attempts), retried on conflict.
+    """
+    now = timezone.now()
+
+    # units whose last attempt died with the lease held: give up on them
+    (ScoreWorkUnit.objects
+     .filter(run=run, status=ScoreWorkUnit.STATUS_LEASED,
+             lease_expires_at__lt=now, attempts__gte=max_attempts)
+     .update(status=ScoreWorkUnit.STATUS_FAILED, error="lease expired", finished_at=now))
+
+    lease = {
+        "status": ScoreWorkUnit.STATUS_LEASED,
+        "worker": worker,
+        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+        "heartbeat_at": now,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            unit = (
+                _claimable(run, now, max_attempts)
+                .select_for_update(skip_locked=True)
+                .order_by("id")
+                .first()
+            )
+            if unit is None:
+                return None
+            ScoreWorkUnit.objects.filter(id=unit.id).update(attempts=F("attempts") + 1, **lease)
+    else:
+        while True:
+            unit = _claimable(run, now, max_attempts).order_by("id").first()
+            if unit is None:
+                return None
+            won = (
+                _claimable(run, now, max_attempts)
+                .filter(id=unit.id, attempts=unit.attempts)
+                .update(attempts=F("attempts") + 1, **lease)
+            )
+            if won:
+                break
+
+    unit.refresh_from_db()
+    return unit
+
+
+def heartbeat_work_unit(unit: ScoreWorkUnit, lease_seconds: int = 300) -> bool:
+    """Extends the lease; False if another worker has taken the unit over."""
+    now = timezone.now()
+    return bool(
+        ScoreWorkUnit.objects
+        .filter(id=unit.id, worker=unit.worker, attempts=unit.attempts,
+                status=ScoreWorkUnit.STATUS_LEASED)
+        .update(lease_expires_at=now + timedelta(seconds=lease_seconds), heartbeat_at=now)
+    )
+
+
+def finish_work_unit(unit: ScoreWorkUnit, reports_written: int) -> bool:
+    return bool(
+        ScoreWorkUnit.objects
+        .filter(id=unit.id, worker=unit.worker, attempts=unit.attempts,
+                status=ScoreWorkUnit.STATUS_LEASED)
+        .update(status=ScoreWorkUnit.STATUS_DONE, reports_written=reports_written,
+                error="", finished_at=timezone.now())
+    )
+
+
+def fail_work_unit(unit: ScoreWorkUnit, error: str, max_attempts: int = 3) -> None:
+    """Back to pending for another worker, or failed after max_attempts."""
+    failed = unit.attempts >= max_attempts
+    (ScoreWorkUnit.objects
+     .filter(id=unit.id, worker=unit.worker, attempts=unit.attempts)
+     .update(
+         status=ScoreWorkUnit.STATUS_FAILED if failed else ScoreWorkUnit.STATUS_PENDING,
+         error=error[:1000],
+         lease_expires_at=None,
+         finished_at=timezone.now() if failed else None,
+     ))
+
+
+def score_work_unit(corpus: ScoreCorpus, unit: ScoreWorkUnit, block: int) -> int:
+    """
+    Scores the unit's jobs (those present in `corpus`) against every
+    resume and writes their top-K reports. Returns reports written.
+    """
+    import numpy as np
+
+    j_lo = int(np.searchsorted(corpus.job_ids, unit.job_lo, side="left"))
+    j_hi = int(np.searchsorted(corpus.job_ids, unit.job_hi, side="right"))
+    top_k = unit.run.top_k
+
+    written = 0
+    for lo in range(j_lo, j_hi, block):
+        hi = min(lo + block, j_hi)
+        result = corpus.top_k_for_jobs(lo, hi, top_k, block)
+        save_top_k_reports(corpus, lo, result, prune=unit.run.prune)
+        written += int(result[0].size)
+    return written
+
+
+# ==========================
+# ATS report stage: fill MatchReport ATS fields once per model version
+# ==========================
+
+REPORT_FIELDS = [
+    "ats_score",
+    "ats_missing_skills",
+    "improvements",
+    "tailored_summary",
+    "cover_letter",
+    "interview_questions",
+    "report_version",
+]
+
+
+def ensure_resume_content(resume: Resume) -> str:
+    """
+    Returns resume.content, extracting it from the file (and saving it)
+    the first time, so a file is parsed once instead of per job.
+    Works for PDF and DOCX uploads.
+    """
+    if not resume.content and resume.file:
+        resume.content = extract_resume_text(resume.file.path)
+        Resume.objects.filter(id=resume.id).update(content=resume.content)
+        if resume.content:
+            # rows stored before the text existed were scored on ""
+            skillgaps.delete_reports(MatchReport.objects.filter(resume_id=resume.id))
+    return resume.content or ""
+
+
+def extract_missing_resume_content() -> int:
+    """
+    ensure_resume_content() for every resume with a file but no text yet,
+    before a bulk scorer loads the corpus. Returns resumes extracted.
+    """
+    extracted = 0
+    pending = Resume.objects.filter(content="").exclude(file="").only("id", "file", "content")
+    for resume in pending.iterator():
+        if ensure_resume_content(resume):
+            extracted += 1
+    return extracted
+
+
+def scorable_resumes():
+    """Resumes with extracted text, as the bulk scorers load them."""
+    return Resume.objects.exclude(content="").order_by("id").only("id", "content")
+
+
+def iter_score_missing_pairs(resume: Resume, chunk_size: int = SCORE_BLOCK_SIZE):
+    """
+    Scores the resume against the open jobs it has no MatchReport for,
+    chunk_size jobs per vectorized pass, yielding each chunk's job ids
+    once its rows are written.
+
+    MATCH_VECTORIZER="hashing": only the catalog's top
+    HASHING_CANDIDATES jobs for this resume (rank_catalog_for_resume())
+    are candidates, instead of every open job; they are then scored and
+    stored like in exact mode.
+    """
+    text = ensure_resume_content(resume)
+    if not text.strip():
+        return
+    missing = Job.objects.open().exclude(matchreport__resume=resume)
+    if settings.MATCH_VECTORIZER == "hashing":
+        candidates = rank_catalog_for_resume(text, top_k=settings.HASHING_CANDIDATES)
+        missing = missing.filter(id__in=[int(i) for i in candidates.rows["job_id"]])
+    job_ids = list(missing.order_by("id").values_list("id", flat=True))
+    for lo in range(0, len(job_ids), chunk_size):
+        ids = job_ids[lo:lo + chunk_size]
+        bulk_upsert_match_reports(score_resumes_against_jobs([resume], Job.objects.filter(id__in=ids)))
+        yield ids
+
+
+def score_missing_pairs_for_resume(resume: Resume) -> int:
+    """
+    Creates MatchReport rows for jobs this resume has never been scored
+    against. Returns rows written.
+    """
+    return sum(len(ids) for ids in iter_score_missing_pairs(resume))
+
+
+def iter_generated_reports(reports, batch_size: int = 200):
+    """
+    Fills the ATS fields of MatchReports whose report_version is not
+    current, yielding each report once its batch is saved. Resume skills
+    are extracted once per resume, and report content is shared between
+    pairs with the same skill-gap signature (llm.build_report_content).
+    """
+    pending = (
+        reports
+        .exclude(report_version=REPORT_MODEL_VERSION)
+        .select_related("job")
+        .order_by("resume_id", "id")
+    )
+
+    resume_id, skills = None, set()
+    batch = []
+
+    for rep in pending.iterator(chunk_size=batch_size):
+        # rows are ordered by resume: extract each resume's skills once
+        if rep.resume_id != resume_id:
+            resume_id = rep.resume_id
+            # stored text: reports only exist for extracted resumes
+            skills = extract_skills(Resume.objects.only("content").get(id=resume_id).content or "")
+
+        report = generate_ai_report_from_skills(
+            skills,
+            job_title=rep.job.title,
+            job_desc=rep.job.description or "",
+            job_skills=rep.job.skills or "",
+        )
+        rep.ats_score = report["ats_score"]
+        rep.ats_missing_skills = report["missing_skills"]
+        rep.improvements = report["improvements"]
+        rep.tailored_summary = report["tailored_summary"]
+        rep.cover_letter = report["cover_letter"]
+        rep.interview_questions = report["interview_questions"]
+        rep.report_version = REPORT_MODEL_VERSION
+        batch.append(rep)
+
+        if len(batch) >= batch_size:
+            with timed("report_bulk_write"):
+                MatchReport.objects.bulk_update(batch, REPORT_FIELDS)
+            yield from batch
+            batch = []
+
+    if batch:
+        with timed("report_bulk_write"):
+            MatchReport.objects.bulk_update(batch, REPORT_FIELDS)
+        yield from batch
+
+
+def generate_pending_reports(reports) -> int:
+    """Runs iter_generated_reports() to completion; returns rows generated."""
+    return sum(1 for _ in iter_generated_reports(reports))
@@ -0,0 +1,124 @@
+"""
+Materialized skill-gap counts over MatchReport.missing_skills.
+
+"Which required skills do this job's applicants lack most" and "which
+skill would unlock the most jobs for me" would otherwise scan every
+report's JSON blob. Instead:
+
+- JobSkillGap(job, skill).missing        reports of the job missing skill
+- ResumeSkillGap(resume, skill)
+    .jobs_missing                        jobs whose report misses skill
+    .jobs_unlocked                       jobs where it is the only one missing
+
+are kept current with upsert increments: code writing reports passes the
+old and new missing_skills of each (resume, job) pair to apply_changes(),
+and deletes go through delete_reports() or the Job / Resume pre_delete
+signals. Counts cover the listed skills (missing_skills is capped at
+services.MAX_SKILLS_LISTED). rebuild() recounts everything.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from .counters import add_counts
+from .models import JobSkillGap, MatchReport, ResumeSkillGap
+
+SKILL_MAX_LENGTH = JobSkillGap._meta.get_field("skill").max_length
+
+
+def _add_rows(rows, sign, job_counts, resume_counts):
+    for resume_id, job_id, missing in rows:
+        skills = {s[:SKILL_MAX_LENGTH] for s in missing or [] if s}
+        for skill in skills:
+            job_counts[(job_id, skill)] += sign
+            resume_counts[(resume_id, skill)][0] += sign
+        if len(skills) == 1:
+            resume_counts[(resume_id, next(iter(skills)))][1] += sign
+
+
+def apply_changes(old_rows, new_rows) -> None:
+    """
+    old_rows / new_rows: (resume_id, job_id, missing_skills) of the
+    reports before and after a write (a pair only in new_rows was
+    created, only in old_rows deleted). Unchanged pairs cancel out.
+    """
+    job_counts = Counter()
+    resume_counts = defaultdict(lambda: [0, 0])
+    _add_rows(old_rows, -1, job_counts, resume_counts)
+    _add_rows(new_rows, 1, job_counts, resume_counts)
+
+    job_rows = [(job_id, skill, n) for (job_id, skill), n in job_counts.items() if n]
+    resume_rows = [
+        (resume_id, skill, missing, unlocked)
+        for (resume_id, skill), (missing, unlocked) in resume_counts.items()
+        if missing or unlocked
+    ]
+    add_counts(JobSkillGap, ("job", "skill"), ("missing",), job_rows)
+    add_counts(ResumeSkillGap, ("resume", "skill"), ("jobs_missing", "jobs_unlocked"), resume_rows)
+
+    # drop counters that went back to zero
+    emptied_jobs = {job_id for job_id, _, n in job_rows if n < 0}
+    if emptied_jobs:
+        JobSkillGap.objects.filter(job_id__in=emptied_jobs, missing__lte=0).delete()
+    emptied_resumes = {resume_id for resume_id, _, m, u in resume_rows if m < 0 or u < 0}
+    if emptied_resumes:
+        ResumeSkillGap.objects.filter(resume_id__in=emptied_resumes, jobs_missing__lte=0).delete()
+
+
+def stored_rows(pairs):
+    """(resume_id, job_id, missing_skills) of the existing reports among `pairs`."""
+    pairs = set(pairs)
+    if not pairs:
+        return []
+    reports = (
+        MatchReport.objects
+        .filter(resume_id__in={r for r, _ in pairs}, job_id__in={j for _, j in pairs})
+        .values_list("resume_id", "job_id", "missing_skills")
+    )
+    return [row for row in reports if (row[0], row[1]) in pairs]
+
+
+@transaction.atomic
+def delete_reports(reports) -> int:
+    """Deletes a MatchReport queryset and uncounts it. Returns rows deleted."""
+    old = list(reports.values_list("resume_id", "job_id", "missing_skills"))
+    deleted, _ = reports.delete()
+    apply_changes(old, [])
+    return deleted
+
+
+@transaction.atomic
+def rebuild(chunk_size: int = 5000) -> int:
+    """Recounts from every MatchReport (the one full scan). Returns reports counted."""
+    JobSkillGap.objects.all().delete()
+    ResumeSkillGap.objects.all().delete()
+
+    counted = 0
+    chunk = []
+    reports = MatchReport.objects.values_list("resume_id", "job_id", "missing_skills")
+    for row in reports.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            apply_changes([], chunk)
+            counted += len(chunk)
+            chunk = []
+    apply_changes([], chunk)
+    return counted + len(chunk)
+
+
+# ===================== SIGNALS (apps.ready) =====================
+# a deleted job / resume cascades to its reports without per-row
+# signals; uncount them first (the instance's own counters cascade)
+
+def uncount_job_reports(sender, instance, **kwargs):
+    apply_changes(
+        MatchReport.objects.filter(job_id=instance.pk).values_list("resume_id", "job_id", "missing_skills"),
+        [],
+    )
+
+
+def uncount_resume_reports(sender, instance, **kwargs):
+    apply_changes(
+        MatchReport.objects.filter(resume_id=instance.pk).values_list("resume_id", "job_id", "missing_skills"),
+        [],
+    )
@@ -0,0 +1,41 @@
+"""
+Startup helpers for forked app servers.
+
+cored.views / cored.services import numpy, scipy, scikit-learn and
+pdfplumber lazily, so a worker that only serves pages never pays for
+them. Under gunicorn, gunicorn.conf.py calls preload_heavy_modules() in
+the master instead: workers are forked after it, so they share those
+modules' memory copy-on-write and the first scoring request is fast.
+"""
+import gc
+import importlib
+
+
+HEAVY_MODULES = (
+    "numpy",
+    "scipy.sparse",
+    "sklearn.feature_extraction.text",
+    "sklearn.metrics.pairwise",
+    "pdfplumber",
+)
+
+
+def preload_heavy_modules() -> list:
+    """Imports HEAVY_MODULES; returns the ones that could not be imported."""
+    missing = []
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            missing.append(name)
+    return missing
+
+
+def freeze_for_fork() -> None:
+    """
+    Moves everything allocated so far out of the cyclic GC's reach, so
+    collections in the workers don't write to (and un-share) pages
+    inherited from the master.
+    """
+    gc.collect()
+    gc.freeze()
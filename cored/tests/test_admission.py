@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import Throttled
+
+from cored.admission import PRIORITY_BATCH, ServerBusy, admit
+from cored.models import Job, Resume, User
+from cored.tests.test_resume_import import docx
+
+
+@override_settings(
+    ADMISSION_MAX_CONCURRENT=2, ADMISSION_RESERVED_SLOTS=1, ADMISSION_PER_USER=1,
+    ADMISSION_QUEUE_SIZE=0, ADMISSION_RETRY_AFTER=7,
+)
+class AdmissionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.mkdtemp()
+        cls._settings = override_settings(MEDIA_ROOT=cls.tmp, ADMISSION_LOCK_DIR=cls.tmp + "/admission")
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.other = User.objects.create_user("bob", password="pw")
+        self.client.force_login(self.user)
+
+    def test_one_request_in_flight_per_user(self):
+        with admit(self.user):
+            with self.assertRaises(Throttled) as ctx:
+                admit(self.user)
+            self.assertEqual(ctx.exception.wait, 7)
+            # other users aren't affected
+            admit(self.other).release()
+        admit(self.user).release()
+
+    def test_busy_user_gets_429_with_retry_after(self):
+        Resume.objects.create(user=self.user, title="cv", content="python developer")
+        Job.objects.create(title="Python developer", description="apis", skills="python")
+        with admit(self.user):
+            response = self.client.get("/api/resumes/my_matches/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "7")
+
+    def test_batch_work_leaves_the_reserved_slot(self):
+        with admit(None, PRIORITY_BATCH):
+            with self.assertRaises(ServerBusy):
+                admit(None, PRIORITY_BATCH)
+            # interactive requests still get the reserved one
+            with admit(self.user):
+                with self.assertRaises(ServerBusy):
+                    admit(self.other)
+
+    def test_workers_take_no_user_slot(self):
+        with admit(None):
+            admit(self.user).release()
+
+    def test_stream_holds_the_slot_until_closed(self):
+        Resume.objects.create(user=self.user, title="cv", content="python developer")
+        Job.objects.create(title="Python developer", description="apis", skills="python")
+
+        response = self.client.get("/api/resumes/my_matches/?stream=1")
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(Throttled):
+            admit(self.user)
+
+        # a client that drops the stream (aborted fetch) frees the slot
+        response.close()
+        admit(self.user).release()
+
+    def test_upload_while_busy_extracts_later(self):
+        upload = SimpleUploadedFile("cv.docx", docx("Python Django developer"))
+        with admit(self.user):
+            response = self.client.post("/api/resumes/", {"title": "cv", "file": upload})
+        self.assertEqual(response.status_code, 201)
+        resume = Resume.objects.get(id=response.json()["id"])
+        self.assertEqual(resume.content, "")
+
+        Job.objects.create(title="Django developer", description="apis", skills="django")
+        response = self.client.get("/api/resumes/my_matches/")
+        self.assertEqual(response.status_code, 200)
+        resume.refresh_from_db()
+        self.assertIn("django", resume.content)
+
+    def test_upload_extracts_when_admitted(self):
+        upload = SimpleUploadedFile("cv.docx", docx("Python Django developer"))
+        response = self.client.post("/api/resumes/", {"title": "cv", "file": upload})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("python", Resume.objects.get(id=response.json()["id"]).content)
+        # and the slot was given back
+        admit(self.user).release()
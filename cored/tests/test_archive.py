@@ -0,0 +1,143 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from cored import skillgaps
+from cored.archive import (
+    archive_closed_jobs,
+    archive_job,
+    close_job,
+    close_stale_jobs,
+    restore_job,
+)
+from cored.models import Job, JobSkillGap, MatchReport, MatchReportArchive, Resume, ResumeSkillGap, User
+from cored.services import bulk_upsert_match_reports, score_resumes_against_jobs
+
+
+@override_settings(JOB_MAX_AGE_DAYS=30, ARCHIVE_AFTER_CLOSED_DAYS=7)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lock_dir = tempfile.mkdtemp()
+        cls._settings = override_settings(ADMISSION_LOCK_DIR=cls.lock_dir)
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.lock_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user("rec", password="pw", is_recruiter=True)
+        self.resumes = [
+            Resume.objects.create(user=self.recruiter, title=f"cv {i}", content=text)
+            for i, text in enumerate(["python django", "react css", "java sql"])
+        ]
+        self.job = Job.objects.create(title="Backend", description="apis", skills="python, django, sql")
+        self.other = Job.objects.create(title="Frontend", description="ui", skills="react, css")
+        bulk_upsert_match_reports(score_resumes_against_jobs(self.resumes, [self.job, self.other]))
+
+    def rows(self, job):
+        return sorted(
+            MatchReport.objects.filter(job=job).values_list(
+                "resume_id", "score", "missing_skills", "report_version", "created_at"
+            )
+        )
+
+    def gaps(self):
+        return (
+            sorted(JobSkillGap.objects.values_list("job_id", "skill", "missing")),
+            sorted(ResumeSkillGap.objects.values_list("resume_id", "skill", "jobs_missing", "jobs_unlocked")),
+        )
+
+    def assertCountsMatchRebuild(self):
+        counted = self.gaps()
+        skillgaps.rebuild()
+        self.assertEqual(counted, self.gaps())
+
+    def test_archive_and_restore_round_trip(self):
+        before = self.rows(self.job)
+        close_job(self.job)
+
+        self.assertEqual(archive_job(self.job), 3)
+        self.assertFalse(MatchReport.objects.filter(job=self.job).exists())
+        self.assertFalse(JobSkillGap.objects.filter(job=self.job).exists())
+        self.assertEqual(MatchReportArchive.objects.get(job=self.job).report_count, 3)
+        self.assertCountsMatchRebuild()
+
+        self.assertEqual(restore_job(self.job), 3)
+        self.assertEqual(self.rows(self.job), before)
+        self.assertFalse(MatchReportArchive.objects.filter(job=self.job).exists())
+        self.assertCountsMatchRebuild()
+
+    def test_deleted_resumes_are_not_restored(self):
+        close_job(self.job)
+        archive_job(self.job)
+        self.resumes[0].delete()
+        self.assertEqual(restore_job(self.job), 2)
+
+    def test_rearchiving_keeps_the_newer_rows(self):
+        close_job(self.job)
+        archive_job(self.job)
+        # back to live, one pair rescored, closed again
+        restore_job(self.job)
+        MatchReport.objects.filter(job=self.job, resume=self.resumes[0]).update(score=77.0)
+        archive_job(self.job)
+        self.assertEqual(MatchReportArchive.objects.get(job=self.job).report_count, 3)
+
+        restore_job(self.job)
+        self.assertEqual(MatchReport.objects.get(job=self.job, resume=self.resumes[0]).score, 77.0)
+
+    def test_stale_jobs_close_and_archive_after_the_grace_period(self):
+        now = timezone.now()
+        Job.objects.filter(id=self.job.id).update(created_at=now - timedelta(days=40))
+        self.assertEqual(close_stale_jobs(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.STATUS_CLOSED)
+
+        # just closed: not archived yet
+        self.assertEqual(archive_closed_jobs(), (0, 0))
+
+        Job.objects.filter(id=self.job.id).update(closed_at=now - timedelta(days=8))
+        self.assertEqual(archive_closed_jobs(), (1, 3))
+        self.assertTrue(MatchReport.objects.filter(job=self.other).exists())
+
+    def test_closed_jobs_leave_matches_and_reopening_restores(self):
+        self.client.force_login(self.recruiter)
+        url = f"/api/jobs/{self.job.id}/"
+        self.assertEqual(self.client.patch(url, {"status": "closed"}, content_type="application/json").status_code, 200)
+        self.job.refresh_from_db()
+        self.assertIsNotNone(self.job.closed_at)
+
+        archive_job(self.job)
+        data = self.client.get("/api/resumes/my_matches/").json()
+        self.assertNotIn(self.job.id, {m["job_id"] for m in data["matches"]})
+        # closed jobs aren't rescored either
+        self.assertFalse(MatchReport.objects.filter(job=self.job).exists())
+
+        self.client.patch(url, {"status": "open"}, content_type="application/json")
+        self.assertEqual(MatchReport.objects.filter(job=self.job).count(), 3)
+        self.assertFalse(MatchReportArchive.objects.filter(job=self.job).exists())
+
+    def test_command(self):
+        close_job(self.job)
+        Job.objects.filter(id=self.job.id).update(closed_at=timezone.now() - timedelta(days=8))
+
+        out = StringIO()
+        call_command("archive_reports", "run", "--dry-run", stdout=out)
+        self.assertIn("Would archive 3 reports of 1 closed jobs", out.getvalue())
+        self.assertEqual(MatchReport.objects.filter(job=self.job).count(), 3)
+
+        call_command("archive_reports", "run", stdout=out)
+        call_command("archive_reports", "status", stdout=out)
+        self.assertIn("3 archived in 1 job archives", out.getvalue())
+
+        call_command("archive_reports", "restore", str(self.job.id), stdout=out)
+        self.assertIn("Restored 3 reports", out.getvalue())
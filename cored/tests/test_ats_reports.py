@@ -0,0 +1,118 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from cored import services
+from cored.llm import REPORT_MODEL_VERSION, build_report_content
+from cored.models import Job, MatchReport, Resume, User
+from cored.services import (
+    bulk_upsert_match_reports,
+    ensure_resume_content,
+    generate_pending_reports,
+    score_resumes_against_jobs,
+)
+
+
+def docx(text):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>",
+        )
+    return buf.getvalue()
+
+
+class StoredAtsReportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.mkdtemp()
+        cls._settings = override_settings(MEDIA_ROOT=cls.tmp, ADMISSION_LOCK_DIR=cls.tmp + "/admission")
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.resume = Resume.objects.create(user=self.user, title="cv", content="python django sql developer")
+        self.jobs = [
+            Job.objects.create(title="Backend developer", description="apis", skills="python, django, docker"),
+            Job.objects.create(title="Frontend developer", description="ui", skills="react, css"),
+        ]
+        self.client.force_login(self.user)
+
+    def my_matches(self):
+        rows = self.client.get("/api/resumes/my_matches/").json()["matches"]
+        return sorted(rows, key=lambda r: r["job_id"])
+
+    def test_reports_are_generated_once_and_served_from_the_row(self):
+        spy = mock.patch.object(
+            services, "generate_ai_report_from_skills", wraps=services.generate_ai_report_from_skills
+        )
+        with spy as generate:
+            first = self.my_matches()
+            self.assertEqual(generate.call_count, 2)
+            second = self.my_matches()
+            self.assertEqual(generate.call_count, 2)
+
+        self.assertEqual(first, second)
+        for row in first:
+            report = MatchReport.objects.get(resume=self.resume, job_id=row["job_id"])
+            self.assertEqual(report.report_version, REPORT_MODEL_VERSION)
+            self.assertEqual(row["ats_score"], report.ats_score)
+            self.assertEqual(row["improvements"], report.improvements)
+            self.assertEqual(row["interview_questions"], report.interview_questions)
+            self.assertTrue(report.cover_letter)
+
+    def test_missing_skills_match_the_improvements(self):
+        for row in self.my_matches():
+            # improvements / questions are written about the ATS gap ...
+            for skill in row["missing_skills"]:
+                self.assertTrue(any(skill in line for line in row["improvements"]), skill)
+            # ... the TF-IDF gap is reported separately
+            job = Job.objects.get(id=row["job_id"])
+            job_skills = {s.strip() for s in job.skills.split(",")}
+            self.assertLessEqual(set(row["job_missing_skills"]), job_skills)
+
+    def test_stale_version_is_regenerated(self):
+        self.my_matches()
+        MatchReport.objects.update(report_version="old", improvements=[])
+        self.assertEqual(generate_pending_reports(MatchReport.objects.all()), 2)
+        self.assertEqual(generate_pending_reports(MatchReport.objects.all()), 0)
+        self.assertFalse(MatchReport.objects.filter(improvements=[]).exists())
+
+    def test_content_is_shared_between_identical_skill_gaps(self):
+        twin = Resume.objects.create(user=self.user, title="twin", content="python django sql developer")
+        bulk_upsert_match_reports(score_resumes_against_jobs([self.resume, twin], self.jobs[:1]))
+
+        build_report_content.cache_clear()
+        generate_pending_reports(MatchReport.objects.all())
+        info = build_report_content.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+        a, b = MatchReport.objects.order_by("resume_id")
+        self.assertEqual(a.cover_letter, b.cover_letter)
+
+    def test_first_extraction_drops_reports_scored_on_empty_text(self):
+        resume = Resume(user=self.user, title="upload")
+        resume.file.save("cv.docx", ContentFile(docx("Python Django developer")), save=True)
+        MatchReport.objects.create(resume=resume, job=self.jobs[0], score=0.0)
+
+        self.assertEqual(ensure_resume_content(resume), "python django developer")
+        self.assertFalse(MatchReport.objects.filter(resume=resume).exists())
+
+        # later calls keep the stored text and its reports
+        MatchReport.objects.create(resume=resume, job=self.jobs[0], score=50.0)
+        ensure_resume_content(resume)
+        self.assertTrue(MatchReport.objects.filter(resume=resume).exists())
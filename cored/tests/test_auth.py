@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from cored.authentication import ApiTokenAuthentication, create_api_token, token_cache
+from cored.models import ApiToken, User
+
+
+class ApiTokenAuthTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user("alice", password="pw")
+        self.token, self.key = create_api_token(self.user)
+
+    def get(self, auth):
+        return self.client.get("/api/jobs/", HTTP_AUTHORIZATION=auth)
+
+    def test_bearer_and_token_schemes(self):
+        self.assertEqual(self.get(f"Bearer {self.key}").status_code, 200)
+        # second request is served from the token cache
+        self.assertEqual(self.get(f"Token {self.key}").status_code, 200)
+
+    def test_bad_keys_are_rejected(self):
+        self.assertIn(self.get("Bearer hs_nope").status_code, (401, 403))
+        self.assertIn(self.get(f"Bearer {self.key} extra").status_code, (401, 403))
+
+    def test_non_utf8_header_is_not_a_server_error(self):
+        self.assertIn(self.get("B\xe9arer x").status_code, (401, 403))
+        self.assertIn(self.get("Bearer k\xe9y").status_code, (401, 403))
+
+    def test_revoked_token_stops_working_immediately(self):
+        self.assertEqual(self.get(f"Bearer {self.key}").status_code, 200)
+        self.token.delete()
+        self.assertIn(self.get(f"Bearer {self.key}").status_code, (401, 403))
+
+    def test_expired_token(self):
+        ApiToken.objects.filter(id=self.token.id).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIn(self.get(f"Bearer {self.key}").status_code, (401, 403))
+
+    def test_cache_hit_runs_no_query(self):
+        request = RequestFactory().get("/api/jobs/", HTTP_AUTHORIZATION=f"Bearer {self.key}")
+        auth = ApiTokenAuthentication()
+        with self.assertNumQueries(1):
+            auth.authenticate(request)
+        with self.assertNumQueries(0):
+            user, _ = auth.authenticate(request)
+        self.assertEqual((user.pk, user.username, user.is_active), (self.user.pk, "alice", True))
+        # a new instance per request
+        self.assertIsNot(auth.authenticate(request)[0], user)
+
+    def test_deactivated_user_is_rejected_despite_cache(self):
+        self.assertEqual(self.get(f"Bearer {self.key}").status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIn(self.get(f"Bearer {self.key}").status_code, (401, 403))
+
+    def test_deactivation_elsewhere_applies_after_ttl(self):
+        self.assertEqual(self.get(f"Bearer {self.key}").status_code, 200)
+        # another process: no signal here, the entry ages out
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertEqual(self.get(f"Bearer {self.key}").status_code, 200)
+        with mock.patch.object(token_cache, "ttl", -1):
+            self.assertIn(self.get(f"Bearer {self.key}").status_code, (401, 403))
+
+    def test_login_does_not_drop_cached_tokens(self):
+        self.get(f"Bearer {self.key}")
+        self.assertTrue(self.client.login(username="alice", password="pw"))
+        self.assertIsNotNone(token_cache.get(self.token.key_hash))
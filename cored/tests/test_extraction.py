@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from cored import llm
+
+SAMPLE_PDF = os.path.join(settings.BASE_DIR, "resumes", "Yash_Gandhi_resume.pdf")
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+class ExtractionTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.layout = mock.patch.object(llm, "_pdf_text_layout", wraps=llm._pdf_text_layout)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def path(self, name, data=None):
+        path = os.path.join(self.tmp, name)
+        if data is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+        return path
+
+    def test_text_layer_skips_layout_analysis(self):
+        with self.layout as layout:
+            text = llm.extract_resume_text(SAMPLE_PDF)
+        layout.assert_not_called()
+        self.assertIn("professional summary", text)
+        self.assertEqual(text, text.lower())
+
+    def test_pdf_without_text_layer_falls_back_to_layout(self):
+        import pypdfium2 as pdfium
+
+        path = self.path("scan.pdf")
+        pdf = pdfium.PdfDocument.new()
+        pdf.new_page(612, 792)
+        pdf.save(path)
+        pdf.close()
+
+        with self.layout as layout:
+            self.assertEqual(llm.extract_text_from_pdf(path), "")
+        layout.assert_called_once_with(path)
+
+    def test_garbled_text_is_not_usable(self):
+        readable = "python django developer " * 10
+        self.assertTrue(llm._looks_usable(readable, pages=1))
+        self.assertFalse(llm._looks_usable("(cid:12)" * 40 + readable[:100], pages=1))
+        # too little text for two pages
+        self.assertFalse(llm._looks_usable(readable[:100], pages=2))
+
+    def test_broken_pdf_gives_empty_text(self):
+        self.assertEqual(llm.extract_text_from_pdf(self.path("broken.pdf", b"%PDF-1.4 garbage")), "")
+
+    def test_docx_paragraphs_tables_and_breaks(self):
+        xml = (
+            f"<w:document {W}><w:body>"
+            "<w:p><w:r><w:t>Jane Doe</w:t></w:r></w:p>"
+            "<w:p><w:r><w:t>Python</w:t><w:tab/><w:t>Django</w:t><w:br/><w:t>SQL</w:t></w:r></w:p>"
+            "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Docker</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+            "</w:body></w:document>"
+        )
+        path = self.path("cv.DOCX")
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("word/document.xml", xml)
+
+        # picked by extension, case-insensitively
+        self.assertEqual(llm.extract_resume_text(path), "jane doe\npython django\nsql\ndocker")
+
+    def test_broken_docx_gives_empty_text(self):
+        self.assertEqual(llm.extract_resume_text(self.path("cv.docx", b"not a zip")), "")
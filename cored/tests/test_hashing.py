@@ -0,0 +1,114 @@
+import shutil
+import tempfile
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.test import TestCase, override_settings
+
+from cored import hashing
+from cored.models import Job, MatchReport, Resume, TermDocFreq, User
+from cored.services import rank_catalog_for_resume, rank_jobs_for_resume
+
+JOBS = [
+    ("Python developer", "django rest apis", "python, django, sql"),
+    ("Data engineer", "spark pipelines", "python, spark, sql"),
+    ("Designer", "figma mockups", "figma, css"),
+    ("Chef", "kitchen", "cooking"),
+]
+
+RESUME = "python django developer, sql, rest apis"
+
+
+def as_dict(job):
+    return {"id": job.id, "title": job.title, "description": job.description, "skills": job.skills}
+
+
+@override_settings(MATCH_VECTORIZER="hashing", HASHING_N_FEATURES=2 ** 12)
+class HashingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lock_dir = tempfile.mkdtemp()
+        cls._settings = override_settings(ADMISSION_LOCK_DIR=cls.lock_dir)
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.lock_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        hashing.hashing_vectorizer.cache_clear()
+        self.addCleanup(hashing.hashing_vectorizer.cache_clear)
+        self.jobs = [Job.objects.create(title=t, description=d, skills=s) for t, d, s in JOBS]
+        hashing.rebuild_doc_freqs()
+
+    def counts(self):
+        return sorted(TermDocFreq.objects.exclude(df=0).values_list("field", "bucket", "df"))
+
+    def assertCountsMatchRebuild(self):
+        counted = self.counts()
+        hashing.rebuild_doc_freqs()
+        self.assertEqual(counted, self.counts())
+
+    def test_only_open_jobs_are_counted(self):
+        n_docs = TermDocFreq.objects.get(field="title", bucket=hashing.N_DOCS_BUCKET).df
+        self.assertEqual(n_docs, 4)
+
+        Job.objects.filter(id=self.jobs[3].id).update(status=Job.STATUS_CLOSED)
+        hashing.rebuild_doc_freqs()
+        n_docs = TermDocFreq.objects.get(field="title", bucket=hashing.N_DOCS_BUCKET).df
+        self.assertEqual(n_docs, 3)
+
+    def test_signals_keep_counts_current(self):
+        for signal, receiver in (
+            (pre_save, hashing.stash_job_text),
+            (post_save, hashing.count_saved_job),
+            (post_delete, hashing.uncount_deleted_job),
+        ):
+            signal.connect(receiver, sender=Job)
+            self.addCleanup(signal.disconnect, receiver, sender=Job)
+
+        Job.objects.create(title="Go developer", description="services", skills="go, grpc")
+        self.assertCountsMatchRebuild()
+
+        self.jobs[0].skills = "python, kubernetes"
+        self.jobs[0].save()
+        self.assertCountsMatchRebuild()
+
+        self.jobs[1].status = Job.STATUS_CLOSED
+        self.jobs[1].save()
+        self.assertCountsMatchRebuild()
+
+        self.jobs[2].delete()
+        self.assertCountsMatchRebuild()
+
+    def test_catalog_ranking_agrees_with_exact(self):
+        ranked = rank_catalog_for_resume(RESUME, top_k=2)
+        self.assertEqual(len(ranked), 2)
+        exact = rank_jobs_for_resume(RESUME, [as_dict(j) for j in self.jobs], vectorizer="exact")
+        self.assertEqual(ranked[0]["id"], exact[0]["id"])
+        self.assertEqual(ranked[0]["id"], self.jobs[0].id)
+
+    def test_closed_jobs_are_not_ranked(self):
+        Job.objects.filter(id=self.jobs[0].id).update(status=Job.STATUS_CLOSED)
+        ids = [e["id"] for e in rank_catalog_for_resume(RESUME, top_k=10)]
+        self.assertNotIn(self.jobs[0].id, ids)
+        self.assertEqual(len(ids), 3)
+
+    def test_my_matches_scores_only_the_candidates(self):
+        user = User.objects.create_user("alice", password="pw")
+        resume = Resume.objects.create(user=user, title="cv", content=RESUME)
+        self.client.force_login(user)
+
+        with override_settings(HASHING_CANDIDATES=2):
+            data = self.client.get("/api/resumes/my_matches/").json()
+        scored = set(MatchReport.objects.filter(resume=resume).values_list("job_id", flat=True))
+        self.assertEqual(scored, {self.jobs[0].id, self.jobs[1].id})
+        self.assertEqual({m["job_id"] for m in data["matches"]}, scored)
+
+        # exact mode: every open job
+        with override_settings(MATCH_VECTORIZER="exact"):
+            self.client.get("/api/resumes/my_matches/")
+        self.assertEqual(MatchReport.objects.filter(resume=resume).count(), 4)
+
@@ -0,0 +1,117 @@
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from cored.models import Job, JobImport, MatchReport, Resume, User
+from cored.services import claim_import
+
+
+def run_worker():
+    call_command("run_imports", "work", stdout=StringIO())
+
+
+class JobImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.mkdtemp()
+        cls._settings = override_settings(MEDIA_ROOT=cls.tmp, ADMISSION_LOCK_DIR=cls.tmp + "/admission")
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        Resume.objects.create(user=self.user, title="cv", content="python django developer")
+        self.client.force_login(self.user)
+
+    def status(self, imp_id):
+        return self.client.get(f"/api/jobs/bulk/{imp_id}/").json()
+
+    def test_json_list_is_imported_by_the_worker(self):
+        rows = [
+            {"title": "Python dev", "description": "apis", "skills": "python"},
+            {"title": "", "description": "no title", "skills": "go"},
+            {"title": "Django dev", "description": "web", "skills": "django"},
+        ]
+        response = self.client.post("/api/jobs/bulk/", rows, content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        imp_id = response.json()["id"]
+        self.assertEqual(self.status(imp_id)["status"], "pending")
+        self.assertEqual(Job.objects.count(), 0)
+
+        run_worker()
+
+        status = self.status(imp_id)
+        self.assertEqual(status["status"], "done")
+        self.assertEqual((status["rows_done"], status["created"], status["error_count"]), (3, 2, 1))
+        self.assertEqual(status["errors"][0]["row"], 2)
+        self.assertEqual(status["scored"], 2)
+        self.assertEqual(MatchReport.objects.count(), 2)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile("jobs.csv", b"title,description,skills\nPython dev,apis,python\n")
+        imp_id = self.client.post("/api/jobs/bulk/", {"file": upload}).json()["id"]
+        run_worker()
+        self.assertEqual(self.status(imp_id)["created"], 1)
+        self.assertTrue(Job.objects.filter(title="Python dev").exists())
+
+    def test_unknown_format_is_rejected_upfront(self):
+        upload = SimpleUploadedFile("jobs.xlsx", b"...")
+        response = self.client.post("/api/jobs/bulk/", {"file": upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JobImport.objects.exists())
+
+    def test_invalid_utf8_fails_the_import_not_the_request(self):
+        upload = SimpleUploadedFile("jobs.jsonl", b'{"title": "A", "description": "d", "skills": "x"}\n\xff\xfe\n')
+        response = self.client.post("/api/jobs/bulk/", {"file": upload})
+        self.assertEqual(response.status_code, 202)
+        run_worker()
+        status = self.status(response.json()["id"])
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("utf-8", status["error"])
+
+    def test_other_users_cannot_see_an_import(self):
+        imp_id = self.client.post("/api/jobs/bulk/", [], content_type="application/json").json()["id"]
+        self.client.force_login(User.objects.create_user("bob", password="pw"))
+        self.assertEqual(self.client.get(f"/api/jobs/bulk/{imp_id}/").status_code, 404)
+
+    def test_import_of_a_dead_worker_resumes_where_it_stopped(self):
+        lines = [json.dumps({"title": f"job {i}", "description": "d", "skills": "python"}) for i in range(5)]
+        # the first 3 rows were committed before the worker died
+        Job.objects.bulk_create([Job(title=f"job {i}", description="d", skills="python") for i in range(3)])
+        imp = JobImport(
+            user=self.user, format="jsonl", status=JobImport.STATUS_RUNNING, worker="dead:1",
+            attempts=1, rows_done=3, created=3,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        imp.file.save("jobs.jsonl", ContentFile("\n".join(lines).encode()), save=True)
+
+        run_worker()
+
+        imp.refresh_from_db()
+        self.assertEqual((imp.status, imp.attempts, imp.rows_done, imp.created), ("done", 2, 5, 5))
+        self.assertEqual(sorted(Job.objects.values_list("title", flat=True)), [f"job {i}" for i in range(5)])
+
+    def test_running_import_is_not_claimed_twice(self):
+        imp = JobImport.objects.create(user=self.user, format="jsonl")
+        self.assertEqual(claim_import(JobImport, "w1").id, imp.id)
+        self.assertIsNone(claim_import(JobImport, "w2"))
+
+        # too many dead workers: given up on
+        JobImport.objects.filter(id=imp.id).update(heartbeat_at=timezone.now() - timedelta(hours=1), attempts=3)
+        self.assertIsNone(claim_import(JobImport, "w2"))
+        imp.refresh_from_db()
+        self.assertEqual(imp.status, "failed")
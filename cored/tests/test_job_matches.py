@@ -0,0 +1,28 @@
+from django.test import TestCase
+
+from cored.models import Job, JobSkillGap, MatchReport, Resume, User
+from cored.services import build_match_reports_for_job
+
+
+class BuildJobReportsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.scored = Resume.objects.create(user=self.user, title="cv", content="python django developer")
+        # no file and no text: nothing to extract, nothing to score
+        self.empty = Resume.objects.create(user=self.user, title="empty", content="")
+        self.job = Job.objects.create(title="Python developer", description="apis", skills="python, django, kubernetes")
+
+    def test_empty_resumes_are_not_scored(self):
+        counts = build_match_reports_for_job(self.job.id)
+        self.assertEqual(counts["created"], 1)
+        self.assertEqual(list(MatchReport.objects.values_list("resume_id", flat=True)), [self.scored.id])
+
+        # only the scored resume is missing kubernetes
+        gaps = dict(JobSkillGap.objects.filter(job=self.job).values_list("skill", "missing"))
+        self.assertEqual(gaps, {"kubernetes": 1})
+
+    def test_job_matches_view_skips_empty_resumes(self):
+        self.client.force_login(self.user)
+        results = self.client.get(f"/api/jobs/{self.job.id}/matches/").json()["results"]
+        self.assertEqual([r["resume_id"] for r in results], [self.scored.id])
+        self.assertFalse(MatchReport.objects.filter(resume=self.empty).exists())
@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from cored.loadtest import SEED_PREFIX, Replayer, VirtualUser, summarize, synthesize_traffic
+from cored.models import Job, Resume
+
+
+class FakeResponse:
+    status = 200
+
+    def read(self):
+        return b"ok"
+
+    def getheader(self, name, default=None):
+        return default
+
+
+class FlakyConnection:
+    """Fails the first request like a keep-alive the server has closed."""
+
+    def __init__(self, log):
+        self.log = log
+
+    def request(self, method, path, body=None, headers=None):
+        self.log.append(method)
+        if len(self.log) == 1:
+            raise ConnectionResetError("connection reset by peer")
+
+    def getresponse(self):
+        return FakeResponse()
+
+    def close(self):
+        pass
+
+
+class ReplayerTests(SimpleTestCase):
+    def setUp(self):
+        self.replayer = Replayer("http://testserver", [VirtualUser("u", "key", [1])], [1])
+        self.sent = []
+        patcher = mock.patch.object(Replayer, "_connection", lambda _: FlakyConnection(self.sent))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_is_retried_on_a_dropped_connection(self):
+        route, status, _, size = self.replayer._send({"method": "GET", "route": "jobs-list", "path": "/api/jobs/"})
+        self.assertEqual((route, status, size), ("jobs-list", 200, 2))
+        self.assertEqual(self.sent, ["GET", "GET"])
+
+    def test_post_is_sent_once(self):
+        record = {"method": "POST", "route": "jobs-list", "path": "/api/jobs/"}
+        self.assertEqual(self.replayer._send(record)[1], 0)
+        self.assertEqual(self.sent, ["POST"])
+
+    def test_summary_counts_shed_and_errors(self):
+        results = [("r", 200, 10.0, 1), ("r", 429, 1.0, 0), ("r", 0, 5.0, 0), ("r", 500, 2.0, 0)]
+        summary = summarize(results, wall_seconds=2.0)["r"]
+        self.assertEqual((summary["ok"], summary["shed"], summary["errors"]), (1, 1, 2))
+        self.assertEqual(summary["rps"], 2.0)
+        self.assertEqual(summary["max_ms"], 10.0)
+
+    def test_synthetic_traffic_is_ordered_and_repeatable(self):
+        records = synthesize_traffic(sessions=5, jobs=3, seed=1)
+        self.assertEqual(records, synthesize_traffic(sessions=5, jobs=3, seed=1))
+        self.assertEqual([r["ts"] for r in records], sorted(r["ts"] for r in records))
+
+
+class SeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.mkdtemp()
+        cls._settings = override_settings(MEDIA_ROOT=cls.tmp, ADMISSION_LOCK_DIR=cls.tmp + "/admission")
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_seeded_resumes_have_their_text(self):
+        call_command("loadtest", "seed", "--users", "2", "--jobs", "3", "--pages", "1", stdout=StringIO())
+
+        resumes = Resume.objects.filter(user__username__startswith=SEED_PREFIX)
+        self.assertEqual(resumes.count(), 2)
+        for resume in resumes:
+            self.assertTrue(resume.file)
+            self.assertGreater(len(resume.content.split()), 20)
+        self.assertEqual(Job.objects.count(), 3)
@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from cored.authentication import create_api_token, token_cache
+from cored.models import Resume, User
+
+
+class MediaFileTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls._media = override_settings(MEDIA_ROOT=cls.media_root, MEDIA_X_ACCEL_PREFIX="", MEDIA_X_SENDFILE=False)
+        cls._media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        token_cache.clear()
+        self.owner = User.objects.create_user("owner", password="pw")
+        self.other = User.objects.create_user("other", password="pw")
+        self.resume = Resume(user=self.owner, title="cv")
+        self.resume.file.save("cv.pdf", ContentFile(b"0123456789"), save=True)
+        self.url = self.resume.file.url
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_owner_can_read(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), b"0123456789")
+
+    def test_other_user_gets_404(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_recruiter_can_read(self):
+        recruiter = User.objects.create_user("rec", password="pw", is_recruiter=True)
+        self.client.force_login(recruiter)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_anonymous_is_sent_to_login(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_bearer_token(self):
+        _, key = create_api_token(self.owner)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION=f"Bearer {key}").status_code, 200)
+
+    def test_traversal_outside_media_root(self):
+        staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/media/../manage.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/resumes/../../manage.py").status_code, 404)
+
+    def test_ranges(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(self.body(response), b"2345")
+
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE="bytes=-3")), b"789")
+        # valid, but past the end of the file
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=20-").status_code, 416)
+        # invalid range-spec: ignored
+        response = self.client.get(self.url, HTTP_RANGE="bytes=5-2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), b"0123456789")
+
+    def test_front_server_handoff(self):
+        self.client.force_login(self.owner)
+        with override_settings(MEDIA_X_ACCEL_PREFIX="/protected/"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected/" + self.resume.file.name)
+        self.assertEqual(response.content, b"")
@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from cored import metrics
+from cored.models import Job, MatchReport, Resume, User
+from cored.skillgaps import delete_reports
+
+
+def snapshot(histogram):
+    with histogram._lock:
+        return {k: (sum(v), histogram._sums[k]) for k, v in histogram._counts.items()}
+
+
+def delta(histogram, before, label):
+    count, total = snapshot(histogram).get(label, (0, 0))
+    old_count, old_total = before.get(label, (0, 0))
+    return count - old_count, total - old_total
+
+
+class StreamedRequestMetricsTests(TestCase):
+    VIEW = "resumes-my-matches"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lock_dir = tempfile.mkdtemp()
+        cls._settings = override_settings(ADMISSION_LOCK_DIR=cls.lock_dir)
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.lock_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        Resume.objects.create(user=self.user, title="cv", content="python django developer")
+        for title in ("Python developer", "Django developer", "Designer"):
+            Job.objects.create(title=title, description="apis", skills="python, django")
+        self.client.force_login(self.user)
+
+    def test_streamed_body_is_counted_when_the_response_closes(self):
+        before = {h: snapshot(h) for h in (metrics.REQUEST_SECONDS, metrics.PAIRS_SCORED, metrics.DB_QUERIES)}
+        response = self.client.get("/api/resumes/my_matches/?stream=1")
+
+        # nothing recorded before the body is sent
+        self.assertEqual(delta(metrics.REQUEST_SECONDS, before[metrics.REQUEST_SECONDS], self.VIEW)[0], 0)
+
+        b"".join(response.streaming_content)
+
+        self.assertEqual(delta(metrics.REQUEST_SECONDS, before[metrics.REQUEST_SECONDS], self.VIEW)[0], 1)
+        self.assertEqual(delta(metrics.PAIRS_SCORED, before[metrics.PAIRS_SCORED], self.VIEW), (1, 3))
+        # report reads / upserts of the body, not just the view's own queries
+        queries = delta(metrics.DB_QUERIES, before[metrics.DB_QUERIES], self.VIEW)[1]
+        self.assertGreater(queries, 5)
+
+    def test_streamed_and_plain_responses_count_the_same_pairs(self):
+        before = snapshot(metrics.PAIRS_SCORED)
+        self.client.get("/api/resumes/my_matches/")
+        plain = delta(metrics.PAIRS_SCORED, before, self.VIEW)[1]
+
+        delete_reports(MatchReport.objects.all())
+        before = snapshot(metrics.PAIRS_SCORED)
+        b"".join(self.client.get("/api/resumes/my_matches/?stream=1").streaming_content)
+        streamed = delta(metrics.PAIRS_SCORED, before, self.VIEW)[1]
+
+        self.assertEqual((plain, streamed), (3, 3))
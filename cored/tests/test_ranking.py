@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase, override_settings
+
+from cored.services import MAX_SKILLS_LISTED, RankedJobs, rank_jobs_for_resume
+
+RESUME = "python django sql developer, docker"
+
+JOBS = [
+    {"id": 10, "title": "Designer", "description": "figma ui", "skills": "figma, css"},
+    {"id": 11, "title": "Python developer", "description": "django apis", "skills": "python, django, kubernetes"},
+    {"id": 12, "title": "Data engineer", "description": "sql pipelines", "skills": "sql, spark"},
+]
+
+
+@override_settings(MATCH_VECTORIZER="exact")
+class RankedJobsTests(SimpleTestCase):
+    def test_compact_rows_best_first(self):
+        ranked = rank_jobs_for_resume(RESUME, JOBS)
+        self.assertIsInstance(ranked, RankedJobs)
+        self.assertEqual(len(ranked), 3)
+        # 40 bytes per job, whatever the description length
+        self.assertEqual(ranked.rows.itemsize, 40)
+
+        scores = list(ranked.rows["score"])
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(int(ranked.rows[0]["job_id"]), 11)
+
+    def test_entries_keep_the_dict_shape(self):
+        ranked = rank_jobs_for_resume(RESUME, JOBS)
+        best = ranked[0]
+        self.assertEqual((best["id"], best["title"]), (11, "Python developer"))
+        self.assertEqual(best["matched_skills"], ["django", "python"])
+        self.assertEqual(best["missing_skills"], ["kubernetes"])
+        self.assertEqual(set(best["breakdown"]), {"skills_score", "title_score", "desc_score"})
+        self.assertEqual(ranked.skills(0), (best["matched_skills"], best["missing_skills"]))
+
+        # score = default weights over the components
+        b = best["breakdown"]
+        blended = 0.55 * b["skills_score"] + 0.25 * b["title_score"] + 0.20 * b["desc_score"]
+        self.assertAlmostEqual(best["score"], blended, delta=0.02)
+
+        self.assertEqual([e["id"] for e in ranked[:2]], [int(x) for x in ranked.rows["job_id"][:2]])
+        self.assertEqual([e["id"] for e in ranked], [int(x) for x in ranked.rows["job_id"]])
+
+    def test_top_k(self):
+        ranked = rank_jobs_for_resume(RESUME, JOBS, top_k=1)
+        self.assertEqual(len(ranked), 1)
+        self.assertEqual(ranked[0]["id"], 11)
+
+    def test_skill_lists_are_capped(self):
+        many = ", ".join(f"skill{a}{b}" for a in "abcdefgh" for b in "abcde")
+        ranked = rank_jobs_for_resume(RESUME, [{"id": 1, "title": "x", "description": "", "skills": many}])
+        self.assertEqual(len(ranked[0]["missing_skills"]), MAX_SKILLS_LISTED)
+
+    def test_ties_keep_catalog_order(self):
+        same = [{"id": i, "title": "Chef", "description": "kitchen", "skills": "cooking"} for i in (5, 3, 9)]
+        ranked = rank_jobs_for_resume(RESUME, same)
+        self.assertEqual([e["id"] for e in ranked], [5, 3, 9])
+
+    def test_empty_catalog(self):
+        ranked = rank_jobs_for_resume(RESUME, [])
+        self.assertFalse(ranked)
+        self.assertEqual(ranked[:5], [])
@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from cored.models import Job, MatchReport, Resume, User
+from cored.services import score_resumes_against_jobs
+
+SKILLS = ["python", "django", "react", "docker", "sql", "go"]
+
+
+class RebuildMatchesTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.tmp, "checkpoint.json")
+        user = User.objects.create_user("alice", password="pw")
+        for i in range(6):
+            Resume.objects.create(
+                user=user, title=f"cv {i}", content=f"{SKILLS[i]} {SKILLS[(i + 1) % 6]} developer"
+            )
+        # 20 jobs: two job blocks at the smallest tile size (16)
+        for i in range(20):
+            Job.objects.create(
+                title=f"{SKILLS[i % 6]} developer", description="apis", skills=f"{SKILLS[i % 6]}, {SKILLS[(i + 2) % 6]}"
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def rebuild(self, *args, top_k=2):
+        call_command(
+            "rebuild_matches", "--top-k", str(top_k), "--memory-mb", "0", "--workers", "1",
+            "--checkpoint", self.checkpoint, *args, stdout=StringIO(),
+        )
+
+    def stored(self):
+        return {(r.resume_id, r.job_id): round(r.score, 6) for r in MatchReport.objects.all()}
+
+    def full_scores(self):
+        reports = score_resumes_against_jobs(list(Resume.objects.all()), list(Job.objects.all()))
+        return {(r.resume_id, r.job_id): r.score for r in reports}
+
+    def expected_top_k(self, top_k):
+        by_job = {}
+        for (resume_id, job_id), score in self.full_scores().items():
+            by_job.setdefault(job_id, []).append((score, resume_id))
+        kept = set()
+        for job_id, scores in by_job.items():
+            scores.sort(reverse=True)
+            kept.update((resume_id, job_id) for _, resume_id in scores[:top_k])
+        return kept
+
+    def test_keeps_the_top_k_resumes_of_every_job(self):
+        self.rebuild(top_k=2)
+        stored = self.stored()
+        self.assertEqual(len(stored), 2 * Job.objects.count())
+        self.assertEqual(set(stored), self.expected_top_k(2))
+        # blocked products score like the one-pass path
+        full = self.full_scores()
+        for pair, score in stored.items():
+            self.assertAlmostEqual(score, full[pair], places=4)
+        # finished: the checkpoint is gone
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_parallel_workers_write_the_same_reports(self):
+        self.rebuild()
+        single = self.stored()
+        MatchReport.objects.all().delete()
+        call_command(
+            "rebuild_matches", "--top-k", "2", "--memory-mb", "0", "--workers", "2",
+            "--checkpoint", self.checkpoint, stdout=StringIO(),
+        )
+        self.assertEqual(self.stored(), single)
+
+    def test_resumes_from_checkpoint(self):
+        done = list(Job.objects.order_by("id").values_list("id", flat=True)[:16])
+        with open(self.checkpoint, "w") as f:
+            json.dump({"top_k": 2, "done_job_ids": done}, f)
+
+        self.rebuild()
+
+        self.assertEqual(
+            set(MatchReport.objects.values_list("job_id", flat=True)),
+            set(Job.objects.exclude(id__in=done).values_list("id", flat=True)),
+        )
+
+    def test_checkpoint_of_another_top_k_is_refused(self):
+        with open(self.checkpoint, "w") as f:
+            json.dump({"top_k": 5, "done_job_ids": []}, f)
+        with self.assertRaises(CommandError):
+            self.rebuild(top_k=2)
+        # --fresh ignores it
+        self.rebuild("--fresh", top_k=2)
+        self.assertTrue(MatchReport.objects.exists())
+
+    def test_prune_drops_reports_outside_the_top_k(self):
+        self.rebuild(top_k=4)
+        self.rebuild("--prune", top_k=2)
+        self.assertEqual(set(self.stored()), self.expected_top_k(2))
+
+    def test_closed_jobs_are_not_scored(self):
+        closed = Job.objects.first()
+        Job.objects.filter(id=closed.id).update(status=Job.STATUS_CLOSED)
+        self.rebuild()
+        self.assertFalse(MatchReport.objects.filter(job=closed).exists())
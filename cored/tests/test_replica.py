@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from cored import routers
+from cored.middleware import ReplicaPinMiddleware
+from cored.models import Job, User
+from cored.routers import ReplicaRouter, is_pinned, read_db, replica_reads
+
+REPLICA = "replica"
+
+
+@override_settings(READ_REPLICA_ALIAS=REPLICA, REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTests(TestCase):
+    # the router's decisions only: queries aren't sent to the alias, so no
+    # second database is needed
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for target in ("cored.routers.replica_configured", "cored.middleware.replica_configured"):
+            patcher = mock.patch(target, return_value=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+        self.user = User.objects.create_user("alice", password="pw")
+
+    def outside_transaction(self):
+        # TestCase wraps every test in atomic(), where reads stay on the primary
+        return mock.patch.object(routers.connections[DEFAULT_DB_ALIAS], "in_atomic_block", False)
+
+    def test_reads_use_the_primary_unless_opted_in(self):
+        with self.outside_transaction():
+            self.assertEqual(self.router.db_for_read(Job), DEFAULT_DB_ALIAS)
+            with replica_reads(self.user):
+                self.assertEqual(self.router.db_for_read(Job), REPLICA)
+                # writes never go to the replica
+                self.assertEqual(self.router.db_for_write(Job), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(Job), DEFAULT_DB_ALIAS)
+            self.assertEqual(read_db(self.user), REPLICA)
+
+    def test_reads_inside_a_transaction_stay_on_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(read_db(self.user), DEFAULT_DB_ALIAS)
+            with replica_reads(self.user):
+                self.assertEqual(self.router.db_for_read(Job), DEFAULT_DB_ALIAS)
+
+    def test_pinned_user_reads_the_primary(self):
+        other = User.objects.create_user("bob", password="pw")
+        routers.pin_to_primary(self.user)
+        self.assertTrue(is_pinned(self.user))
+        with self.outside_transaction():
+            self.assertEqual(read_db(self.user), DEFAULT_DB_ALIAS)
+            with replica_reads(self.user):
+                self.assertEqual(self.router.db_for_read(Job), DEFAULT_DB_ALIAS)
+            # other users aren't affected
+            self.assertEqual(read_db(other), REPLICA)
+
+    def test_no_migrations_on_the_replica(self):
+        self.assertFalse(self.router.allow_migrate(REPLICA, "cored"))
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, "cored"))
+
+    def request(self, method="get"):
+        request = getattr(RequestFactory(), method)("/api/jobs/")
+        request.user = self.user
+        return request
+
+    def test_middleware_pins_after_a_write(self):
+        def writes(request):
+            Job.objects.create(title="Python developer")
+            return HttpResponse()
+
+        ReplicaPinMiddleware(writes)(self.request())
+        self.assertTrue(is_pinned(self.user))
+
+    def test_middleware_pins_unsafe_methods_and_streams(self):
+        ReplicaPinMiddleware(lambda r: HttpResponse())(self.request("post"))
+        self.assertTrue(is_pinned(self.user))
+
+        cache.clear()
+        ReplicaPinMiddleware(lambda r: StreamingHttpResponse(iter([b"x"])))(self.request())
+        self.assertTrue(is_pinned(self.user))
+
+    def test_middleware_leaves_plain_reads_unpinned(self):
+        def reads(request):
+            list(Job.objects.all())
+            return HttpResponse()
+
+        ReplicaPinMiddleware(reads)(self.request())
+        self.assertFalse(is_pinned(self.user))
+
+
+class NoReplicaTests(TestCase):
+    def test_everything_uses_the_primary(self):
+        user = User.objects.create_user("alice", password="pw")
+        self.assertEqual(read_db(user), DEFAULT_DB_ALIAS)
+        with replica_reads(user):
+            self.assertEqual(ReplicaRouter().db_for_read(Job), DEFAULT_DB_ALIAS)
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaPinMiddleware(lambda r: HttpResponse())
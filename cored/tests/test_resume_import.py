@@ -0,0 +1,115 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from cored.models import Resume, ResumeImport, User
+
+
+def docx(text):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>",
+        )
+    return buf.getvalue()
+
+
+def archive(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+MEMBERS = [
+    ("alice.docx", docx("Python Django developer")),
+    ("broken.docx", b"not a docx at all"),
+    ("bob.docx", docx("React designer")),
+]
+
+
+@override_settings(RESUME_IMPORT_WORKERS=1)
+class ResumeImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.mkdtemp()
+        cls._settings = override_settings(MEDIA_ROOT=cls.tmp, ADMISSION_LOCK_DIR=cls.tmp + "/admission")
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+
+    def run_worker(self):
+        call_command("run_imports", "work", stdout=io.StringIO())
+
+    def stored_files(self):
+        return sorted(os.listdir(os.path.join(self.tmp, "resumes")))
+
+    def test_upload_is_imported_by_the_worker(self):
+        upload = SimpleUploadedFile("cvs.zip", archive(MEMBERS))
+        response = self.client.post("/api/resumes/bulk/", {"archive": upload})
+        self.assertEqual(response.status_code, 202)
+        imp_id = response.json()["id"]
+        self.assertEqual(self.client.get(f"/api/resumes/bulk/{imp_id}/").json()["status"], "pending")
+
+        self.run_worker()
+
+        status = self.client.get(f"/api/resumes/bulk/{imp_id}/").json()
+        self.assertEqual(status["status"], "done")
+        self.assertEqual((status["total"], status["processed"], status["created"], status["failed"]), (3, 3, 2, 1))
+        # no text, no Resume (and no file left behind)
+        self.assertEqual(
+            dict(Resume.objects.values_list("title", "content")),
+            {"alice": "python django developer", "bob": "react designer"},
+        )
+        self.assertEqual(len(self.stored_files()), 2)
+
+    def test_import_of_a_dead_worker_resumes_where_it_stopped(self):
+        imp = ResumeImport(
+            user=self.user, status=ResumeImport.STATUS_RUNNING, worker="dead:1", attempts=1,
+            total=3, processed=1, created=1,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        imp.archive.save("cvs.zip", ContentFile(archive(MEMBERS)), save=True)
+        # bob's copy from the dead attempt, never committed
+        os.makedirs(os.path.join(self.tmp, "resumes"), exist_ok=True)
+        with open(os.path.join(self.tmp, "resumes", f"import{imp.id}_2_bob.docx"), "wb") as f:
+            f.write(b"partial")
+
+        self.run_worker()
+
+        imp.refresh_from_db()
+        self.assertEqual((imp.status, imp.attempts), ("done", 2))
+        self.assertEqual((imp.processed, imp.created, imp.failed), (3, 2, 1))
+        # member 0 was imported before, the leftover was overwritten
+        self.assertEqual(list(Resume.objects.values_list("title", flat=True)), ["bob"])
+        self.assertEqual(self.stored_files(), [f"import{imp.id}_2_bob.docx"])
+        self.assertFalse(imp.archive.storage.exists(imp.archive.name))
+
+    def test_unreadable_archive_fails_the_import(self):
+        upload = SimpleUploadedFile("cvs.zip", b"not an archive")
+        imp_id = self.client.post("/api/resumes/bulk/", {"archive": upload}).json()["id"]
+        self.run_worker()
+        status = self.client.get(f"/api/resumes/bulk/{imp_id}/").json()
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("Unsupported archive", status["error"])
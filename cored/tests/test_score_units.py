@@ -0,0 +1,74 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from cored.models import Job, MatchReport, Resume, ScoreWorkUnit, User
+from cored.services import claim_work_unit, fail_work_unit, finish_work_unit, heartbeat_work_unit, plan_score_run
+
+
+class ClaimWorkUnitTests(TestCase):
+    def setUp(self):
+        for i in range(4):
+            Job.objects.create(title=f"job {i}")
+        self.run = plan_score_run("test", jobs_per_unit=2)
+
+    def expire(self, unit):
+        ScoreWorkUnit.objects.filter(id=unit.id).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_units_are_leased_once(self):
+        a = claim_work_unit(self.run, "w1")
+        b = claim_work_unit(self.run, "w2")
+        self.assertNotEqual(a.id, b.id)
+        self.assertIsNone(claim_work_unit(self.run, "w3"))
+        self.assertTrue(finish_work_unit(a, 0))
+
+    def test_expired_lease_is_reclaimed(self):
+        unit = claim_work_unit(self.run, "w1")
+        claim_work_unit(self.run, "w1")
+        self.expire(unit)
+
+        taken = claim_work_unit(self.run, "w2")
+        self.assertEqual(taken.id, unit.id)
+        self.assertEqual(taken.worker, "w2")
+        self.assertEqual(taken.attempts, 2)
+        # the first worker lost its lease
+        self.assertFalse(heartbeat_work_unit(unit))
+        self.assertFalse(finish_work_unit(unit, 0))
+        self.assertTrue(finish_work_unit(taken, 0))
+
+    def test_unit_fails_after_max_attempts(self):
+        unit = claim_work_unit(self.run, "w1", max_attempts=1)
+        self.expire(unit)
+        other = claim_work_unit(self.run, "w2", max_attempts=1)
+        self.assertNotEqual(other.id, unit.id)
+        unit.refresh_from_db()
+        self.assertEqual(unit.status, ScoreWorkUnit.STATUS_FAILED)
+
+    def test_failed_attempt_goes_back_to_pending(self):
+        unit = claim_work_unit(self.run, "w1")
+        fail_work_unit(unit, "boom", max_attempts=3)
+        unit.refresh_from_db()
+        self.assertEqual((unit.status, unit.error), (ScoreWorkUnit.STATUS_PENDING, "boom"))
+        self.assertEqual(claim_work_unit(self.run, "w2").id, unit.id)
+
+
+class ScoreUnitsCommandTests(TestCase):
+    def test_plan_and_work_score_every_pair(self):
+        user = User.objects.create_user("alice", password="pw")
+        for text in ("python django", "react css"):
+            Resume.objects.create(user=user, title=text, content=text)
+        for title in ("Python developer", "Frontend", "Data engineer"):
+            Job.objects.create(title=title, description="work", skills="python, react, sql")
+
+        out = StringIO()
+        call_command("score_units", "plan", "nightly", "--jobs-per-unit", "2", stdout=out)
+        call_command("score_units", "work", "nightly", "--no-wait", "--memory-mb", "0", stdout=out)
+
+        self.assertEqual(MatchReport.objects.count(), 6)
+        units = ScoreWorkUnit.objects.filter(run__name="nightly")
+        self.assertEqual(units.count(), 2)
+        self.assertFalse(units.exclude(status=ScoreWorkUnit.STATUS_DONE).exists())
+        self.assertIn("2 done", out.getvalue())
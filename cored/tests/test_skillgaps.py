@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from cored import skillgaps
+from cored.counters import add_counts
+from cored.models import Job, JobSkillGap, MatchReport, Resume, ResumeSkillGap, User
+from cored.services import bulk_upsert_match_reports, score_resumes_against_jobs
+
+
+class SkillGapCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lock_dir = tempfile.mkdtemp()
+        cls._settings = override_settings(ADMISSION_LOCK_DIR=cls.lock_dir)
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.lock_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user("rec", password="pw", is_recruiter=True)
+        self.resumes = [
+            Resume.objects.create(user=self.recruiter, title=f"cv {i}", content=text)
+            for i, text in enumerate(["python django", "python react docker", "java spring sql"])
+        ]
+        self.jobs = [
+            Job.objects.create(title="Backend", description="apis", skills="python, django, sql, docker"),
+            Job.objects.create(title="Frontend", description="ui", skills="react, javascript, css"),
+        ]
+        bulk_upsert_match_reports(score_resumes_against_jobs(self.resumes, self.jobs))
+
+    def snapshot(self):
+        return (
+            sorted(JobSkillGap.objects.values_list("job_id", "skill", "missing")),
+            sorted(ResumeSkillGap.objects.values_list("resume_id", "skill", "jobs_missing", "jobs_unlocked")),
+        )
+
+    def assertCountsMatchRebuild(self):
+        counted = self.snapshot()
+        skillgaps.rebuild()
+        self.assertEqual(counted, self.snapshot())
+
+    def test_create(self):
+        self.assertTrue(JobSkillGap.objects.exists())
+        self.assertCountsMatchRebuild()
+
+    def test_rescore(self):
+        Resume.objects.filter(id=self.resumes[0].id).update(content="python django sql docker")
+        self.resumes[0].refresh_from_db()
+        bulk_upsert_match_reports(score_resumes_against_jobs(self.resumes[:1], self.jobs))
+        self.assertCountsMatchRebuild()
+
+    def test_delete_reports(self):
+        skillgaps.delete_reports(MatchReport.objects.filter(resume=self.resumes[1]))
+        self.assertFalse(ResumeSkillGap.objects.filter(resume=self.resumes[1]).exists())
+        self.assertCountsMatchRebuild()
+
+    def test_delete_job_and_resume(self):
+        self.jobs[0].delete()
+        self.resumes[2].delete()
+        self.assertCountsMatchRebuild()
+
+    def test_job_edit_drops_its_reports(self):
+        self.client.force_login(self.recruiter)
+        response = self.client.patch(
+            f"/api/jobs/{self.jobs[0].id}/", {"skills": "go, kubernetes"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(MatchReport.objects.filter(job=self.jobs[0]).exists())
+        self.assertFalse(JobSkillGap.objects.filter(job=self.jobs[0]).exists())
+        self.assertCountsMatchRebuild()
+
+    def test_unextracted_resume_is_not_scored(self):
+        empty = Resume.objects.create(user=self.recruiter, title="no text")
+        bulk_upsert_match_reports(score_resumes_against_jobs([empty], self.jobs))
+        self.assertFalse(MatchReport.objects.filter(resume=empty).exists())
+
+    def test_skill_opportunities_reads_the_counters(self):
+        self.client.force_login(self.recruiter)
+        resume = self.resumes[0]
+        data = self.client.get(f"/api/resumes/skill-opportunities/?resume_id={resume.id}").json()
+        self.assertEqual(data["jobs_scored"], 2)
+        expected = {
+            g.skill: (g.jobs_unlocked, g.jobs_missing)
+            for g in ResumeSkillGap.objects.filter(resume=resume)
+        }
+        self.assertEqual({s["skill"]: (s["jobs_unlocked"], s["jobs_missing"]) for s in data["skills"]}, expected)
+        self.assertIn("sql", expected)
+
+    def test_increments_add_up(self):
+        job = self.jobs[1]
+        JobSkillGap.objects.filter(job=job).delete()
+        add_counts(JobSkillGap, ("job", "skill"), ("missing",), [(job.id, "go", 2), (job.id, "rust", 1)])
+        add_counts(JobSkillGap, ("job", "skill"), ("missing",), [(job.id, "go", 3)])
+        self.assertEqual(dict(JobSkillGap.objects.filter(job=job).values_list("skill", "missing")), {"go": 5, "rust": 1})
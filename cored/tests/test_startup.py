@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from cored.startup import HEAVY_MODULES, preload_heavy_modules
+
+# top-level packages that only scoring / PDF paths may pull in
+HEAVY_PACKAGES = sorted({name.split(".")[0] for name in HEAVY_MODULES} | {"pandas"})
+
+# fresh interpreter: this test process has long imported everything
+CHILD = r'''
+import json, os, sys
+os.environ["DJANGO_SETTINGS_MODULE"] = "hiredsense.settings"
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import setup_test_environment
+from django.test import Client
+
+heavy = json.loads(sys.argv[1])
+loaded = lambda: sorted(m for m in heavy if m in sys.modules)
+
+get_wsgi_application()
+setup_test_environment()
+status = Client().get("/api/auth/").status_code
+after_page = loaded()
+
+from cored.services import rank_jobs_for_resume
+rank_jobs_for_resume("python developer", [{"id": 1, "title": "Python developer", "description": "", "skills": "python"}])
+print(json.dumps({"status": status, "after_page": after_page, "after_scoring": loaded()}))
+'''
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_pages_load_without_the_scoring_stack(self):
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, json.dumps(HEAVY_PACKAGES)],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        out = json.loads(result.stdout.strip().splitlines()[-1])
+
+        self.assertEqual(out["status"], 200)
+        self.assertEqual(out["after_page"], [])
+        # ... and the first scoring call brings it in
+        self.assertIn("sklearn", out["after_scoring"])
+        self.assertNotIn("pandas", out["after_scoring"])
+
+    def test_preload_imports_every_heavy_module(self):
+        self.assertEqual(preload_heavy_modules(), [])
+        for name in HEAVY_MODULES:
+            self.assertIn(name, sys.modules)
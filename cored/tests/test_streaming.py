@@ -0,0 +1,65 @@
+import json
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from cored.models import Job, Resume, User
+
+
+def read_events(response):
+    body = b"".join(response.streaming_content)
+    return [json.loads(line) for line in body.splitlines()]
+
+
+class StreamingMatchesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lock_dir = tempfile.mkdtemp()
+        cls._settings = override_settings(ADMISSION_LOCK_DIR=cls.lock_dir)
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.lock_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        texts = ["python django sql developer", "react css designer", "python docker apis"]
+        for i, text in enumerate(texts):
+            Resume.objects.create(user=self.user, title=f"cv {i}", content=text)
+        self.job = Job.objects.create(title="Python developer", description="django apis", skills="python, django, sql")
+        self.client.force_login(self.user)
+
+    def test_job_matches_stream(self):
+        response = self.client.get(f"/api/jobs/{self.job.id}/matches/?stream=1")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        events = read_events(response)
+
+        self.assertEqual((events[0]["type"], events[0]["job_id"]), ("meta", self.job.id))
+        self.assertEqual(events[1]["type"], "top")
+        self.assertEqual(events[-1], {"type": "done", "count": 3})
+
+        rows = [row for e in events if e["type"] == "rows" for row in e["rows"]]
+        scores = [row["score"] for row in rows]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        # same ranking as the plain JSON response
+        plain = self.client.get(f"/api/jobs/{self.job.id}/matches/").json()["results"]
+        self.assertEqual([r["resume_id"] for r in plain], [r["resume_id"] for r in rows])
+
+    def test_stream_filters(self):
+        events = read_events(self.client.get(f"/api/jobs/{self.job.id}/matches/?stream=1&must_have=docker"))
+        rows = [row for e in events if e["type"] == "rows" for row in e["rows"]]
+        self.assertEqual([r["resume_title"] for r in rows], ["cv 2"])
+
+    def test_my_matches_stream(self):
+        Job.objects.create(title="Designer", description="ui", skills="react, css")
+        events = read_events(self.client.get("/api/resumes/my_matches/?stream=1"))
+        self.assertEqual(events[0]["type"], "meta")
+        self.assertEqual(events[-1], {"type": "done", "count": 2})
+        rows = [row for e in events if e["type"] == "rows" for row in e["rows"]]
+        self.assertEqual({r["job_id"] for r in rows}, set(Job.objects.values_list("id", flat=True)))
@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from cored.models import Job, MatchReport, Resume, User
+from cored.services import (
+    blend_components,
+    bulk_upsert_match_reports,
+    match_weights,
+    parse_weight_overrides,
+    score_resumes_against_jobs,
+    top_matches_for_job,
+)
+
+
+@override_settings(MATCH_WEIGHTS={"skills": 0.55, "title": 0.25, "desc": 0.20})
+class MatchWeightTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.lock_dir = tempfile.mkdtemp()
+        cls._settings = override_settings(ADMISSION_LOCK_DIR=cls.lock_dir)
+        cls._settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._settings.disable()
+        shutil.rmtree(cls.lock_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        # one resume matches the skills, the other the title
+        self.skills_cv = Resume.objects.create(user=self.user, title="skills", content="kafka flink spark")
+        self.title_cv = Resume.objects.create(user=self.user, title="title", content="senior data engineer")
+        self.job = Job.objects.create(title="Senior data engineer", description="pipelines", skills="kafka, flink, spark")
+        bulk_upsert_match_reports(score_resumes_against_jobs([self.skills_cv, self.title_cv], [self.job]))
+
+    def ranking(self, weights=None):
+        qs = top_matches_for_job(self.job.id, user=self.user, weights=weights, build=False, generate=False)
+        return [(r.resume.title, r.weighted_score) for r in qs]
+
+    def test_precedence(self):
+        self.assertEqual(match_weights(), {"skills": 0.55, "title": 0.25, "desc": 0.20})
+        self.job.w_title = 0.9
+        self.assertEqual(match_weights(self.job)["title"], 0.9)
+        weights = match_weights(self.job, {"title": 0.1, "desc": None})
+        self.assertEqual(weights, {"skills": 0.55, "title": 0.1, "desc": 0.20})
+
+    def test_bad_overrides_are_ignored(self):
+        params = {"w_skills": "0.7", "w_title": "-1", "w_desc": "nan", "w_other": "3"}
+        self.assertEqual(parse_weight_overrides(params), {"skills": 0.7})
+        self.assertEqual(parse_weight_overrides({"w_desc": "inf", "w_title": "abc"}), {})
+
+    def test_components_are_stored(self):
+        for report in MatchReport.objects.all():
+            self.assertIsNotNone(report.skills_score)
+            self.assertAlmostEqual(report.score, blend_components(report, match_weights()), places=1)
+
+    def test_new_weights_are_a_resort_in_sql(self):
+        self.assertEqual(self.ranking()[0][0], "skills")
+        title_first = self.ranking({"skills": 0, "title": 1, "desc": 0})
+        self.assertEqual(title_first[0][0], "title")
+
+        # the database blend agrees with the Python one
+        weights = match_weights(self.job, {"skills": 0, "title": 1, "desc": 0})
+        for report in MatchReport.objects.all():
+            sql_score = dict(title_first)[report.resume.title]
+            self.assertAlmostEqual(sql_score, blend_components(report, weights), places=1)
+
+    def test_scores_are_capped_at_100(self):
+        for _, score in self.ranking({"skills": 50, "title": 50, "desc": 50}):
+            self.assertLessEqual(score, 100.0)
+
+    def test_rows_without_components_keep_their_score(self):
+        MatchReport.objects.filter(resume=self.title_cv).update(
+            skills_score=None, title_score=None, desc_score=None, score=99.0
+        )
+        self.assertEqual(self.ranking({"skills": 0, "title": 0, "desc": 0})[0], ("title", 99.0))
+
+    def test_job_weights_via_api_keep_the_reports(self):
+        self.client.force_login(self.user)
+        ids = set(MatchReport.objects.values_list("id", flat=True))
+        response = self.client.patch(
+            f"/api/jobs/{self.job.id}/", {"w_skills": 0, "w_title": 1, "w_desc": 0}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(MatchReport.objects.values_list("id", flat=True)), ids)
+
+        data = self.client.get(f"/api/jobs/{self.job.id}/matches/").json()
+        self.assertEqual(data["weights"], {"skills": 0.0, "title": 1.0, "desc": 0.0})
+        self.assertEqual(data["results"][0]["resume_title"], "title")
+
+        # per-request overrides win over the job's
+        data = self.client.get(f"/api/jobs/{self.job.id}/matches/?w_skills=1&w_title=0").json()
+        self.assertEqual(data["results"][0]["resume_title"], "skills")
@@ -1,18 +1,57 @@
-from django.shortcuts import render, redirect
-from django.http import HttpResponse
+import heapq
+import hmac
+import json
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
 
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import IsAuthenticated
-
-from .models import Resume, Job, MatchReport
-from .serializers import ResumeSerializer, JobSerializer
-from .services import rank_jobs_for_resume, top_matches_for_job
-from .llm import generate_ai_report
+from rest_framework.permissions import IsAuthenticated, AllowAny
+
+from .models import Resume, Job, JobImport, MatchReport, MatchReportArchive, ResumeImport, ApiToken
+from .serializers import ResumeSerializer, JobSerializer, JobImportSerializer, ResumeImportSerializer
+from .services import (
+    rank_jobs_for_resume,
+    top_matches_for_job,
+    iter_match_reports_for_job,
+    normalize_must_have,
+    guess_import_format,
+    ensure_resume_content,
+    iter_score_missing_pairs,
+    iter_generated_reports,
+    match_weights,
+    parse_weight_overrides,
+    blend_components,
+)
+from .llm import REPORT_MODEL_VERSION
+from .metrics import render_prometheus
+from .authentication import create_api_token, ApiTokenAuthentication
+from .admission import admit, ServerBusy
+from .skillgaps import delete_reports
+from .routers import replica_reads
+from .archive import close_job, reopen_job
+from rest_framework.exceptions import PermissionDenied, Throttled
 
 
 # ===================== PAGES =====================
@@ -106,6 +145,34 @@ def jobs_ui_page(request):
     return render(request, "jobs_list.html", {"active_tab": "jobs"})
 
 
+# ===================== API TOKENS =====================
+
+@api_view(["POST", "DELETE"])
+@permission_classes([AllowAny])
+def api_token(request):
+    """
+    POST {username, password} -> {"token", "expires_at"} (password hashed once)
+    DELETE with "Authorization: Bearer <token>" -> revokes that token
+    """
+    if request.method == "DELETE":
+        # ApiTokenAuthentication puts the key hash in request.auth
+        if not request.user.is_authenticated or not isinstance(request.auth, str):
+            return Response({"detail": "Bearer token required."}, status=401)
+        ApiToken.objects.filter(key_hash=request.auth, user=request.user).delete()
+        return Response(status=204)
+
+    user = authenticate(
+        request,
+        username=(request.data.get("username") or "").strip(),
+        password=request.data.get("password") or "",
+    )
+    if user is None:
+        return Response({"detail": "Invalid username or password."}, status=400)
+
+    token, key = create_api_token(user, name=(request.data.get("name") or "")[:100])
+    return Response({"token": key, "expires_at": token.expires_at}, status=201)
+
+
 # ===================== DASHBOARD API =====================
 
 @api_view(["GET"])
@@ -113,20 +180,306 @@ def jobs_ui_page(request):
 def dashboard_stats(request):
     user = request.user
 
-    return Response({
-        "resumes": Resume.objects.filter(user=user).count(),
-        "jobs": Job.objects.count(),
-        "matches": MatchReport.objects.filter(resume__user=user).count(),
-        "recent_jobs": list(
-            Job.objects.order_by("-created_at")[:5]
-            .values("id", "title")
-        ),
-        "recent_resumes": list(
-            Resume.objects.filter(user=user)
-            .order_by("-created_at")[:5]
-            .values("id", "title", "file")
-        ),
-    })
+    with replica_reads(user):
+        return Response({
+            "resumes": Resume.objects.filter(user=user).count(),
+            "jobs": Job.objects.count(),
+            "matches": MatchReport.objects.filter(resume__user=user).count(),
+            "recent_jobs": list(
+                Job.objects.order_by("-created_at")[:5]
+                .values("id", "title")
+            ),
+            "recent_resumes": list(
+                Resume.objects.filter(user=user)
+                .order_by("-created_at")[:5]
+                .values("id", "title", "file")
+            ),
+        })
+
+
+# ===================== MEDIA (protected resume files) =====================
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _FileRange:
+    """
+    Bytes [start, start + length) of an open file. Keeps fileno() so
+    gunicorn can still os.sendfile() it (from the current offset, for
+    Content-Length bytes); other servers just read() it.
+    """
+
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self._f = f
+        self._left = length
+
+    def read(self, size=-1):
+        if self._left <= 0:
+            return b""
+        size = self._left if size is None or size < 0 else min(size, self._left)
+        data = self._f.read(size)
+        self._left -= len(data)
+        return data
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def close(self):
+        self._f.close()
+
+
+def _can_read_media(user, name):
+    if user.is_staff or user.is_recruiter:
+        return True
+    return Resume.objects.filter(file=name, user=user).exists()
+
+
+def _media_user(request):
+    # browser session, or an API client's bearer token
+    if request.user.is_authenticated:
+        return request.user
+    try:
+        auth = ApiTokenAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return auth[0] if auth else None
+
+
+def media_file(request, path):
+    """
+    Serves MEDIA_ROOT/<path> to its owner (or staff / recruiters).
+    Hands the transfer to the front server when MEDIA_X_ACCEL_PREFIX
+    (nginx) or MEDIA_X_SENDFILE (Apache / lighttpd) is set; otherwise
+    streams it with FileResponse, with ETag / Last-Modified and single
+    byte-range support.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except Exception:
+        raise Http404
+    name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, "/")
+
+    user = _media_user(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+    if not _can_read_media(user, name) or not os.path.isfile(full_path):
+        raise Http404
+
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    disposition = f"inline; filename*=UTF-8''{quote(os.path.basename(full_path))}"
+
+    if settings.MEDIA_X_ACCEL_PREFIX:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_X_ACCEL_PREFIX.rstrip("/") + "/" + quote(name)
+        response["Content-Disposition"] = disposition
+        return response
+    if settings.MEDIA_X_SENDFILE:
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = full_path
+        response["Content-Disposition"] = disposition
+        return response
+
+    stat = os.stat(full_path)
+    size = stat.st_size
+    etag = f'"{size:x}-{int(stat.st_mtime_ns):x}"'
+    last_modified = http_date(stat.st_mtime)
+
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    if (if_none_match and etag in [t.strip() for t in if_none_match.split(",")]) or (
+        not if_none_match and if_modified_since and int(stat.st_mtime) <= if_modified_since
+    ):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    start, end = 0, size - 1
+    partial = False
+    range_header = request.headers.get("Range", "")
+    if_range = request.headers.get("If-Range")
+    match = _RANGE_RE.match(range_header.strip()) if range_header else None
+
+    # If-Range: only honour the range while the file is unchanged
+    if match and (not if_range or if_range in (etag, last_modified)):
+        first, last = match.groups()
+        if first and last and int(last) < int(first):
+            # invalid range-spec ("bytes=5-2"): ignored, full response (RFC 9110 14.2)
+            match = None
+        elif first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        elif last:  # suffix range: last N bytes
+            start = max(0, size - int(last))
+        else:
+            match = None
+
+        if match:
+            # valid but past the end of the file
+            if start >= size:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+            partial = True
+
+    f = open(full_path, "rb")
+    if partial:
+        length = end - start + 1
+        response = FileResponse(_FileRange(f, start, length), status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(length)
+    else:
+        response = FileResponse(f, content_type=content_type)
+
+    response["Content-Disposition"] = disposition
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    response["Cache-Control"] = "private, max-age=3600"
+    return response
+
+
+# ===================== METRICS (internal) =====================
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    auth = request.headers.get("Authorization", "")
+    allowed = (
+        (request.user.is_authenticated and request.user.is_staff)
+        or (token and hmac.compare_digest(auth, f"Bearer {token}"))
+    )
+    if not allowed:
+        return HttpResponse(status=403)
+
+    return HttpResponse(
+        render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+# ===================== STREAMING (?stream=1) =====================
+
+# best rows sent in each early "top" snapshot
+STREAM_TOP_K = 10
+# rows scored between two snapshots / rows per final "rows" chunk
+STREAM_BATCH = 25
+
+
+def _wants_stream(request):
+    return request.query_params.get("stream") in ("1", "true", "yes")
+
+
+def _ndjson(event):
+    return json.dumps(event, cls=DjangoJSONEncoder) + "\n"
+
+
+def _stream_ranked(meta, rows, key, top_k=STREAM_TOP_K, final=None):
+    """
+    NDJSON event stream for a ranking that is computed row by row:
+      {"type": "meta", ...}               sent immediately
+      {"type": "top", "rows": [...]}      best top_k so far (after the
+                                          first row, then every batch)
+      {"type": "rows", "rows": [...]}     final ranking, in chunks
+      {"type": "done", "count": n}
+    `final` optionally returns the final ranking (e.g. a DB query);
+    by default the scored rows are sorted by `key`.
+    """
+    yield _ndjson({"type": "meta", **meta})
+
+    seen = []
+    for i, row in enumerate(rows, 1):
+        seen.append(row)
+        if i == 1 or i % STREAM_BATCH == 0:
+            yield _ndjson({"type": "top", "rows": heapq.nlargest(top_k, seen, key=key)})
+
+    ranked = final() if final is not None else sorted(seen, key=key, reverse=True)
+    for start in range(0, len(ranked), STREAM_BATCH):
+        yield _ndjson({"type": "rows", "rows": ranked[start:start + STREAM_BATCH]})
+
+    yield _ndjson({"type": "done", "count": len(ranked)})
+
+
+def _ndjson_response(events):
+    resp = StreamingHttpResponse(events, content_type="application/x-ndjson")
+    resp["Cache-Control"] = "no-cache"
+    # nginx: flush every line instead of buffering the whole body
+    resp["X-Accel-Buffering"] = "no"
+    return resp
+
+
+def _iter_my_match_rows(resume):
+    # stored, current rows first, so the first row needs no scoring; then
+    # jobs this resume hasn't seen, a chunk at a time; stale rows last
+    ensure_resume_content(resume)
+    reports = MatchReport.objects.filter(resume=resume, job__status=Job.STATUS_OPEN)
+
+    current = reports.filter(report_version=REPORT_MODEL_VERSION).select_related("job")
+    for report in current.iterator():
+        yield _my_match_row(report)
+
+    for job_ids in iter_score_missing_pairs(resume):
+        for report in iter_generated_reports(reports.filter(job_id__in=job_ids)):
+            yield _my_match_row(report)
+
+    for report in iter_generated_reports(reports):
+        yield _my_match_row(report)
+
+
+def _cached_my_match_rows(resume):
+    # what an overloaded server can still answer: stored, current rows only
+    reports = (
+        MatchReport.objects
+        .filter(resume=resume, job__status=Job.STATUS_OPEN, report_version=REPORT_MODEL_VERSION)
+        .select_related("job")
+    )
+    return [_my_match_row(r) for r in reports]
+
+
+def _my_match_row(r):
+    return {
+        "job_id": r.job_id,
+        "job_title": r.job.title,
+        # current job weights, not the ones the row was scored with
+        "score": blend_components(r, match_weights(r.job)),
+        "ats_score": r.ats_score,
+        # the gap improvements / interview_questions are written about
+        "missing_skills": r.ats_missing_skills,
+        # job skills not found in the resume (what `score` is based on)
+        "job_missing_skills": r.missing_skills,
+        "improvements": r.improvements,
+        "tailored_summary": r.tailored_summary,
+        "cover_letter": r.cover_letter,
+        "interview_questions": r.interview_questions,
+    }
+
+
+def _match_row(r, score):
+    # score: r.score blended with the weights of this request
+    return {
+        "resume_id": r.resume.id,
+        "resume_title": r.resume.title,
+        "username": r.resume.user.username,
+        "score": round(score, 2),
+        "ats_score": r.ats_score,
+        "missing_skills": r.missing_skills,
+        "breakdown": {
+            "skills_score": _round_or_none(r.skills_score),
+            "title_score": _round_or_none(r.title_score),
+            "desc_score": _round_or_none(r.desc_score),
+        },
+    }
+
+
+def _round_or_none(value):
+    return None if value is None else round(value, 2)
+
+
+def _limit_param(request, default=20, maximum=200):
+    try:
+        limit = int(request.query_params.get("limit", default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
 
 
 # ===================== RESUME VIEWSET =====================
@@ -144,8 +497,50 @@ class ResumeViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Resume.objects.filter(user=self.request.user).order_by("-created_at")
 
+    def _extract_if_admitted(self, resume):
+        # extract now: job imports / rebuilds score on the stored content.
+        # PDF parsing is admission-controlled like scoring; when busy the
+        # upload still succeeds and the text is extracted on first use
+        # (my_matches, rebuild_matches)
+        try:
+            ticket = admit(self.request.user)
+        except (Throttled, ServerBusy):
+            return
+        with ticket:
+            ensure_resume_content(resume)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        resume = serializer.save(user=self.request.user)
+        self._extract_if_admitted(resume)
+
+    def perform_update(self, serializer):
+        resume = serializer.save()
+        if "file" in serializer.validated_data:
+            # new file: re-extract text, drop reports scored on the old one
+            delete_reports(MatchReport.objects.filter(resume=resume))
+            resume.content = ""
+            Resume.objects.filter(id=resume.id).update(content="")
+            self._extract_if_admitted(resume)
+
+    # 🔥 BULK UPLOAD: zip / tar of PDF / DOCX resumes, processed by the `run_imports` worker
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        archive = request.FILES.get("archive")
+        if archive is None:
+            return Response({"detail": "archive file is required."}, status=400)
+
+        # large uploads are already spooled to a temp file by Django's
+        # upload handlers; saving moves that file instead of reading it
+        imp = ResumeImport(user=request.user)
+        imp.archive.save(archive.name, archive, save=True)
+
+        # picked up by the `run_imports` worker
+        return Response(ResumeImportSerializer(imp).data, status=202)
+
+    @action(detail=False, methods=["get"], url_path=r"bulk/(?P<import_id>\d+)")
+    def bulk_status(self, request, import_id=None):
+        imp = get_object_or_404(ResumeImport, id=import_id, user=request.user)
+        return Response(ResumeImportSerializer(imp).data)
 
     # 🔥 MAIN ATS ENDPOINT
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated])
@@ -163,25 +558,37 @@ class ResumeViewSet(viewsets.ModelViewSet):
                 status=400
             )
 
-        results = []
-
-        for job in Job.objects.all():
-            report = generate_ai_report(
-                resume_file_path=resume.file.path,   # ✅ REAL PDF
-                job_title=job.title,
-                job_desc=job.description or "",
-                job_skills=job.skills or "",
-            )
-
-            results.append({
-                "job_id": job.id,
-                "job_title": job.title,
-                "ats_score": report["ats_score"],
-                "missing_skills": report["missing_skills"],
-                "improvements": report.get("improvements", []),
-                "interview_questions": report.get("interview_questions", []),
+        # scoring + PDF parsing: limited, stored rows served when busy
+        try:
+            ticket = admit(request.user)
+        except (Throttled, ServerBusy):
+            with replica_reads(request.user):
+                results = _cached_my_match_rows(resume)
+            if not results:
+                raise
+            if _wants_stream(request):
+                return _ndjson_response(_stream_ranked(
+                    {"resume_id": resume.id, "resume_title": resume.title, "cached": True},
+                    iter(results),
+                    key=lambda m: m["ats_score"],
+                ))
+            results.sort(key=lambda x: x["ats_score"], reverse=True)
+            return Response({
+                "resume_id": resume.id,
+                "resume_title": resume.title,
+                "matches": results,
+                "cached": True,
             })
 
+        if _wants_stream(request):
+            return _ndjson_response(ticket.hold(_stream_ranked(
+                {"resume_id": resume.id, "resume_title": resume.title},
+                _iter_my_match_rows(resume),
+                key=lambda m: m["ats_score"],
+            )))
+
+        with ticket:
+            results = list(_iter_my_match_rows(resume))
         results.sort(key=lambda x: x["ats_score"], reverse=True)
 
         return Response({
@@ -190,6 +597,42 @@ class ResumeViewSet(viewsets.ModelViewSet):
             "matches": results,
         })
 
+    # candidates: which skill would unlock the most jobs
+    @action(detail=False, methods=["get"], url_path="skill-opportunities")
+    def skill_opportunities(self, request):
+        resumes = self.get_queryset()
+        resume_id = request.query_params.get("resume_id")
+        if resume_id:
+            if not str(resume_id).isdigit():
+                return Response({"detail": "resume_id must be an integer."}, status=400)
+            resume = get_object_or_404(resumes, id=resume_id)
+        else:
+            resume = resumes.first()
+
+        if not resume:
+            return Response(
+                {"detail": "No resume found. Upload a resume first."},
+                status=400
+            )
+
+        # counters maintained as reports are written (cored.skillgaps)
+        with replica_reads(request.user):
+            gaps = list(resume.skill_gaps.order_by("-jobs_unlocked", "-jobs_missing", "skill")[:_limit_param(request)])
+            jobs_scored = MatchReport.objects.filter(resume=resume).count()
+        return Response({
+            "resume_id": resume.id,
+            "resume_title": resume.title,
+            "jobs_scored": jobs_scored,
+            "skills": [
+                {
+                    "skill": g.skill,
+                    "jobs_unlocked": g.jobs_unlocked,
+                    "jobs_missing": g.jobs_missing,
+                }
+                for g in gaps
+            ],
+        })
+
 
 # ===================== JOB VIEWSET =====================
 
@@ -203,27 +646,207 @@ class JobViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "id"]
     ordering = ["-created_at"]
 
+    def get_queryset(self):
+        qs = super().get_queryset()
+        # ?status=open|closed
+        status = self.request.query_params.get("status")
+        if status in (Job.STATUS_OPEN, Job.STATUS_CLOSED):
+            qs = qs.filter(status=status)
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        # job list / search: read-only, served from the replica
+        with replica_reads(request.user):
+            return super().list(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        was_open = serializer.instance.is_open
+        job = serializer.save()
+        # scores and ATS reports depend on the job text; weight changes
+        # (w_*) only re-sort the stored component scores
+        if {"title", "description", "skills"} & set(serializer.validated_data):
+            delete_reports(MatchReport.objects.filter(job=job))
+            MatchReportArchive.objects.filter(job=job).delete()
+
+        # lifecycle: closing stamps closed_at, reopening restores archived reports
+        if job.is_open != was_open:
+            if job.is_open:
+                reopen_job(job)
+            else:
+                close_job(job)
+
+    # 🔥 BULK IMPORT: multipart "file" (.csv / .jsonl) or a JSON list,
+    # imported and scored by the `run_imports` worker; poll bulk/<id>
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        upload = request.FILES.get("file")
+
+        if upload is not None:
+            try:
+                fmt = request.data.get("format") or guess_import_format(upload.name)
+                if fmt not in ("csv", "jsonl"):
+                    raise ValueError(f"Unsupported format: {fmt}")
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=400)
+        else:
+            data = request.data
+            if isinstance(data, dict):
+                data = data.get("jobs")
+            if not isinstance(data, list):
+                return Response(
+                    {"detail": "Send a CSV/JSONL file or a JSON list of jobs."},
+                    status=400
+                )
+            # same code path as an uploaded file: one JSON object per line
+            fmt = "jsonl"
+            body = "".join(json.dumps(row) + "\n" for row in data)
+            upload = ContentFile(body.encode("utf-8"), name="jobs.jsonl")
+
+        imp = JobImport(user=request.user, format=fmt)
+        imp.file.save(upload.name, upload, save=True)
+        return Response(JobImportSerializer(imp).data, status=202)
+
+    @action(detail=False, methods=["get"], url_path=r"bulk/(?P<import_id>\d+)")
+    def bulk_status(self, request, import_id=None):
+        imp = get_object_or_404(JobImport, id=import_id, user=request.user)
+        return Response(JobImportSerializer(imp).data)
+
+    # recruiters: which required skills this job's applicants lack most
+    @action(detail=True, methods=["get"], url_path="skill-gaps")
+    def skill_gaps(self, request, pk=None):
+        if not (request.user.is_staff or request.user.is_recruiter):
+            raise PermissionDenied("Skill-gap analytics are available to recruiters.")
+        job = self.get_object()
+
+        with replica_reads(request.user):
+            applicants = MatchReport.objects.filter(job=job).count()
+            gaps = list(job.skill_gaps.order_by("-missing", "skill")[:_limit_param(request)])
+        return Response({
+            "job_id": job.id,
+            "applicants": applicants,
+            "skills": [
+                {
+                    "skill": g.skill,
+                    "missing": g.missing,
+                    "share": round(g.missing / applicants, 3) if applicants else 0.0,
+                }
+                for g in gaps
+            ],
+        })
+
     @action(detail=True, methods=["get"], url_path="matches")
     def matches(self, request, pk=None):
         job = self.get_object()
 
-        reports = top_matches_for_job(job.id, user=request.user)
+        min_score = request.query_params.get("min_score")
+        must_have = request.query_params.get("must_have")
+        limit = request.query_params.get("limit")
+        # ?w_skills=&w_title=&w_desc= : try other weights without rescoring
+        weights = parse_weight_overrides(request.query_params)
+
+        # rescoring is limited; when busy, serve the stored rows
+        cached = False
+        if not job.is_open:
+            # closed jobs are never rescored (archived reports: reopen the job)
+            ticket, cached = None, True
+        else:
+            try:
+                ticket = admit(request.user)
+            except (Throttled, ServerBusy):
+                if not MatchReport.objects.filter(job=job, resume__user=request.user).exists():
+                    raise
+                ticket, cached = None, True
+
+        if cached:
+            reports = top_matches_for_job(
+                job.id,
+                user=request.user,
+                min_score=min_score,
+                must_have=must_have,
+                limit=limit,
+                weights=weights,
+                build=False,
+                generate=False,
+            )
+            if _wants_stream(request):
+                return _ndjson_response(_stream_ranked(
+                    {"job_id": job.id, "weights": match_weights(job, weights), "cached": True},
+                    (_match_row(r, r.weighted_score) for r in reports),
+                    key=lambda row: row["score"],
+                ))
+        elif _wants_stream(request):
+            return _ndjson_response(ticket.hold(self._stream_matches(
+                job, request.user, min_score, must_have, limit, weights
+            )))
+        else:
+            with ticket:
+                reports = list(top_matches_for_job(
+                    job.id,
+                    user=request.user,
+                    min_score=min_score,
+                    must_have=must_have,
+                    limit=limit,
+                    weights=weights,
+                ))
 
         rows = []
         for r in reports:
             if r.resume.user_id != request.user.id:
                 continue
 
-            rows.append({
-                "resume_id": r.resume.id,
-                "resume_title": r.resume.title,
-                "username": r.resume.user.username,
-                "score": r.score,
-                "ats_score": r.ats_score,
-                "missing_skills": r.missing_skills,
-            })
+            rows.append(_match_row(r, r.weighted_score))
 
-        return Response({
+        data = {
             "job_id": job.id,
+            "weights": match_weights(job, weights),
             "results": rows
-        })      
\ No newline at end of file
+        }
+        if cached:
+            data["cached"] = True
+        if not job.is_open:
+            data["job_status"] = job.status
+        return Response(data)
+
+    def _stream_matches(self, job, user, min_score, must_have, limit, weights):
+        try:
+            floor = float(min_score) if min_score not in (None, "") else None
+        except (TypeError, ValueError):
+            floor = None
+        keywords = [kw.lower() for kw in normalize_must_have(must_have)]
+        try:
+            top_k = int(limit) if limit not in (None, "") else STREAM_TOP_K
+        except (TypeError, ValueError):
+            top_k = STREAM_TOP_K
+
+        effective = match_weights(job, weights)
+
+        def scored_rows():
+            # same filters as top_matches_for_job(), applied while scoring
+            for report, _ in iter_match_reports_for_job(job.id, user=user):
+                score = blend_components(report, effective)
+                if floor is not None and score < floor:
+                    continue
+                content = (report.resume.content or "").lower()
+                if not all(kw in content for kw in keywords):
+                    continue
+                yield _match_row(report, score)
+
+        def final():
+            reports = top_matches_for_job(
+                job.id,
+                user=user,
+                min_score=min_score,
+                must_have=must_have,
+                limit=limit,
+                build=False,
+                weights=weights,
+            )
+            return [_match_row(r, r.weighted_score) for r in reports]
+
+        return _stream_ranked(
+            {"job_id": job.id, "weights": effective},
+            scored_rows(),
+            key=lambda row: row["score"],
+            top_k=top_k,
+            final=final,
+        )
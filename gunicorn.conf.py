@@ -0,0 +1,28 @@
+"""
+Gunicorn settings (picked up automatically from the project root).
+
+The Django app and the heavy scoring / PDF modules are loaded once in
+the master; workers fork from it and share that memory copy-on-write.
+Set PRELOAD_HEAVY_MODULES=False to load them lazily in each worker.
+"""
+import os
+
+preload_app = os.getenv("GUNICORN_PRELOAD_APP", "True") == "True"
+
+
+def on_starting(server):
+    if os.getenv("PRELOAD_HEAVY_MODULES", "True") != "True":
+        return
+
+    from cored.startup import preload_heavy_modules
+
+    missing = preload_heavy_modules()
+    if missing:
+        server.log.warning("Could not preload: %s", ", ".join(missing))
+
+
+def when_ready(server):
+    # after the app is preloaded, before any worker is forked
+    from cored.startup import freeze_for_fork
+
+    freeze_for_fork()
@@ -53,6 +53,9 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "cored.middleware.MetricsMiddleware",  # latency / DB / profile=1
+    "cored.middleware.TrafficRecorderMiddleware",  # TRAFFIC_RECORD_PATH
+    "cored.middleware.ReplicaPinMiddleware",  # DATABASE_REPLICA_URL
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -95,6 +98,37 @@ DATABASES = {
     )
 }
 
+# --------------------------------------------------
+# READ REPLICA (see cored.routers)
+# --------------------------------------------------
+# match listings, job list / search and dashboard stats read from here.
+# Locally, any second database can stand in, e.g.
+# DATABASE_REPLICA_URL=sqlite:///db.sqlite3 (same file, a second connection)
+READ_REPLICA_ALIAS = "replica"
+if os.getenv("DATABASE_REPLICA_URL"):
+    DATABASES[READ_REPLICA_ALIAS] = dj_database_url.parse(
+        os.getenv("DATABASE_REPLICA_URL"),
+        conn_max_age=600,
+        ssl_require=False,
+    )
+    # tests: the replica alias reads the test database
+    DATABASES[READ_REPLICA_ALIAS]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["cored.routers.ReplicaRouter"]
+# a user's reads stay on the primary this long after they write (replica lag)
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+# read-your-writes pins live here, so only needed with a replica; a file
+# cache is shared by the gunicorn workers of one host (point CACHE_DIR at
+# shared storage across hosts). It unpickles whatever is in CACHE_DIR:
+# keep it private to the app user, never a shared temp dir
+if READ_REPLICA_ALIAS in DATABASES:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / "var" / "cache")),
+        }
+    }
+
 # --------------------------------------------------
 # PASSWORD VALIDATION
 # --------------------------------------------------
@@ -126,6 +160,83 @@ STATICFILES_STORAGE = (
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# resume downloads are checked in Django, then the bytes are sent by the
+# front server: nginx "internal" location prefix (X-Accel-Redirect) ...
+MEDIA_X_ACCEL_PREFIX = os.getenv("MEDIA_X_ACCEL_PREFIX", "")
+# ... or Apache mod_xsendfile / lighttpd (X-Sendfile)
+MEDIA_X_SENDFILE = os.getenv("MEDIA_X_SENDFILE", "False") == "True"
+
+# --------------------------------------------------
+# MATCH RANKING WEIGHTS
+# --------------------------------------------------
+# default blend of the stored component scores; jobs (Job.w_*) and
+# requests (?w_skills=&w_title=&w_desc=) can override them
+MATCH_WEIGHTS = {
+    "skills": float(os.getenv("MATCH_W_SKILLS", "0.55")),
+    "title": float(os.getenv("MATCH_W_TITLE", "0.25")),
+    "desc": float(os.getenv("MATCH_W_DESC", "0.20")),
+}
+
+# --------------------------------------------------
+# BACKGROUND IMPORTS (`manage.py run_imports`, the Procfile worker)
+# --------------------------------------------------
+# a running import whose worker hasn't heartbeated for this long
+# (seconds) is picked up again by another worker
+IMPORT_LEASE_SECONDS = int(os.getenv("IMPORT_LEASE_SECONDS", "300"))
+# pending imports are checked this often by `run_imports --loop`
+IMPORT_POLL_SECONDS = float(os.getenv("IMPORT_POLL_SECONDS", "5"))
+
+# --------------------------------------------------
+# BULK RESUME IMPORT
+# --------------------------------------------------
+# extraction processes per import (default: half the cores, the rest
+# stay free for the web workers' scoring)
+RESUME_IMPORT_WORKERS = int(os.getenv("RESUME_IMPORT_WORKERS", "0")) or max(1, (os.cpu_count() or 2) // 2)
+# PDFs bigger than this inside an archive are skipped
+RESUME_IMPORT_MAX_FILE_SIZE = int(os.getenv("RESUME_IMPORT_MAX_FILE_SIZE", str(10 * 1024 * 1024)))
+
+# --------------------------------------------------
+# JOB RANKING VECTORIZER
+# --------------------------------------------------
+# which jobs my_matches scores for a resume: "exact" = every open job,
+# "hashing" = the top HASHING_CANDIDATES of the catalog, pre-ranked by a
+# HashingVectorizer with catalog-wide document frequencies
+# (cored.hashing) in constant memory. Stored scores are exact either way.
+# The frequencies are only maintained in hashing mode:
+# `manage.py hashing_index rebuild` after switching
+MATCH_VECTORIZER = os.getenv("MATCH_VECTORIZER", "exact")
+HASHING_CANDIDATES = int(os.getenv("HASHING_CANDIDATES", "200"))
+HASHING_N_FEATURES = int(os.getenv("HASHING_N_FEATURES", str(2 ** 18)))
+# seconds a process keeps the document frequencies before reloading them
+HASHING_DF_CACHE_TTL = int(os.getenv("HASHING_DF_CACHE_TTL", "60"))
+
+# --------------------------------------------------
+# JOB LIFECYCLE / MATCH ARCHIVAL (see cored.archive)
+# --------------------------------------------------
+# `archive_reports run` closes open jobs older than this (0 = never)
+JOB_MAX_AGE_DAYS = int(os.getenv("JOB_MAX_AGE_DAYS", "90"))
+# ...and archives the reports of jobs closed more than this many days ago
+ARCHIVE_AFTER_CLOSED_DAYS = int(os.getenv("ARCHIVE_AFTER_CLOSED_DAYS", "7"))
+
+# --------------------------------------------------
+# ADMISSION CONTROL (scoring / extraction endpoints, see cored.admission)
+# --------------------------------------------------
+# concurrent expensive requests per host (0 = no limit); keep it below
+# the gunicorn worker count so cheap pages always find a free worker
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "2"))
+# work slots batch jobs (bulk job import) can't take
+ADMISSION_RESERVED_SLOTS = int(os.getenv("ADMISSION_RESERVED_SLOTS", "1"))
+# requests allowed to wait for a slot, and for how long (seconds)
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "8"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "5"))
+# expensive requests in flight per user
+ADMISSION_PER_USER = int(os.getenv("ADMISSION_PER_USER", "1"))
+# Retry-After (seconds) on 429 / 503
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+# private to the app user (created 0700): in a shared /tmp anyone could
+# pre-create and hold the slot files
+ADMISSION_LOCK_DIR = os.getenv("ADMISSION_LOCK_DIR", str(BASE_DIR / "var" / "admission"))
+
 # --------------------------------------------------
 # DEFAULT PK
 # --------------------------------------------------
@@ -137,6 +248,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
+        "cored.authentication.ApiTokenAuthentication",  # 🔥 scripts / integrations
         "rest_framework.authentication.BasicAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -146,6 +258,15 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# --------------------------------------------------
+# API TOKENS (Authorization: Bearer <key>)
+# --------------------------------------------------
+API_TOKEN_TTL_DAYS = int(os.getenv("API_TOKEN_TTL_DAYS", "30"))
+# verified tokens (and their user's flags) cached per process; revocations /
+# deactivations made by other processes apply after TTL seconds
+API_TOKEN_CACHE_SIZE = int(os.getenv("API_TOKEN_CACHE_SIZE", "10000"))
+API_TOKEN_CACHE_TTL = int(os.getenv("API_TOKEN_CACHE_TTL", "60"))
+
 # --------------------------------------------------
 # SECURITY (PROD SAFE)
 # --------------------------------------------------
@@ -155,6 +276,19 @@ if not DEBUG:
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
 
+# --------------------------------------------------
+# METRICS
+# --------------------------------------------------
+# /api/metrics/ is open to staff users, or to scrapers sending
+# "Authorization: Bearer <METRICS_TOKEN>" when this is set
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# --------------------------------------------------
+# LOAD TESTING
+# --------------------------------------------------
+# append API traffic to this JSONL file (replay: manage.py loadtest replay)
+TRAFFIC_RECORD_PATH = os.getenv("TRAFFIC_RECORD_PATH", "")
+
 LOGIN_URL = "/api/auth/"
 LOGIN_REDIRECT_URL = "/api/dashboard/"
 LOGOUT_REDIRECT_URL = "/api/auth/"
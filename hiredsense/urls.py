@@ -17,9 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView 
-from django.conf import settings
-from django.conf.urls.static import static
-from django.views.static import serve
+from cored.views import media_file
 
 
 urlpatterns = [
@@ -32,16 +30,9 @@ urlpatterns = [
     path("api/", include("cored.urls")),
 ]
 
-# media (dev + render)
-urlpatterns += static(
-    settings.MEDIA_URL,
-    document_root=settings.MEDIA_ROOT
-)
-
+# media (dev + render): owner-only, offloaded to nginx / sendfile when configured
 urlpatterns += [
-    path("media/<path:path>", serve, {
-        "document_root": settings.MEDIA_ROOT,
-    }),
+    path("media/<path:path>", media_file, name="media_file"),
 ]
 
 